@@ -1,10 +1,10 @@
 # pylint: disable=too-many-lines
 import logging
+from asyncio import gather
 from asyncio import sleep as asleep  # For waiting asynchronously.
-from os import listdir  # To check files on disk.
+from collections.abc import Callable
 
 import discord
-from asyncpg import IntegrityConstraintViolationError  # To check for database conflicts.
 from discord import Embed, Interaction, app_commands
 from discord.ext import commands  # For implementation of bot commands.
 
@@ -29,7 +29,9 @@ async def setup(bot: tbb.TravusBotBase):
     bot.add_command_help(CoreFunctionalityCog.module_load, "Core", {"perms": ["Administrator"]}, ["fun", "economy"])
     bot.add_command_help(CoreFunctionalityCog.module_unload, "Core", {"perms": ["Administrator"]}, ["fun", "economy"])
     bot.add_command_help(CoreFunctionalityCog.module_reload, "Core", {"perms": ["Administrator"]}, ["fun", "economy"])
-    bot.add_command_help(CoreFunctionalityCog.module_lasterror, "Core", {"perms": ["Administrator"]}, [""])
+    bot.add_command_help(
+        CoreFunctionalityCog.module_lasterror, "Core", {"perms": ["Administrator"]}, ["", "2", "ImportError"]
+    )
     bot.add_command_help(
         CoreFunctionalityCog.slash_module, "Core", None, ["list", "load", "unload", "reload", "lasterror"]
     )
@@ -67,7 +69,12 @@ async def setup(bot: tbb.TravusBotBase):
     bot.add_command_help(CoreFunctionalityCog.slash_config_set, "Core", None, ["alert_channel 353246496952418305"])
     bot.add_command_help(CoreFunctionalityCog.slash_config_unset, "Core", None, ["alert_channel"])
     bot.add_command_help(CoreFunctionalityCog.shutdown, "Core", None, ["", "1h", "1h30m", "10m-30s", "2m30s"])
-    bot.add_command_help(CoreFunctionalityCog.botconfig_prefix, "Core", None, ["$", "bot!", "bot ?", "remove"])
+    bot.add_command_help(
+        CoreFunctionalityCog.botconfig_prefix,
+        "Core",
+        None,
+        ["$", "bot!", "bot ?", "remove", "--guild ?", "--guild remove"],
+    )
     bot.add_command_help(CoreFunctionalityCog.botconfig_deletemessages, "Core", None, ["enable", "y", "disable", "n"])
     bot.add_command_help(CoreFunctionalityCog.botconfig_ephemeral, "Core", None, ["enable", "y", "disable", "n"])
     bot.add_command_help(CoreFunctionalityCog.botconfig_core_commands, "Core", None, ["slash", "prefix", "both"])
@@ -118,123 +125,164 @@ class CoreFunctionalityCog(commands.Cog):
         self.log = logging.getLogger("core_commands")
         self.log.setLevel(logging.INFO)
 
-    async def _module_operation(  # pylint: disable=too-many-statements,too-many-branches
-        self, invoker: commands.Context | Interaction, operation: str, mod: str
-    ):
-        """To avoid code duplication in the except blocks all module command functionality is grouped together."""
-
-        # Abstract over prefix Context vs slash Interaction.
-        if isinstance(invoker, commands.Context):
-
-            async def send(content="", **kwargs):
-                await invoker.send(content, **kwargs)
-
-            user_id = invoker.author.id
-        else:
-
-            async def send(content="", **kwargs):
-                await self.bot.send_response(invoker, content, **kwargs)
+    def _module_names(self, operation: str, mods: str) -> list[str]:
+        """Splits module arguments into module names. `all` means every module the operation can be applied to."""
+        names = list(dict.fromkeys(mods.replace(",", " ").split()))  # Remove duplicates while keeping order.
+        if [name.lower() for name in names] != ["all"]:
+            return names
+        loaded = [mod.replace("modules.", "") for mod in self.bot.extensions if mod != "core_commands"]
+        if operation == "load":
+            return [mod for mod in self.bot.module_index.names if mod not in loaded]
+        return loaded
 
-            user_id = invoker.user.id
+    async def _single_module_operation(  # pylint: disable=too-many-branches,too-many-return-statements
+        self, invoker: commands.Context | Interaction, operation: str, mod: str, user_id: int
+    ) -> tuple[str, bool]:
+        """To avoid code duplication in the except blocks all module command functionality is grouped together. Returns
+        the result message and whether the operation succeeded."""
 
         def clean_text(text: str, escape_md: bool = True, replace_bt: bool = False) -> str:
             return tbb.clean_no_ctx(self.bot, invoker.guild, text, escape_md, replace_bt)
 
-        async def load() -> str:
+        async def load() -> tuple[str, bool]:
             """Contains the logic for loading a module."""
-            if f"{mod}.py" in listdir("modules"):
+            if mod in self.bot.module_index:
                 await self.bot.load_extension(f"modules.{mod}")
-                await self.bot.update_command_states()
                 self.log.info(f"{user_id}: loaded '{mod}' module.")
-                return f"Module `{mod_name}` successfully loaded."
-            return f"No `{mod_name}` module was found."
+                return f"Module `{mod_name}` successfully loaded.", True
+            return f"No `{mod_name}` module was found.", False
 
-        async def unload() -> str:
+        async def unload() -> tuple[str, bool]:
             """Contains the logic for unloading a module."""
             await self.bot.unload_extension(f"modules.{mod}")
             self.log.info(f"{user_id}: unloaded '{mod}' module.")
-            return f"Module `{mod_name}` successfully unloaded."
+            return f"Module `{mod_name}` successfully unloaded.", True
 
-        async def reload() -> str:
+        async def reload() -> tuple[str, bool]:
             """Contains the logic for reloading a module."""
-            if f"{mod}.py" in listdir("modules"):
+            if mod in self.bot.module_index:
                 await self.bot.reload_extension(f"modules.{mod}")
-                await self.bot.update_command_states()
                 self.log.info(f"{user_id}: reloaded '{mod}' module.")
-                return f"Module `{mod_name}` successfully reloaded."
+                return f"Module `{mod_name}` successfully reloaded.", True
             if mod in self.bot.modules:
-                return f"The `{mod_name}` module file is no longer found on disk. Reload canceled."
-            return f"No `{mod_name}` module was found."
+                return f"The `{mod_name}` module file is no longer found on disk. Reload canceled.", False
+            return f"No `{mod_name}` module was found.", False
 
         old_help = dict(self.bot.help)  # Save old help and module info in case we need to roll back.
         old_modules = dict(self.bot.modules)
-        old_tree_commands = self.bot.tree.get_commands()  # Save tree state for sync rollback.
-        self.bot.extension_ctx = invoker  # Save context/interaction in case loaded module has use for it.
         mod_name = clean_text(mod, False, True)
-        result = ""
+        guild_id = invoker.guild.id if invoker.guild else None
         try:
             if operation == "load":
-                result = await load()
-            elif operation == "unload":
-                result = await unload()
-            elif operation == "reload":
-                result = await reload()
+                return await load()
+            if operation == "unload":
+                return await unload()
+            return await reload()
         except commands.ExtensionAlreadyLoaded:  # If module was already loaded.
-            await send(f"The `{mod_name}` module was already loaded.")
+            return f"The `{mod_name}` module was already loaded.", False
         except commands.ExtensionNotLoaded:  # If module wasn't loaded to begin with.
-            await send(f"No `{mod_name}` module is loaded.")
+            return f"No `{mod_name}` module is loaded.", False
         except commands.ExtensionFailed as e:
-            self.bot.help = old_help
-            self.bot.modules = old_modules
+            self.bot.restore_help(old_help, old_modules)
+            self.log.error(f"{user_id}: tried loading '{mod}' module, and it failed:\n\n{e}")
+            self.bot.errors.record(e.original, "module", mod, guild_id, user_id)
             if isinstance(e.original, tbb.DependencyError):
                 missing_deps = [f"`{clean_text(elem, False, True)}`" for elem in e.original.missing_dependencies]
-                await send(f"Module `{mod_name}` requires these missing dependencies: {', '.join(missing_deps)}")
-            else:
-                await send(
-                    "**Error! Something went really wrong! Contact module maintainer.**\nError logged to console and "
-                    "stored in module error command."
-                )
-            self.log.error(f"{user_id}: tried loading '{mod}' module, and it failed:\n\n{e}")
-            self.bot.last_module_error = (
-                f"The `{clean_text(mod, False)}` module failed while loading. The error was:\n\n{clean_text(str(e))}"
-            )
+                return f"Module `{mod_name}` requires these missing dependencies: {', '.join(missing_deps)}", False
         except Exception as e:
-            self.bot.help = old_help
-            self.bot.modules = old_modules
-            await send(
-                "**Error! Something went really wrong! Contact module maintainer.**\nError logged to console and "
-                "stored in module error command."
-            )
-            if isinstance(e, commands.ExtensionNotFound):  # Clarify error further in case it was an import error.
-                e = e.__cause__
-            self.log.error(f"{user_id}: tried loading '{mod}' module, and it failed:\n\n{e!s}")
-            self.bot.last_module_error = (
-                f"The `{clean_text(mod, False)}` module failed while loading. The error was:\n\n{clean_text(str(e))}"
-            )
+            self.bot.restore_help(old_help, old_modules)
+            error = e  # Clarify error further in case it was an import error.
+            if isinstance(e, commands.ExtensionNotFound) and e.__cause__ is not None:
+                error = e.__cause__
+            self.log.error(f"{user_id}: tried loading '{mod}' module, and it failed:\n\n{error!s}")
+            self.bot.errors.record(error, "module", mod, guild_id, user_id)
+        return (
+            f"**Error! Something went really wrong with `{mod_name}`! Contact module maintainer.**\nError logged to "
+            "console and stored in module error command."
+        ), False
+
+    async def _module_operation(
+        self, invoker: commands.Context | Interaction, operation: str, mods: str, force: bool = False
+    ):
+        """Loads, unloads or reloads one or more modules as a batch. Command states are updated once for the batch, and
+        the slash command tree is synced at most once, together with other module operations issued around then.
+        Modules that are unchanged since they were loaded are not reloaded, unless forced."""
+
+        # Abstract over prefix Context vs slash Interaction.
+        if isinstance(invoker, commands.Context):
+
+            async def send(content="", **kwargs):
+                await invoker.send(content, **kwargs)
+
+            user_id = invoker.author.id
         else:
-            try:
-                await self.bot._apply_core_commands_mode(sync=False)  # pylint: disable=protected-access
-                if {id(com) for com in self.bot.tree.get_commands()} != {id(com) for com in old_tree_commands}:
-                    await send(f"{result}\nSyncing slash command tree, this may take a moment...")
-                    await self.bot.tree.sync()
-                    await send("Slash command tree synced.")
-                else:
-                    await send(result)
-            except Exception as sync_error:  # Sync failed — rollback local state.
-                self.bot.help = old_help
-                self.bot.modules = old_modules
-                self.bot.tree.clear_commands(guild=None)
-                for cmd in old_tree_commands:
-                    self.bot.tree.add_command(cmd)
-                error_msg = f"Tree sync failed after {operation} of '{mod}': {sync_error}"
-                self.log.error(error_msg)
-                self.bot.last_module_error = error_msg
-                await send(
-                    "Module operation succeeded but slash command sync failed. Changes have been rolled back.\n"
-                    "Error stored in module lasterror command."
+
+            async def send(content="", **kwargs):
+                await self.bot.send_response(invoker, content, **kwargs)
+
+            user_id = invoker.user.id
+
+        async def send_paginated(text: str):
+            paginator = commands.Paginator(prefix="", suffix="")
+            for line in text.split("\n"):
+                paginator.add_line(line)
+            await self.bot.send_pages(invoker, paginator.pages)
+
+        names = self._module_names(operation, mods)
+        if operation != "unload" and any(mod not in self.bot.module_index for mod in names):
+            await self.bot.module_index.refresh()  # Module files may have been added since the index was last polled.
+        if not names:
+            await send(f"There are no modules to {operation}.")
+            return
+        results, succeeded = [], []
+        if operation == "reload" and not force:
+            changed = await gather(*(self.bot.module_changed(mod) for mod in names))
+            if unchanged := [mod for mod, change in zip(names, changed, strict=True) if not change]:
+                unchanged_names = ", ".join(
+                    f"`{tbb.clean_no_ctx(self.bot, invoker.guild, mod, False, True)}`" for mod in unchanged
                 )
+                results.append(f"Unchanged since loaded, not reloaded: {unchanged_names}")
+                names = [mod for mod, change in zip(names, changed, strict=True) if change]
+        old_help = dict(self.bot.help)  # Save old help and module info in case the tree sync fails and we roll back.
+        old_modules = dict(self.bot.modules)
+        old_tree_commands = self.bot.tree.get_commands()  # Save tree state for sync rollback.
+        self.bot.extension_ctx = invoker  # Save context/interaction in case loaded module has use for it.
+        try:
+            for mod in names:
+                result, success = await self._single_module_operation(invoker, operation, mod, user_id)
+                results.append(result)
+                if success:
+                    succeeded.append(mod)
         finally:  # Reset context as loading has concluded.
             self.bot.extension_ctx = None
+        result = "\n".join(results)
+        if not succeeded:
+            await send_paginated(result)
+            return
+        try:
+            if operation != "unload":
+                await self.bot.update_command_states(
+                    [com for mod in succeeded for com in self.bot.extension_commands(f"modules.{mod}")]
+                )
+            await self.bot._apply_core_commands_mode(sync=False)  # pylint: disable=protected-access
+            if await self.bot.tree_needs_sync():
+                await send_paginated(f"{result}\nSyncing slash command tree, this may take a moment...")
+                await self.bot.request_tree_sync()
+                await send("Slash command tree synced.")
+            else:
+                await send_paginated(result)
+        except Exception as sync_error:  # Sync failed — rollback local state.
+            self.bot.restore_help(old_help, old_modules)
+            self.bot.tree.clear_commands(guild=None)
+            for cmd in old_tree_commands:
+                self.bot.tree.add_command(cmd)
+            error_msg = f"Tree sync failed after {operation} of '{', '.join(succeeded)}': {sync_error}"
+            self.log.error(error_msg)
+            self.bot.errors.record(sync_error, "module", ", ".join(succeeded))
+            await send(
+                "Module operation succeeded but slash command sync failed. Changes have been rolled back.\n"
+                "Error stored in module lasterror command."
+            )
 
     @commands.is_owner()
     @commands.group(
@@ -250,28 +298,45 @@ class CoreFunctionalityCog(commands.Cog):
         raise commands.BadArgument(f"No subcommand given for {ctx.command.name}.")
 
     @commands.is_owner()
-    @botconfig.command(name="prefix", usage="<NEW PREFIX/remove>")
+    @botconfig.command(name="prefix", usage="(--guild) <NEW PREFIX/remove>")
     async def botconfig_prefix(self, ctx: commands.Context, *, new_prefix: str):
         """This command changes the bot prefix. The default prefix is `!`. Prefixes can be everything from symbols to
         words or a combination of the two, and can even include spaces, though they cannot start or end with spaces
         since Discord removes empty space at the start and end of messages. The prefix is saved across reboots. Setting
         the prefix to `remove` will remove the prefix. The bot will always listen to pings as if they were a prefix,
-        regardless of if there is another prefix set or not. Maximum prefix length is 20."""
+        regardless of if there is another prefix set or not. Maximum prefix length is 20. The `--guild` flag sets a
+        prefix for the current server only, which works alongside the global prefix. `--guild remove` removes it."""
+        flag, _, guild_prefix = new_prefix.partition(" ")
+        if flag.lower() == "--guild":
+            if not guild_prefix:
+                raise commands.BadArgument("No prefix given for the server.")
+            await self._set_guild_prefix(ctx, guild_prefix)
+            return
         if len(new_prefix) > 20:
             await ctx.send("The maximum prefix length is 20.")
             return
-        self.bot.prefix = new_prefix if new_prefix.lower() != "remove" else None  # If 'remove', prefix is set to None.
+        # Empty string is no prefix.
+        await self.bot.set_setting("prefix", new_prefix if new_prefix.lower() != "remove" else "")
         await self.bot.update_status()
-        async with self.bot.db.acquire() as conn:
-            await conn.execute(
-                "UPDATE settings SET value = $1 WHERE key = 'prefix'",
-                new_prefix if new_prefix.lower() != "remove" else "",
-            )  # Empty string is no prefix.
         if new_prefix.lower() != "remove":  # Give feedback to user.
             await ctx.send(f"The bot prefix has successfully been changed to `{new_prefix}`.")
         else:
             await ctx.send("The bot is now only listens to pings.")
 
+    async def _set_guild_prefix(self, ctx: commands.Context, new_prefix: str):
+        """Sets or removes the prefix of the server the command was used in."""
+        if ctx.guild is None:
+            await ctx.send("Server prefixes can only be set in a server.")
+        elif len(new_prefix) > 20:
+            await ctx.send("The maximum prefix length is 20.")
+        elif new_prefix.lower() != "remove":
+            await self.bot.set_guild_prefix(ctx.guild.id, new_prefix)
+            await ctx.send(f"The prefix of this server has successfully been changed to `{new_prefix}`.")
+        elif await self.bot.unset_guild_prefix(ctx.guild.id):
+            await ctx.send("This server no longer has its own prefix.")
+        else:
+            await ctx.send("This server does not have its own prefix.")
+
     @commands.is_owner()
     @botconfig.command(
         name="deletemessages",
@@ -283,23 +348,20 @@ class CoreFunctionalityCog(commands.Cog):
         trigger commands will be deleted. Is this is disabled then the bot will not delete messages that trigger
         commands. Per default this is enabled. This setting is saved across restarts."""
         op = operation.lower()
-        async with self.bot.db.acquire() as conn:
-            if op in ["enable", "true", "on", "yes", "y", "+", "1"]:  # Values interpreted as true.
-                if self.bot.delete_messages:
-                    await ctx.send("The bot is already deleting command triggers.")
-                    return
-                await conn.execute("UPDATE settings SET value = '1' WHERE key = 'delete_messages'")
-                self.bot.delete_messages = 1
-                await ctx.send("Now deleting command triggers.")
-            elif op in ["disable", "false", "off", "no", "n", "-", "0"]:  # Values interpreted as false.
-                if not self.bot.delete_messages:
-                    await ctx.send("The bot is already not deleting command triggers.")
-                    return
-                await conn.execute("UPDATE settings SET value = '0' WHERE key = 'delete_messages'")
-                self.bot.delete_messages = 0
-                await ctx.send("No longer deleting command triggers.")
-            else:
-                raise commands.BadArgument("Operation not supported.")
+        if op in ["enable", "true", "on", "yes", "y", "+", "1"]:  # Values interpreted as true.
+            if self.bot.delete_messages:
+                await ctx.send("The bot is already deleting command triggers.")
+                return
+            await self.bot.set_setting("delete_messages", "1")
+            await ctx.send("Now deleting command triggers.")
+        elif op in ["disable", "false", "off", "no", "n", "-", "0"]:  # Values interpreted as false.
+            if not self.bot.delete_messages:
+                await ctx.send("The bot is already not deleting command triggers.")
+                return
+            await self.bot.set_setting("delete_messages", "0")
+            await ctx.send("No longer deleting command triggers.")
+        else:
+            raise commands.BadArgument("Operation not supported.")
 
     @commands.is_owner()
     @botconfig.command(
@@ -311,23 +373,20 @@ class CoreFunctionalityCog(commands.Cog):
         command). If enabled, slash command responses will be ephemeral by default. If disabled, responses will be
         visible to everyone. Per default this is enabled. This setting is saved across restarts. Module authors can
         choose to respect this setting for their own slash commands."""
-        async with self.bot.db.acquire() as conn:
-            if operation.lower() in ["enable", "true", "on", "yes", "y", "+", "1"]:
-                if self.bot.ephemeral:
-                    await ctx.send("Ephemeral responses are already enabled.")
-                    return
-                await conn.execute("UPDATE settings SET value = '1' WHERE key = 'ephemeral'")
-                self.bot.ephemeral = True
-                await ctx.send("Slash command responses are now ephemeral.")
-            elif operation.lower() in ["disable", "false", "off", "no", "n", "-", "0"]:
-                if not self.bot.ephemeral:
-                    await ctx.send("Ephemeral responses are already disabled.")
-                    return
-                await conn.execute("UPDATE settings SET value = '0' WHERE key = 'ephemeral'")
-                self.bot.ephemeral = False
-                await ctx.send("Slash command responses are now visible to everyone.")
-            else:
-                raise commands.BadArgument("Operation not supported.")
+        if operation.lower() in ["enable", "true", "on", "yes", "y", "+", "1"]:
+            if self.bot.ephemeral:
+                await ctx.send("Ephemeral responses are already enabled.")
+                return
+            await self.bot.set_setting("ephemeral", "1")
+            await ctx.send("Slash command responses are now ephemeral.")
+        elif operation.lower() in ["disable", "false", "off", "no", "n", "-", "0"]:
+            if not self.bot.ephemeral:
+                await ctx.send("Ephemeral responses are already disabled.")
+                return
+            await self.bot.set_setting("ephemeral", "0")
+            await ctx.send("Slash command responses are now visible to everyone.")
+        else:
+            raise commands.BadArgument("Operation not supported.")
 
     @commands.is_owner()
     @botconfig.command(name="corecommands", aliases=["core-commands", "corecmds"], usage="<slash/prefix/both>")
@@ -341,9 +400,7 @@ class CoreFunctionalityCog(commands.Cog):
         if mode == self.bot.core_commands_mode:
             await ctx.send(f"Core commands mode is already set to `{mode}`.")
             return
-        self.bot.core_commands_mode = mode
-        async with self.bot.db.acquire() as conn:
-            await conn.execute("UPDATE settings SET value = $1 WHERE key = 'core_commands_mode'", mode)
+        await self.bot.set_setting("core_commands_mode", mode)
         await ctx.send(f"Core commands mode set to `{mode}`.\nSyncing slash command tree, this may take a moment...")
         await self.bot._apply_core_commands_mode()  # pylint: disable=protected-access
         await self.bot.update_status()
@@ -356,18 +413,12 @@ class CoreFunctionalityCog(commands.Cog):
         up to 4096 characters long, keep however in mind that Discord messages have a maximum length of 4000 characters
         (2000 without Nitro). If `remove` is sent along then the description will be removed. The special keyword
         `_prefix_` wil be replaced by the current bot prefix."""
-        assert self.bot.user is not None
-        async with self.bot.db.acquire() as conn:
-            if description.lower() == "remove":
-                await conn.execute("UPDATE settings SET value = '' WHERE key = 'bot_description'")
-                self.bot.modules[self.bot.user.name.lower()].description = (
-                    "No description for the bot found. Set description with `botconfig` command."
-                )
-                await ctx.send("The description has been removed.")
-            else:
-                await conn.execute("UPDATE settings SET value = $1 WHERE key = 'bot_description'", description)
-                self.bot.modules[self.bot.user.name.lower()].description = description
-                await ctx.send("The description has been set.")
+        if description.lower() == "remove":
+            await self.bot.set_setting("bot_description", "")
+            await ctx.send("The description has been removed.")
+        else:
+            await self.bot.set_setting("bot_description", description)
+            await ctx.send("The description has been set.")
 
     @commands.is_owner()
     @botconfig.command(name="credits", usage="<CREDITS/remove>   *OBS: See help command entry!*")
@@ -377,25 +428,21 @@ class CoreFunctionalityCog(commands.Cog):
         recommended. Embedded links should look like so; `[displayed text](URL)`. The credits should be passed inside a
         multi-line code block in order for new lines and tabs to work correctly. If `remove` is passed instead then the
         additional credits section is removed."""
-        assert self.bot.user is not None
         description = description.strip()
-        async with self.bot.db.acquire() as conn:
-            if description.lower() == "remove":
-                await conn.execute("UPDATE settings SET value = '' WHERE key = 'additional_credits'")
-                self.bot.modules[self.bot.user.name.lower()].credits = None
-                await ctx.send("The additional credits section has been removed.")
-                return
-            if description.count("```") != 2 or description[:3] != "```" or description[-3:] != "```":
-                await ctx.send("Credits must be fully encased in a multi-line code block.")
-                return
-            description = description.removeprefix("```").removesuffix("```").strip()  # Remove code block.
-            description = description.replace(" ", "\u202f")  # Prevent whitespace from disappearing.
-            if len(description) > 1024:
-                await ctx.send("Credits too long. Credits can be at most 1024 characters long.")
-                return
-            await conn.execute("UPDATE settings SET value = $1 WHERE key = 'additional_credits'", description)
-            self.bot.modules[self.bot.user.name.lower()].credits = description
-            await ctx.send("The additional credits section has been set.")
+        if description.lower() == "remove":
+            await self.bot.set_setting("additional_credits", "")
+            await ctx.send("The additional credits section has been removed.")
+            return
+        if description.count("```") != 2 or description[:3] != "```" or description[-3:] != "```":
+            await ctx.send("Credits must be fully encased in a multi-line code block.")
+            return
+        description = description.removeprefix("```").removesuffix("```").strip()  # Remove code block.
+        description = description.replace(" ", "\u202f")  # Prevent whitespace from disappearing.
+        if len(description) > 1024:
+            await ctx.send("Credits too long. Credits can be at most 1024 characters long.")
+            return
+        await self.bot.set_setting("additional_credits", description)
+        await ctx.send("The additional credits section has been set.")
 
     @commands.has_permissions(administrator=True)
     @commands.group(
@@ -422,11 +469,7 @@ class CoreFunctionalityCog(commands.Cog):
             for mod in self.bot.extensions
             if mod != "core_commands"
         ] or ["None, "]
-        available_modules = [
-            f"`{clean(ctx, mod, False, True).replace('.py', '')}`, "
-            for mod in listdir("modules")
-            if mod.endswith(".py")
-        ]
+        available_modules = [f"`{clean(ctx, mod, False, True)}`, " for mod in self.bot.module_index.names]
         available_modules = [mod for mod in available_modules if mod not in loaded_modules] or ["None, "]
         loaded_modules[-1] = loaded_modules[-1][:-2]
         available_modules[-1] = available_modules[-1][:-2]
@@ -437,46 +480,56 @@ class CoreFunctionalityCog(commands.Cog):
         paginator.add_line("\nAvailable Modules: ")
         for mod in available_modules:
             paginator.add_line(mod)
-        for page in paginator.pages:
-            await ctx.send(page)
+        await self.bot.send_pages(ctx, paginator.pages, separator=paginator.linesep)
 
     @commands.has_permissions(administrator=True)
-    @module.command(name="load", aliases=["l"], usage="<MODULE NAME>")
+    @module.command(name="load", aliases=["l"], usage="<MODULE NAME(S)/all>")
     async def module_load(self, ctx: commands.Context, *, mod: str):
         """This command loads modules. Modules should be located inside the module folder in the bot directory. The
         `module list` command can be used to show all modules available for loading. Once a module is loaded the
         functionality defined in the module file will be added to the bot. If an error is encountered during the
         loading process the user will be informed and the `module error` command can then be used to see the error
-        details. The module will then not be loaded. If you want modules to stay loaded after restarts, see the
+        details. The module will then not be loaded. Several modules can be loaded at once by separating their names
+        with spaces, or all available modules by using `all`. If you want modules to stay loaded after restarts, see the
         `default` command."""
         await self._module_operation(ctx, "load", mod)
 
     @commands.has_permissions(administrator=True)
-    @module.command(name="unload", aliases=["ul"], usage="<MODULE NAME>")
+    @module.command(name="unload", aliases=["ul"], usage="<MODULE NAME(S)/all>")
     async def module_unload(self, ctx: commands.Context, *, mod: str):
         """This command unloads modules. When a loaded module is unloaded its functionality will be removed. You can
-        use the `module list` command to see all currently loaded modules. This will not prevent default modules from
-        being loaded when the bot starts. See the `default` command for removing modules starting with the bot."""
+        use the `module list` command to see all currently loaded modules. Several modules can be unloaded at once by
+        separating their names with spaces, or all loaded modules by using `all`. This will not prevent default modules
+        from being loaded when the bot starts. See the `default` command for removing modules starting with the bot."""
         await self._module_operation(ctx, "unload", mod)
 
     @commands.has_permissions(administrator=True)
-    @module.command(name="reload", aliases=["rl"], usage="<MODULE NAME>")
+    @module.command(name="reload", aliases=["rl"], usage="<MODULE NAME(S)/all> (--force)")
     async def module_reload(self, ctx: commands.Context, *, mod: str):
         """This command reloads a module that is currently loaded. This will unload and load the module in one command.
         If the module is no longer present or the loading process encounters an error the module will not be reloaded
         and the functionality from before the reload will be retained and the user informed, the `module error` command
-        can then be used to see the error details. You can use the module list command to see all currently loaded
-        modules."""
-        await self._module_operation(ctx, "reload", mod)
+        can then be used to see the error details. Several modules can be reloaded at once by separating their names
+        with spaces, or all loaded modules by using `all`. Modules whose files have not changed since they were loaded
+        are not reloaded, add `--force` to reload them anyway. You can use the module list command to see all
+        currently loaded modules."""
+        args = mod.split()
+        await self._module_operation(
+            ctx, "reload", " ".join(arg for arg in args if arg != "--force"), "--force" in args
+        )
 
     @commands.has_permissions(administrator=True)
-    @module.command(name="lasterror", aliases=["error", "le"])
-    async def module_lasterror(self, ctx: commands.Context):
-        """This command will show the last error that was encountered during the module load or reloading process. This
-        information will also be logged to the console when the error first is encountered. This command retains this
-        information until another error replaces it, or the bot shuts down."""
-        if self.bot.last_module_error:
-            await ctx.send(self.bot.last_module_error[:1999])
+    @module.command(name="lasterror", aliases=["error", "le"], usage="(PAGE) (SEARCH)")
+    async def module_lasterror(self, ctx: commands.Context, page: int | None = None, *, search: str | None = None):
+        """This command will show the most recent errors that were encountered during the module load or reloading
+        process, along with how many times they occurred. The errors are paged, and can be searched by module name,
+        error type or message. This information will also be logged to the console when the error first is
+        encountered. The most recent errors are kept until the bot shuts down."""
+        errors = self.bot.format_errors(("module",), page or 1, search)
+        if errors:
+            await ctx.send(tbb.clean(ctx, errors)[:1999])
+        elif search:
+            await ctx.send("No errors loading modules matched the search.")
         else:
             await ctx.send("There have not been any errors loading modules since the last restart.")
 
@@ -495,16 +548,13 @@ class CoreFunctionalityCog(commands.Cog):
         """This command lists all current default modules. For more information on modules see the help text for the
         `module` command. All modules in this list start as soon as the bot is launched. For a list of all available or
         loaded modules see the `module list` command."""
-        async with self.bot.db.acquire() as conn:
-            result = await conn.fetch("SELECT module FROM default_modules")
-        result = [f"`{clean(ctx, val['module'], False, True)}`, " for val in result] or ["None, "]
+        result = [f"`{clean(ctx, mod, False, True)}`, " for mod in sorted(self.bot.default_modules)] or ["None, "]
         result[-1] = result[-1][:-2]
         paginator = commands.Paginator(prefix="", suffix="", linesep="")
         paginator.add_line("Default modules: ")
         for mod in result:
             paginator.add_line(mod)
-        for page in paginator.pages:
-            await ctx.send(page)
+        await self.bot.send_pages(ctx, paginator.pages, separator=paginator.linesep)
 
     @commands.is_owner()
     @default.command(name="add", usage="<MODULE NAME>")
@@ -513,12 +563,10 @@ class CoreFunctionalityCog(commands.Cog):
         once the bot starts. This command does not load modules if they are not already loaded until the bot is started
         the next time. For that, see the `module load` command. For a list of existing default modules, see the
         `default list` command. For more info on modules see the help text for the `module` command."""
-        if f"{mod}.py" in listdir("modules"):  # Check if such a module even exists.
-            try:
-                async with self.bot.db.acquire() as conn:
-                    await conn.execute("INSERT INTO default_modules VALUES ($1)", mod)
-                    await ctx.send(f"The `{clean(ctx, mod, False, True)}` module is now a default module.")
-            except IntegrityConstraintViolationError:
+        if await self.bot.module_index.find(mod):  # Check if such a module even exists.
+            if await self.bot.add_default_module(mod):
+                await ctx.send(f"The `{clean(ctx, mod, False, True)}` module is now a default module.")
+            else:
                 await ctx.send(f"The `{clean(ctx, mod, False, True)}` module is already a default module.")
         else:
             await ctx.send(f"No `{clean(ctx, mod, False, True)}` module was found.")
@@ -530,13 +578,10 @@ class CoreFunctionalityCog(commands.Cog):
         no longer automatically be loaded when the bot starts. This command will not unload commands that are already
         loaded. For that, see the `module unload` command. For a list of existing default modules, see the
         `default list` command. For more info on modules see the help text for the `module` command."""
-        async with self.bot.db.acquire() as conn:
-            result = await conn.fetchval("SELECT module FROM default_modules WHERE module = $1", mod)
-            if result:
-                await conn.execute("DELETE FROM default_modules WHERE module = $1", mod)
-                await ctx.send(f"Removed `{clean(ctx, mod, False, True)}` module from default modules.")
-            else:
-                await ctx.send(f"No `{clean(ctx, mod, False, True)}` module in default modules.")
+        if await self.bot.remove_default_module(mod):
+            await ctx.send(f"Removed `{clean(ctx, mod, False, True)}` module from default modules.")
+        else:
+            await ctx.send(f"No `{clean(ctx, mod, False, True)}` module in default modules.")
 
     @commands.has_permissions(administrator=True)
     @commands.group(
@@ -551,25 +596,6 @@ class CoreFunctionalityCog(commands.Cog):
         assert ctx.command is not None
         raise commands.BadArgument(f"No subcommand given for {ctx.command.name}.")
 
-    async def _command_get_state(self, command: commands.Command) -> int:
-        """Helper function for the 'command' command that gets the state of the command."""
-        async with self.bot.db.acquire() as conn:
-            cog_com_name = f"{command.cog.__class__.__name__ + '.' if command.cog else ''}{command.name}"
-            response = await conn.fetchval("SELECT state FROM command_states WHERE command = $1", cog_com_name)
-            if response is None:
-                await conn.execute("INSERT INTO command_states VALUES ($1, $2)", cog_com_name, 0)
-                response = 0
-            return response
-
-    async def _command_set_state(self, command: commands.Command, state: int):
-        """Helper function for the 'command' command that sets the state of the command."""
-        async with self.bot.db.acquire() as conn:
-            await conn.execute(
-                "UPDATE command_states SET state = $1 WHERE command = $2",
-                state,
-                f"{command.cog.__class__.__name__ + '.' if command.cog else ''}{command.name}",
-            )
-
     @commands.has_permissions(administrator=True)
     @command.command(name="enable", usage="<COMMAND NAME>")
     async def command_enable(self, ctx: commands.Context, *, command_name: str):
@@ -577,12 +603,12 @@ class CoreFunctionalityCog(commands.Cog):
         again. It will also add the command back into the list of commands shown by the help command and re-enable
         the viewing of its help text given the command has help text, and it has not otherwise been hidden."""
         if command_name in self.bot.all_commands:  # Check if command exists and get it's state.
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if self.bot.all_commands[command_name].enabled:  # If command is already enabled, report back.
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is already enabled.")
             else:
                 self.bot.all_commands[command_name].enabled = True
-                await self._command_set_state(self.bot.all_commands[command_name], 0 if state == 2 else 1)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 0 if state == 2 else 1)
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is now enabled.")
         else:
             await ctx.send(f"No `{clean(ctx, command_name)}` command found.")
@@ -594,7 +620,7 @@ class CoreFunctionalityCog(commands.Cog):
         list of commands shown by the help command. The command's help text will also not be viewable. Core
         commands cannot be disabled. Disabled commands can be re-enabled with the `command enable` command."""
         if command_name in self.bot.all_commands:  # Check if command exists and get it's state.
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if command_name in self.bot.help and self.bot.help[command_name].category.lower() == "core":
                 await ctx.send("Core commands cannot be disabled.")
             else:
@@ -602,7 +628,7 @@ class CoreFunctionalityCog(commands.Cog):
                     await ctx.send(f"The `{clean(ctx, command_name)}` command is already disabled.")
                 else:
                     self.bot.all_commands[command_name].enabled = False
-                    await self._command_set_state(self.bot.all_commands[command_name], 2 if state == 0 else 3)
+                    await self.bot.set_command_state(self.bot.all_commands[command_name], 2 if state == 0 else 3)
                     await ctx.send(f"The `{clean(ctx, command_name)}` command is now disabled.")
         else:
             await ctx.send(f"No `{clean(ctx, command_name)}` command found.")
@@ -616,12 +642,12 @@ class CoreFunctionalityCog(commands.Cog):
         be enough to re-add them to the help list since disabling them also hides them from the help list.
         See the `command enable` command to re-enable disabled commands."""
         if command_name in self.bot.all_commands:  # Check if command exists and get it's state.
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if not self.bot.all_commands[command_name].hidden:  # Check if command i already visible.
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is already shown.")
             else:
                 self.bot.all_commands[command_name].hidden = False
-                await self._command_set_state(self.bot.all_commands[command_name], 0 if state == 1 else 2)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 0 if state == 1 else 2)
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is now shown.")
         else:
             await ctx.send(f"No `{clean(ctx, command_name)}` command found.")
@@ -633,12 +659,12 @@ class CoreFunctionalityCog(commands.Cog):
         not disable the viewing of the help text for the command if someone already knows its name.
         Commands which have been hidden can be un-hidden with the `command show` command."""
         if command_name in self.bot.all_commands:  # Check if command exists and get it's state.
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if self.bot.all_commands[command_name].hidden:  # Check if command is already hidden.
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is already hidden.")
             else:
                 self.bot.all_commands[command_name].hidden = True
-                await self._command_set_state(self.bot.all_commands[command_name], 1 if state == 0 else 3)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 1 if state == 0 else 3)
                 await ctx.send(f"The `{clean(ctx, command_name)}` command is now hidden.")
         else:
             await ctx.send(f"No `{clean(ctx, command_name)}` command found.")
@@ -672,7 +698,7 @@ class CoreFunctionalityCog(commands.Cog):
         show some basic information about usage of the bot itself."""
         assert self.bot.user is not None
         if module_name is None or module_name.lower() in [self.bot.user.name.lower(), "core_commands", "core commands"]:
-            pref = self.bot.get_bot_prefix()
+            pref = self.bot.get_bot_prefix(ctx.guild)
             response = (
                 "**How To Use:**\nThis bot features a variety of commands. You can get a list of all commands "
                 f"you have access to with the `{pref}help` command. In order to use a command your message has "
@@ -735,8 +761,7 @@ class CoreFunctionalityCog(commands.Cog):
             for line in [f"{key}: {value}" for key, value in self.bot.config.items()]:
                 line = tbb.clean(ctx, line, False, True)
                 paginator.add_line(line if len(line) < 1992 else f"{line[:1989]}...")
-            for page in paginator.pages:
-                await ctx.send(page)
+            await self.bot.send_pages(ctx, paginator.pages)
         elif option.lower() in self.bot.config:
             value = tbb.clean(ctx, self.bot.config[option], False, True)
             option = tbb.clean(ctx, option, False, True)
@@ -757,11 +782,7 @@ class CoreFunctionalityCog(commands.Cog):
         if option == "all":
             await ctx.send("The keyword `all` cannot be used as a configuration option.")
         else:
-            self.bot.config[option] = value
-            async with self.bot.db.acquire() as conn:
-                await conn.execute(
-                    "INSERT INTO config VALUES ($1, $2) ON CONFLICT (key) DO UPDATE SET value = $2", option, value
-                )
+            await self.bot.set_config(option, value)
             option = tbb.clean(ctx, option, False, True)
             value = tbb.clean(ctx, value, False, True)
             line = f"Configuration option `{option}` has been set to `{value}`."
@@ -774,10 +795,8 @@ class CoreFunctionalityCog(commands.Cog):
         required by commands or modules will stop these from working."""
         option = option.lower()
         if option in self.bot.config:
-            del self.bot.config[option]
-            async with self.bot.db.acquire() as conn:
-                await conn.execute("DELETE FROM config WHERE key = $1", option)
-                option = tbb.clean(ctx, option, False, True)
+            await self.bot.unset_config(option)
+            option = tbb.clean(ctx, option, False, True)
             line = f"Configuration option `{option}` has been unset."
             await ctx.send(line if len(line) < 2000 else f"{line[:1996]}...")
         else:
@@ -809,7 +828,7 @@ class CoreFunctionalityCog(commands.Cog):
                 else:  # If another error is encountered, log to console.
                     await ctx.send("The time could not be parsed correctly.")
                     self.log.error(f"{ctx.author.id}: {e!s}")
-                    self.bot.last_error = f"{ctx.author.id}: {e!s}"
+                    self.bot.errors.record(e, "prefix", "shutdown", ctx.guild.id if ctx.guild else None, ctx.author.id)
 
     @app_commands.command(name="about", description="Shows information about the bot or a module.")
     @app_commands.describe(module_name="Module to show info for, or omit for bot info.")
@@ -837,9 +856,7 @@ class CoreFunctionalityCog(commands.Cog):
     @slash_about.autocomplete("module_name")
     async def slash_about_autocomplete(self, _interaction: Interaction, current: str) -> list[app_commands.Choice[str]]:
         """Autocomplete for module_name parameter of /about."""
-        return [
-            app_commands.Choice(name=name, value=name) for name in self.bot.modules if current.lower() in name.lower()
-        ][:25]
+        return [app_commands.Choice(name=name, value=name) for name in self.bot.module_search.search(current)]
 
     @app_commands.command(name="usage", description="Explains how to use the bot or a module.")
     @app_commands.describe(module_name="Module to show usage info for, or omit for general bot usage.")
@@ -892,9 +909,7 @@ class CoreFunctionalityCog(commands.Cog):
     @slash_usage.autocomplete("module_name")
     async def slash_usage_autocomplete(self, _interaction: Interaction, current: str) -> list[app_commands.Choice[str]]:
         """Autocomplete for module_name parameter of /usage."""
-        return [
-            app_commands.Choice(name=name, value=name) for name in self.bot.modules if current.lower() in name.lower()
-        ][:25]
+        return [app_commands.Choice(name=name, value=name) for name in self.bot.module_search.search(current)]
 
     slash_module = app_commands.Group(
         name="module",
@@ -920,9 +935,8 @@ class CoreFunctionalityCog(commands.Cog):
             if mod != "core_commands"
         ] or ["None, "]
         available_modules = [
-            f"`{tbb.clean_no_ctx(self.bot, interaction.guild, mod, False, True).replace('.py', '')}`, "
-            for mod in listdir("modules")
-            if mod.endswith(".py")
+            f"`{tbb.clean_no_ctx(self.bot, interaction.guild, mod, False, True)}`, "
+            for mod in self.bot.module_index.names
         ]
         available_modules = [mod for mod in available_modules if mod not in loaded_modules] or ["None, "]
         loaded_modules[-1] = loaded_modules[-1][:-2]
@@ -934,77 +948,96 @@ class CoreFunctionalityCog(commands.Cog):
         paginator.add_line("\nAvailable Modules: ")
         for mod in available_modules:
             paginator.add_line(mod)
-        for page in paginator.pages:
-            await self.bot.send_response(interaction, page)
+        await self.bot.send_pages(interaction, paginator.pages, separator=paginator.linesep)
 
     @slash_module.command(name="load", description="Loads a module.")
-    @app_commands.describe(module="Name of the module to load.")
+    @app_commands.describe(module="Name of the module to load. Separate several names with spaces, or use all.")
     async def slash_module_load(self, interaction: Interaction, module: str):
         """This command loads modules. Modules should be located inside the module folder in the bot directory. The
         `/module list` command can be used to show all modules available for loading. Once a module is loaded the
-        functionality defined in the module file will be added to the bot."""
+        functionality defined in the module file will be added to the bot. Several modules can be loaded at once by
+        separating their names with spaces, or all available modules by using `all`."""
         await interaction.response.defer(ephemeral=self.bot.ephemeral)
         await self._module_operation(interaction, "load", module)
 
     @slash_module.command(name="unload", description="Unloads a module.")
-    @app_commands.describe(module="Name of the module to unload.")
+    @app_commands.describe(module="Name of the module to unload. Separate several names with spaces, or use all.")
     async def slash_module_unload(self, interaction: Interaction, module: str):
         """This command unloads modules. When a loaded module is unloaded its functionality will be removed. You can
-        use the `/module list` command to see all currently loaded modules."""
+        use the `/module list` command to see all currently loaded modules. Several modules can be unloaded at once by
+        separating their names with spaces, or all loaded modules by using `all`."""
         await interaction.response.defer(ephemeral=self.bot.ephemeral)
         await self._module_operation(interaction, "unload", module)
 
     @slash_module.command(name="reload", description="Reloads a module.")
-    @app_commands.describe(module="Name of the module to reload.")
-    async def slash_module_reload(self, interaction: Interaction, module: str):
+    @app_commands.describe(
+        module="Name of the module to reload. Separate several names with spaces, or use all.",
+        force="Reload modules even if their files have not changed since they were loaded.",
+    )
+    async def slash_module_reload(self, interaction: Interaction, module: str, force: bool = False):
         """This command reloads a module that is currently loaded. This will unload and load the module in one command.
         If the loading process encounters an error the module will not be reloaded and the functionality from before
-        the reload will be retained."""
+        the reload will be retained. Several modules can be reloaded at once by separating their names with spaces, or
+        all loaded modules by using `all`. Modules whose files have not changed since they were loaded are not
+        reloaded, unless `force` is used."""
         await interaction.response.defer(ephemeral=self.bot.ephemeral)
-        await self._module_operation(interaction, "reload", module)
-
-    @slash_module.command(name="lasterror", description="Shows the last module loading error.")
-    async def slash_module_lasterror(self, interaction: Interaction):
-        """This command will show the last error that was encountered during the module load or reloading process. This
-        information will also be logged to the console when the error first is encountered. This command retains this
-        information until another error replaces it, or the bot shuts down."""
-        if self.bot.last_module_error:
-            await self.bot.send_response(interaction, self.bot.last_module_error[:1999])
+        await self._module_operation(interaction, "reload", module, force)
+
+    @slash_module.command(name="lasterror", description="Shows the most recent module loading errors.")
+    @app_commands.describe(page="Page of errors to show.", search="Only show errors containing this text.")
+    async def slash_module_lasterror(self, interaction: Interaction, page: int = 1, search: str | None = None):
+        """This command will show the most recent errors that were encountered during the module load or reloading
+        process, along with how many times they occurred. The errors are paged, and can be searched by module name,
+        error type or message. This information will also be logged to the console when the error first is
+        encountered. The most recent errors are kept until the bot shuts down."""
+        errors = self.bot.format_errors(("module",), page, search)
+        if errors:
+            await self.bot.send_response(interaction, tbb.clean_no_ctx(self.bot, interaction.guild, errors)[:1999])
+        elif search:
+            await self.bot.send_response(interaction, "No errors loading modules matched the search.")
         else:
             await self.bot.send_response(
                 interaction, "There have not been any errors loading modules since the last restart."
             )
 
+    @staticmethod
+    def _module_choices(
+        index: tbb.SearchIndex, current: str, predicate: Callable[[str], bool] | None = None
+    ) -> list[app_commands.Choice[str]]:
+        """Autocomplete choices for the last of the space separated module names being typed."""
+        *previous, last = current.split(" ")
+        names = index.search(
+            last, predicate=lambda name: name not in previous and (predicate is None or predicate(name))
+        )
+        if not previous and "all".startswith(last.lower()):
+            names = ["all", *names][:25]
+        prefix = " ".join([*previous, ""])
+        return [
+            app_commands.Choice(name=prefix + name, value=prefix + name) for name in names if len(prefix + name) <= 100
+        ]
+
     @slash_module_load.autocomplete("module")
     async def slash_module_load_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /module load — shows available (not yet loaded) modules."""
-        loaded = {mod.replace("modules.", "") for mod in self.bot.extensions if mod != "core_commands"}
-        available = [
-            mod.replace(".py", "")
-            for mod in listdir("modules")
-            if mod.endswith(".py") and mod.replace(".py", "") not in loaded
-        ]
-        return [app_commands.Choice(name=name, value=name) for name in available if current.lower() in name.lower()][
-            :25
-        ]
+        return self._module_choices(
+            self.bot.module_index.search, current, lambda name: f"modules.{name}" not in self.bot.extensions
+        )
 
     @slash_module_unload.autocomplete("module")
     async def slash_module_unload_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /module unload — shows loaded modules."""
-        loaded = [mod.replace("modules.", "") for mod in self.bot.extensions if mod != "core_commands"]
-        return [app_commands.Choice(name=name, value=name) for name in loaded if current.lower() in name.lower()][:25]
+        return self._module_choices(self.bot.extension_search, current)
 
     @slash_module_reload.autocomplete("module")
     async def slash_module_reload_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /module reload — shows loaded modules."""
-        loaded = [mod.replace("modules.", "") for mod in self.bot.extensions if mod != "core_commands"]
-        return [app_commands.Choice(name=name, value=name) for name in loaded if current.lower() in name.lower()][:25]
+        return self._module_choices(self.bot.extension_search, current)
 
     slash_default = app_commands.Group(
         name="default",
@@ -1021,32 +1054,27 @@ class CoreFunctionalityCog(commands.Cog):
     async def slash_default_list(self, interaction: Interaction):
         """This command lists all current default modules. All modules in this list start as soon as the bot is
         launched. For a list of all available or loaded modules see the `/module list` command."""
-        async with self.bot.db.acquire() as conn:
-            result = await conn.fetch("SELECT module FROM default_modules")
         entries = [
-            f"`{tbb.clean_no_ctx(self.bot, interaction.guild, val['module'], False, True)}`, " for val in result
+            f"`{tbb.clean_no_ctx(self.bot, interaction.guild, mod, False, True)}`, "
+            for mod in sorted(self.bot.default_modules)
         ] or ["None, "]
         entries[-1] = entries[-1][:-2]
         paginator = commands.Paginator(prefix="", suffix="", linesep="")
         paginator.add_line("Default modules: ")
         for mod in entries:
             paginator.add_line(mod)
-        for page in paginator.pages:
-            await self.bot.send_response(interaction, page)
+        await self.bot.send_pages(interaction, paginator.pages, separator=paginator.linesep)
 
     @slash_default.command(name="add", description="Adds a module to the default list.")
     @app_commands.describe(module="Name of the module to add as default.")
     async def slash_default_add(self, interaction: Interaction, module: str):
         """This command adds a module to the list of default modules. Modules in this list are loaded automatically
         once the bot starts. This command does not load modules if they are not already loaded."""
-        if f"{module}.py" in listdir("modules"):
-            try:
-                async with self.bot.db.acquire() as conn:
-                    await conn.execute("INSERT INTO default_modules VALUES ($1)", module)
-                    mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
-                    await self.bot.send_response(interaction, f"The `{mod}` module is now a default module.")
-            except IntegrityConstraintViolationError:
-                mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
+        if await self.bot.module_index.find(module):
+            mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
+            if await self.bot.add_default_module(module):
+                await self.bot.send_response(interaction, f"The `{mod}` module is now a default module.")
+            else:
                 await self.bot.send_response(interaction, f"The `{mod}` module is already a default module.")
         else:
             mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
@@ -1057,34 +1085,25 @@ class CoreFunctionalityCog(commands.Cog):
     async def slash_default_remove(self, interaction: Interaction, module: str):
         """This command removes a module from the list of default modules. Once removed the module will no longer
         automatically be loaded when the bot starts. This will not unload modules that are already loaded."""
-        async with self.bot.db.acquire() as conn:
-            result = await conn.fetchval("SELECT module FROM default_modules WHERE module = $1", module)
-            mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
-            if result:
-                await conn.execute("DELETE FROM default_modules WHERE module = $1", module)
-                await self.bot.send_response(interaction, f"Removed `{mod}` module from default modules.")
-            else:
-                await self.bot.send_response(interaction, f"No `{mod}` module in default modules.")
+        mod = tbb.clean_no_ctx(self.bot, interaction.guild, module, False, True)
+        if await self.bot.remove_default_module(module):
+            await self.bot.send_response(interaction, f"Removed `{mod}` module from default modules.")
+        else:
+            await self.bot.send_response(interaction, f"No `{mod}` module in default modules.")
 
     @slash_default_add.autocomplete("module")
     async def slash_default_add_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /default add — shows available modules on disk."""
-        available = [mod.replace(".py", "") for mod in listdir("modules") if mod.endswith(".py")]
-        return [app_commands.Choice(name=name, value=name) for name in available if current.lower() in name.lower()][
-            :25
-        ]
+        return [app_commands.Choice(name=name, value=name) for name in self.bot.module_index.search.search(current)]
 
     @slash_default_remove.autocomplete("module")
     async def slash_default_remove_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /default remove — shows current default modules."""
-        async with self.bot.db.acquire() as conn:
-            result = await conn.fetch("SELECT module FROM default_modules")
-        defaults = [val["module"] for val in result]
-        return [app_commands.Choice(name=name, value=name) for name in defaults if current.lower() in name.lower()][:25]
+        return [app_commands.Choice(name=name, value=name) for name in self.bot.default_module_search.search(current)]
 
     slash_config = app_commands.Group(
         name="config",
@@ -1109,8 +1128,7 @@ class CoreFunctionalityCog(commands.Cog):
             for line in [f"{key}: {value}" for key, value in self.bot.config.items()]:
                 line = tbb.clean_no_ctx(self.bot, interaction.guild, line, False, True)
                 paginator.add_line(line if len(line) < 1992 else f"{line[:1989]}...")
-            for page in paginator.pages:
-                await self.bot.send_response(interaction, page)
+            await self.bot.send_pages(interaction, paginator.pages)
         elif option.lower() in self.bot.config:
             value = tbb.clean_no_ctx(self.bot, interaction.guild, self.bot.config[option.lower()], False, True)
             opt = tbb.clean_no_ctx(self.bot, interaction.guild, option.lower(), False, True)
@@ -1131,11 +1149,7 @@ class CoreFunctionalityCog(commands.Cog):
         if option == "all":
             await self.bot.send_response(interaction, "The keyword `all` cannot be used as a configuration option.")
         else:
-            self.bot.config[option] = value
-            async with self.bot.db.acquire() as conn:
-                await conn.execute(
-                    "INSERT INTO config VALUES ($1, $2) ON CONFLICT (key) DO UPDATE SET value = $2", option, value
-                )
+            await self.bot.set_config(option, value)
             opt = tbb.clean_no_ctx(self.bot, interaction.guild, option, False, True)
             val = tbb.clean_no_ctx(self.bot, interaction.guild, value, False, True)
             line = f"Configuration option `{opt}` has been set to `{val}`."
@@ -1148,9 +1162,7 @@ class CoreFunctionalityCog(commands.Cog):
         those from working."""
         option = option.lower()
         if option in self.bot.config:
-            del self.bot.config[option]
-            async with self.bot.db.acquire() as conn:
-                await conn.execute("DELETE FROM config WHERE key = $1", option)
+            await self.bot.unset_config(option)
             opt = tbb.clean_no_ctx(self.bot, interaction.guild, option, False, True)
             line = f"Configuration option `{opt}` has been unset."
             await self.bot.send_response(interaction, line if len(line) < 2000 else f"{line[:1996]}...")
@@ -1164,26 +1176,24 @@ class CoreFunctionalityCog(commands.Cog):
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /config get — shows existing config keys and 'all'."""
-        keys = ["all", *self.bot.config]
-        return [app_commands.Choice(name=key, value=key) for key in keys if current.lower() in key.lower()][:25]
+        keys = self.bot.config_search.search(current)
+        if "all".startswith(current.lower()):
+            keys = ["all", *keys][:25]
+        return [app_commands.Choice(name=key, value=key) for key in keys]
 
     @slash_config_set.autocomplete("option")
     async def slash_config_set_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /config set — shows existing config keys."""
-        return [app_commands.Choice(name=key, value=key) for key in self.bot.config if current.lower() in key.lower()][
-            :25
-        ]
+        return [app_commands.Choice(name=key, value=key) for key in self.bot.config_search.search(current)]
 
     @slash_config_unset.autocomplete("option")
     async def slash_config_unset_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /config unset — shows existing config keys."""
-        return [app_commands.Choice(name=key, value=key) for key in self.bot.config if current.lower() in key.lower()][
-            :25
-        ]
+        return [app_commands.Choice(name=key, value=key) for key in self.bot.config_search.search(current)]
 
     slash_command = app_commands.Group(
         name="command",
@@ -1204,13 +1214,13 @@ class CoreFunctionalityCog(commands.Cog):
         again. It will also add the command back into the list of commands shown by the help command and re-enable
         the viewing of its help text given the command has help text, and it has not otherwise been hidden."""
         if command_name in self.bot.all_commands:
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if self.bot.all_commands[command_name].enabled:
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is already enabled.")
             else:
                 self.bot.all_commands[command_name].enabled = True
-                await self._command_set_state(self.bot.all_commands[command_name], 0 if state == 2 else 1)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 0 if state == 2 else 1)
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is now enabled.")
         else:
@@ -1224,7 +1234,7 @@ class CoreFunctionalityCog(commands.Cog):
         list of commands shown by the help command. The command's help text will also not be viewable. Core
         commands cannot be disabled. Disabled commands can be re-enabled with the `/command enable` command."""
         if command_name in self.bot.all_commands:
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if command_name in self.bot.help and self.bot.help[command_name].category.lower() == "core":
                 await self.bot.send_response(interaction, "Core commands cannot be disabled.")
             else:
@@ -1233,7 +1243,7 @@ class CoreFunctionalityCog(commands.Cog):
                     await self.bot.send_response(interaction, f"The `{name}` command is already disabled.")
                 else:
                     self.bot.all_commands[command_name].enabled = False
-                    await self._command_set_state(self.bot.all_commands[command_name], 2 if state == 0 else 3)
+                    await self.bot.set_command_state(self.bot.all_commands[command_name], 2 if state == 0 else 3)
                     name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                     await self.bot.send_response(interaction, f"The `{name}` command is now disabled.")
         else:
@@ -1247,13 +1257,13 @@ class CoreFunctionalityCog(commands.Cog):
         command. This will add the command back into the list of commands shown by the help command. This
         will not re-enable the command if it has been disabled."""
         if command_name in self.bot.all_commands:
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if not self.bot.all_commands[command_name].hidden:
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is already shown.")
             else:
                 self.bot.all_commands[command_name].hidden = False
-                await self._command_set_state(self.bot.all_commands[command_name], 0 if state == 1 else 2)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 0 if state == 1 else 2)
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is now shown.")
         else:
@@ -1267,51 +1277,59 @@ class CoreFunctionalityCog(commands.Cog):
         not disable the viewing of the help text for the command if someone already knows its name.
         Commands which have been hidden can be un-hidden with the `/command show` command."""
         if command_name in self.bot.all_commands:
-            state = await self._command_get_state(self.bot.all_commands[command_name])
+            state = self.bot.get_command_state(self.bot.all_commands[command_name])
             if self.bot.all_commands[command_name].hidden:
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is already hidden.")
             else:
                 self.bot.all_commands[command_name].hidden = True
-                await self._command_set_state(self.bot.all_commands[command_name], 1 if state == 0 else 3)
+                await self.bot.set_command_state(self.bot.all_commands[command_name], 1 if state == 0 else 3)
                 name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
                 await self.bot.send_response(interaction, f"The `{name}` command is now hidden.")
         else:
             name = tbb.clean_no_ctx(self.bot, interaction.guild, command_name, False, True)
             await self.bot.send_response(interaction, f"No `{name}` command found.")
 
+    def _command_choices(
+        self, current: str, predicate: Callable[[commands.Command], bool]
+    ) -> list[app_commands.Choice[str]]:
+        """Autocomplete choices for top level prefix commands matching what is being typed and the predicate."""
+        names = self.bot.command_search.search(
+            current, predicate=lambda name: name in self.bot.all_commands and predicate(self.bot.all_commands[name])
+        )
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
     @slash_command_enable.autocomplete("command_name")
     async def slash_command_enable_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /command enable — shows disabled commands."""
-        names = sorted({cmd.name for cmd in self.bot.all_commands.values() if not cmd.enabled})
-        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
+        return self._command_choices(current, lambda cmd: not cmd.enabled)
 
     @slash_command_disable.autocomplete("command_name")
     async def slash_command_disable_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /command disable — shows enabled non-core commands."""
-        core = {n for n, h in self.bot.help.items() if h.category.lower() == "core"}
-        names = sorted({cmd.name for cmd in self.bot.all_commands.values() if cmd.enabled and cmd.name not in core})
-        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
+
+        def is_core(name: str) -> bool:
+            return name in self.bot.help and self.bot.help[name].category.lower() == "core"
+
+        return self._command_choices(current, lambda cmd: cmd.enabled and not is_core(cmd.name))
 
     @slash_command_show.autocomplete("command_name")
     async def slash_command_show_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /command show — shows hidden commands."""
-        names = sorted({cmd.name for cmd in self.bot.all_commands.values() if cmd.hidden})
-        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
+        return self._command_choices(current, lambda cmd: cmd.hidden)
 
     @slash_command_hide.autocomplete("command_name")
     async def slash_command_hide_autocomplete(
         self, _interaction: Interaction, current: str
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for /command hide — shows non-hidden commands."""
-        names = sorted({cmd.name for cmd in self.bot.all_commands.values() if not cmd.hidden})
-        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
+        return self._command_choices(current, lambda cmd: not cmd.hidden)
 
     @app_commands.command(name="help", description="Shows help info for the bot or a specific command.")
     @app_commands.describe(command="Command to show help for, or omit for the full command list.")
@@ -1333,5 +1351,4 @@ class CoreFunctionalityCog(commands.Cog):
     @slash_help.autocomplete("command")
     async def slash_help_autocomplete(self, _interaction: Interaction, current: str) -> list[app_commands.Choice[str]]:
         """Autocomplete for /help — shows all available help entries."""
-        names = sorted({*self.bot.help, *self.bot.slash_help})
-        return [app_commands.Choice(name=name, value=name) for name in names if current.lower() in name.lower()][:25]
+        return [app_commands.Choice(name=name, value=name) for name in self.bot.help_search.search(current)]
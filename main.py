@@ -5,16 +5,13 @@ import os  # To check directory contents and make directories.
 import requests
 import yaml
 from discord import Intents
-from discord.ext import commands  # For command functionality.
 
 import travus_bot_base as tbb  # TBB functions and classes.
 
 
-async def get_prefix(bot_object, message):
-    """This function is used by the bot to work with pings, and optionally a prefix."""
-    if bot_object.prefix is not None:
-        return commands.when_mentioned_or(bot_object.prefix)(bot_object, message)  # There is a prefix set.
-    return commands.when_mentioned(bot_object, message)  # There is no prefix set.
+def get_prefix(bot_object, message):
+    """This function is used by the bot to work with pings, and the global and server prefixes if set."""
+    return bot_object.prefixes_for(message.guild.id if message.guild is not None else None)
 
 
 async def main(logger: logging.Logger):
@@ -33,7 +30,17 @@ async def main(logger: logging.Logger):
         if not all(element in config and config[element] is not None for element in config_options):
             logger.critical("Config was found, but lacked required options. Please run one_time_setup.py first.")
             exit(5)
-    for key in config_options:
+    pool_options = [  # Optional connection pool tuning, defaults are used for unset options.
+        "pg_pool_min_size",
+        "pg_pool_max_size",
+        "pg_statement_cache_size",
+        "pg_max_inactive_lifetime",
+        "pg_command_timeout",
+        "pg_acquire_timeout",
+        "pg_slow_query_threshold",
+    ]
+    other_options = ["metrics_port"]  # Optional port to serve command metrics on localhost, disabled if unset.
+    for key in config_options + pool_options + other_options:
         env_value = os.environ.get(key.upper())
         if env_value is not None:
             config[key] = env_value
@@ -46,15 +53,28 @@ async def main(logger: logging.Logger):
         exit(2)
 
     intent = Intents.all()
-    db_credentials = tbb.DatabaseCredentials(
-        user=config["pg_user"],
-        password=config["pg_password"],
-        host=config["pg_address"],
-        port=config["pg_port"],
-        database=config["pg_database"],
-    )
+    try:
+        db_credentials = tbb.DatabaseCredentials(
+            user=config["pg_user"],
+            password=config["pg_password"],
+            host=config["pg_address"],
+            port=config["pg_port"],
+            database=config["pg_database"],
+            min_size=config.get("pg_pool_min_size"),
+            max_size=config.get("pg_pool_max_size"),
+            statement_cache_size=config.get("pg_statement_cache_size"),
+            max_inactive_lifetime=config.get("pg_max_inactive_lifetime"),
+            command_timeout=config.get("pg_command_timeout"),
+            acquire_timeout=config.get("pg_acquire_timeout"),
+            slow_query_threshold=config.get("pg_slow_query_threshold"),
+        )
+    except ValueError as e:
+        logger.critical(f"Error: Invalid database pool options. {e}")
+        exit(5)
     discord_token = config["discord_token"]
-    bot = tbb.TravusBotBase(db_credentials, command_prefix=get_prefix, intents=intent)
+    bot = tbb.TravusBotBase(
+        db_credentials, command_prefix=get_prefix, intents=intent, metrics_port=config.get("metrics_port")
+    )
     await bot.start(discord_token)
     await asyncio.sleep(0.25)  # Asyncio being weird, see https://github.com/python/cpython/issues/83413
 
@@ -1,6 +1,5 @@
 from contextlib import redirect_stdout  # To return eval output.
 from copy import copy  # For copying context.
-from io import StringIO  # To return eval output.
 from textwrap import indent  # To format eval output.
 from traceback import format_exc  # To return eval output.
 
@@ -33,11 +32,15 @@ async def setup(bot: tbb.TravusBotBase):
     bot.add_command_help(DevCog.eval, "Dev", None, ["return 4 + 7", "return channel.id"])
     bot.add_command_help(DevCog.sudo, "Dev", None, ["travus bot_room help", "118954681241174016 about dev"])
     bot.add_command_help(DevCog.roleids, "Dev", {"perms": ["Manage Roles"]}, ["all bot_room", "all dm", "muted"])
-    bot.add_command_help(DevCog.lasterror, "Dev", {"perms": ["Administrator"]}, [""])
+    bot.add_command_help(DevCog.lasterror, "Dev", {"perms": ["Administrator"]}, ["", "2", "KeyError"])
     bot.add_command_help(DevCog.ping, "Dev", None, [""])
     bot.add_command_help(DevCog.sync, "Dev", None, ["", "guild"])
+    bot.add_command_help(DevCog.pool, "Dev", None, [""])
+    bot.add_command_help(DevCog.queries, "Dev", None, ["", "25"])
+    bot.add_command_help(DevCog.stats, "Dev", None, ["", "slash"])
+    bot.add_command_help(DevCog.lag, "Dev", None, ["", "1"])
     bot.add_command_help(DevCog.slash_ping, "Dev", None, [""])
-    bot.add_command_help(DevCog.slash_lasterror, "Dev", None, [""])
+    bot.add_command_help(DevCog.slash_lasterror, "Dev", None, ["", "page:2", "search:KeyError"])
     bot.add_command_help(DevCog.slash_roleids, "Dev", None, ["", "@Moderator", "@Moderator #bot-room"])
     bot.add_command_help(DevCog.slash_channelids, "Dev", None, ["", "#general", "#general #bot-room"])
     bot.add_command_help(
@@ -106,7 +109,6 @@ class DevCog(commands.Cog):
         """This command evaluates code sent via Discord, and sends back any return value and output in a discord python
         code block. This can be single-line or multi-line via a code block. If the output is too long to fit in a
         discord message the response will be uploaded as a text file, online paste, or similar."""
-        stdout = StringIO()
         env = {
             "bot": self.bot,
             "ctx": ctx,
@@ -123,21 +125,18 @@ class DevCog(commands.Cog):
             response = f"{e.__class__.__name__}: {e}"
             return await self.bot.send_long_text(ctx, response)
         function = env["function"]
-        try:
-            with redirect_stdout(stdout):
-                ret = await function()
-        except Exception:
-            value = stdout.getvalue()
-            response = f"{value}{format_exc()}"
-        else:
-            value = stdout.getvalue()
-            if ret is None:
-                response = value
+        with tbb.AttachmentWriter("output.txt", tbb.upload_limit(ctx.guild)) as output:  # Output is streamed into it.
+            try:
+                with redirect_stdout(output):  # type: ignore[type-var]  # Only write and flush are used.
+                    ret = await function()
+            except Exception:
+                output.write(format_exc())
             else:
-                self._last_result = ret
-                response = f"{value}{ret}"
-        if response:
-            await self.bot.send_long_text(ctx, response)
+                if ret is not None:
+                    self._last_result = ret
+                    output.write(str(ret))
+            if output.size:
+                await self.bot.send_long_text(ctx, output)
 
     @commands.is_owner()
     @commands.guild_only()
@@ -172,8 +171,7 @@ class DevCog(commands.Cog):
         if isinstance(role, str) and role.lower() == "all":
             for _role in reversed(ctx.guild.roles):
                 paginator.add_line(f"{_role.name}: {_role.id}")
-            for page in paginator.pages:
-                await tbb.send_in_global_channel(ctx, resp_channel, page)
+            await tbb.send_in_global_channel(ctx, resp_channel, paginator.pages)
         elif isinstance(role, str):
             raise commands.BadArgument("Role could not be parsed and string is not 'all'.")
         else:
@@ -198,8 +196,7 @@ class DevCog(commands.Cog):
         if isinstance(channel, str) and channel.lower() == "all":
             for _channel in ctx.guild.channels:
                 paginator.add_line(f"{_channel.name}: {_channel.id}")
-            for page in paginator.pages:
-                await tbb.send_in_global_channel(ctx, resp_channel, page)
+            await tbb.send_in_global_channel(ctx, resp_channel, paginator.pages)
         elif isinstance(channel, str):
             raise commands.BadArgument("Channel could not be parsed and string is not 'all'.")
         else:
@@ -208,13 +205,17 @@ class DevCog(commands.Cog):
             await tbb.send_in_global_channel(ctx, resp_channel, response)
 
     @commands.has_permissions(administrator=True)
-    @commands.command(name="lasterror", aliases=["lerror", "_error"])
-    async def lasterror(self, ctx: commands.Context):
-        """This command shows the last error the bot has encountered. Errors encountered while loading modules will
-        not be listed by this command. To see the last error encountered while loading modules see the `module error`
-        command. This command retains this information until another error replaces it, or the bot shuts down."""
-        if self.bot.last_error:
-            await ctx.send(tbb.clean(ctx, self.bot.last_error))
+    @commands.command(name="lasterror", aliases=["lerror", "_error"], usage="(PAGE) (SEARCH)")
+    async def lasterror(self, ctx: commands.Context, page: int | None = None, *, search: str | None = None):
+        """This command shows the most recent errors the bot has encountered, along with how many times they occurred.
+        The errors are paged, and can be searched by command name, error type or message. Errors encountered while
+        loading modules will not be listed by this command, to see those see the `module error` command. The most
+        recent errors are kept until the bot shuts down."""
+        errors = self.bot.format_errors(("prefix", "slash", "other"), page or 1, search)
+        if errors:
+            await ctx.send(tbb.clean(ctx, errors)[:2000])
+        elif search:
+            await ctx.send("No errors matched the search.")
         else:
             await ctx.send("There have not been any errors since the last restart.")
 
@@ -234,30 +235,118 @@ class DevCog(commands.Cog):
                 await ctx.send("Cannot sync to guild from DMs.")
                 return
             await ctx.send("Syncing command tree to guild, this may take a moment...")
-            await self.bot.tree.sync(guild=ctx.guild)
+            await self.bot.sync_tree(ctx.guild, force=True)
             await ctx.send(f"Command tree synced to guild `{ctx.guild.name}`.")
         else:
             await ctx.send("Syncing command tree globally, this may take a moment...")
-            await self.bot.tree.sync()
+            await self.bot.sync_tree(force=True)
             await ctx.send("Command tree synced globally.")
 
+    @commands.is_owner()
+    @commands.command(name="pool", aliases=["dbpool"])
+    async def pool(self, ctx: commands.Context):
+        """This command shows statistics for the database connection pool, such as how many connections are in use or
+        idle, how many callers are waiting for a connection, and how long they have had to wait. Useful for finding out
+        if commands are being slowed down by the pool being too small."""
+        stats = self.bot.db.stats()
+        lines = [
+            f"Connections: {stats['in_use']} in use, {stats['idle']} idle (min {stats['min_size']}, max "
+            f"{stats['max_size']})",
+            f"Waiting: {stats['waiting']}",
+            f"Acquires: {stats['acquires']} ({stats['timeouts']} timed out)",
+            f"Wait time: {stats['wait_summary']}",
+        ]
+        for bound, count in stats["wait_histogram"].items():
+            if count:  # Only list buckets that have samples.
+                lines.append(f"  {'above largest bucket' if bound == '+Inf' else f'<={bound * 1000:g}ms'}: {count}")
+        await self.bot.send_long_text(ctx, "\n".join(lines))
+
+    @commands.is_owner()
+    @commands.command(name="queries", aliases=["slowqueries"], usage="(NUMBER OF STATEMENTS)")
+    async def queries(self, ctx: commands.Context, count: int = 10):
+        """This command shows the database statements that have taken the most time in total since the bot started,
+        along with how many times they ran, how many failed, and their latency. It also shows how much database time
+        each command or module has used. Statements are grouped with whitespace collapsed and literals replaced."""
+        queries = self.bot.db.queries
+        if not queries.statements:
+            await ctx.send("No database queries have been made since the last restart.")
+            return
+        lines = ["Statements by total time:"]
+        for statement, histogram in queries.top(max(count, 1)):
+            lines.append(
+                f"{histogram.total:.2f}s total, {histogram.count} runs, {queries.errors.get(statement, 0)} failed, "
+                f"{histogram.summary()}\n  {statement}"
+            )
+        lines.append("\nCommands and modules by total time:")
+        for caller, histogram in sorted(queries.callers.items(), key=lambda item: item[1].total, reverse=True):
+            lines.append(f"{caller}: {histogram.total:.2f}s total, {histogram.count} queries, {histogram.summary()}")
+        await self.bot.send_long_text(ctx, "\n".join(lines))
+
+    @commands.is_owner()
+    @commands.command(name="stats", aliases=["metrics"], usage="(prefix/slash)")
+    async def stats(self, ctx: commands.Context, kind: str | None = None):
+        """This command shows how many times each command has been used since the bot started, how many of those
+        failed, and how long they took, with the slowest 99th percentile first. Use `prefix` or `slash` to only show
+        one kind of command. The same metrics can be scraped by Prometheus if the metrics port option is set."""
+        metrics = self.bot.command_metrics
+        rows = sorted(
+            (key for key in metrics.latency if kind is None or key[0] == kind.lower()),
+            key=lambda key: (metrics.latency[key].percentile(99), metrics.latency[key].max),
+            reverse=True,
+        )
+        if not rows:
+            await ctx.send("No commands have been used since the last restart.")
+            return
+        lines = [
+            f"{'/' if key[0] == 'slash' else ''}{key[1]}: {metrics.latency[key].count} uses, "
+            f"{metrics.errors.get(key, 0)} failed, {metrics.latency[key].summary()}"
+            for key in rows
+        ]
+        await self.bot.send_long_text(ctx, "\n".join(lines))
+
+    @commands.is_owner()
+    @commands.command(name="lag", aliases=["looplag"], usage="(BLOCK NUMBER)")
+    async def lag(self, ctx: commands.Context, block: int | None = None):
+        """This command shows how late the event loop has been running tasks since the bot started, and lists the most
+        recent times something blocked the loop for too long, along with the module responsible. Give the number of a
+        block to see the stack of the code that blocked the loop. Blocking the loop delays everything, including the
+        heartbeat to Discord."""
+        monitor = self.bot.loop_monitor
+        if block is not None:
+            if not 1 <= block <= len(monitor.blocks):
+                raise commands.BadArgument("There is no block with this number.")
+            when, seconds, owner, location, stack = monitor.blocks[-block]
+            await self.bot.send_long_text(
+                ctx, f"[{when}] Blocked {seconds * 1000:.0f}ms by {owner} at {location}\n{stack}"
+            )
+            return
+        lines = [f"Loop lag: {monitor.lag.summary()}", f"Blocks over {monitor.threshold * 1000:g}ms, latest first:"]
+        for number, (when, seconds, owner, location, _) in enumerate(reversed(monitor.blocks), 1):
+            lines.append(f"{number}. [{when}] {seconds * 1000:.0f}ms by {owner} at {location}")
+        if not monitor.blocks:
+            lines.append("None since the last restart.")
+        await self.bot.send_long_text(ctx, "\n".join(lines))
+
     @app_commands.command(name="ping", description="Shows the bot's latency to Discord.")
     async def slash_ping(self, interaction: Interaction):
         """This command shows the latency from the bot to Discord's servers. Can be used to check if the bot is
         responsive."""
         await self.bot.send_response(interaction, f"Pong! ({round(self.bot.latency * 1000, 2)}ms)")
 
-    @app_commands.command(name="lasterror", description="Shows the last error the bot encountered.")
+    @app_commands.command(name="lasterror", description="Shows the most recent errors the bot encountered.")
     @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
-    async def slash_lasterror(self, interaction: Interaction):
-        """This command shows the last error the bot has encountered. Errors encountered while loading modules will
-        not be listed by this command. To see the last error encountered while loading modules see the `/module
-        lasterror` command. This command retains this information until another error replaces it, or the bot shuts
-        down."""
-        if self.bot.last_error:
-            error = tbb.clean_no_ctx(self.bot, interaction.guild, self.bot.last_error)
-            await self.bot.send_response(interaction, error)
+    @app_commands.describe(page="Page of errors to show.", search="Only show errors containing this text.")
+    async def slash_lasterror(self, interaction: Interaction, page: int = 1, search: str | None = None):
+        """This command shows the most recent errors the bot has encountered, along with how many times they occurred.
+        The errors are paged, and can be searched by command name, error type or message. Errors encountered while
+        loading modules will not be listed by this command, to see those see the `/module lasterror` command. The most
+        recent errors are kept until the bot shuts down."""
+        errors = self.bot.format_errors(("prefix", "slash", "other"), page, search)
+        if errors:
+            await self.bot.send_response(interaction, tbb.clean_no_ctx(self.bot, interaction.guild, errors)[:2000])
+        elif search:
+            await self.bot.send_response(interaction, "No errors matched the search.")
         else:
             await self.bot.send_response(interaction, "There have not been any errors since the last restart.")
 
@@ -282,12 +371,10 @@ class DevCog(commands.Cog):
             paginator.add_line(f"{role.name}: {role.id}")
         if output_channel:
             await interaction.response.defer(ephemeral=self.bot.ephemeral)
-            for page in paginator.pages:
-                await output_channel.send(page)
+            await self.bot.send_pages(output_channel, paginator.pages)
             await self.bot.send_response(interaction, f"Sent to {output_channel.mention}.")
         else:
-            for page in paginator.pages:
-                await self.bot.send_response(interaction, page)
+            await self.bot.send_pages(interaction, paginator.pages)
 
     @app_commands.command(name="channelids", description="Shows channel IDs for one or all channels in the server.")
     @app_commands.guild_only()
@@ -314,9 +401,7 @@ class DevCog(commands.Cog):
             paginator.add_line(f"{name}: {channel.id}")
         if output_channel:
             await interaction.response.defer(ephemeral=self.bot.ephemeral)
-            for page in paginator.pages:
-                await output_channel.send(page)
+            await self.bot.send_pages(output_channel, paginator.pages)
             await self.bot.send_response(interaction, f"Sent to {output_channel.mention}.")
         else:
-            for page in paginator.pages:
-                await self.bot.send_response(interaction, page)
+            await self.bot.send_pages(interaction, paginator.pages)
@@ -20,6 +20,15 @@ def main():
         "pg_password": "postgres",
         "pg_port": "5432",
         "pg_database": "discord_bot",
+        # Optional connection pool tuning, see the README. Unset options use their defaults.
+        "pg_pool_min_size": None,
+        "pg_pool_max_size": None,
+        "pg_statement_cache_size": None,
+        "pg_max_inactive_lifetime": None,
+        "pg_command_timeout": None,
+        "pg_acquire_timeout": None,
+        "pg_slow_query_threshold": None,
+        "metrics_port": None,
     }
     clr()
     print("Setting up bot...")
@@ -0,0 +1,469 @@
+import argparse  # To parse command line options.
+import asyncio  # To run the bot offline.
+import gc  # To keep garbage collection out of timings.
+import json  # To read and write benchmark results.
+import os  # To locate the baseline.
+import sys  # To exit with the result.
+from collections.abc import Callable  # For type hints.
+from functools import partial  # To build benchmark cases.
+from inspect import isawaitable  # To time both sync and async benchmark cases.
+from itertools import cycle  # To spread search benchmarks over many queries.
+from random import Random  # To generate names for search benchmarks.
+from re import compile as re_cmp  # To clean text the way it was cleaned before.
+from re import findall  # To clean text the way it was cleaned before.
+from tempfile import TemporaryDirectory  # To hold the module files of the module index benchmarks.
+from time import perf_counter  # To time benchmark cases.
+from typing import Any  # For type hints.
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import travus_bot_base as tbb  # TBB functions and classes.
+from tools import fakes  # Offline bot, server and database.
+
+BASELINE = os.path.join(fakes.ROOT, "tools", "bench_baseline.json")
+MIN_TIME = 0.05  # Minimum time in seconds each benchmark case is repeated for per round.
+ROUNDS = 5  # Rounds each case is timed for, the fastest is kept.
+THRESHOLD = 1.25  # Default slowdown compared to baseline at which a benchmark case is flagged.
+THREAD_MEMBERS = 1000  # Members of the private thread used to benchmark thread membership checks.
+DB_LATENCY = 0.001  # Seconds each database round trip takes, about that of a database on the same network.
+SYNTHETIC_COMMANDS = 1000  # Commands whose states are synced by the command state benchmarks.
+HELP_ENTRIES = 2000  # Commands with help entries added to the bot for the large help benchmarks.
+HELP_CATEGORIES = 40  # Categories the commands of the large help benchmarks are spread over.
+SEARCH_NAMES = 10000  # Names in the search index benchmarks.
+SEARCH_QUERIES = 200  # Queries the search index benchmarks cycle through, one per call.
+MODULE_FILES = 500  # Module files in the modules directory the bot is given for the benchmarks.
+PREFIX_MESSAGES = 100000  # Messages whose context is got by each call of the prefix matching benchmarks.
+GUILD_PREFIX = "?"  # Prefix of the offline server in the prefix matching benchmarks.
+
+
+def synthetic_commands(count: int, prefix: str = "synthetic") -> list[commands.Command]:
+    """Returns commands named with the given prefix and a number, for benchmarks that need many commands."""
+
+    async def callback(_ctx: commands.Context):
+        """Synthetic command used by the benchmarks."""
+
+    return [commands.Command(callback, name=f"{prefix}_{i}") for i in range(count)]
+
+
+async def legacy_update_command_states(bot: tbb.TravusBotBase, command_list: list[commands.Command]):
+    """update_command_states as it was before states were synced in bulk, for comparison. It looked up the state of
+    every command with its own query in one transaction, and inserted a default state for each command without one."""
+    async with bot.db.acquire() as conn, conn.transaction():
+        for command in command_list:
+            name = bot._command_state_key(command)  # pylint: disable=protected-access
+            if await conn.fetchval("SELECT state FROM command_states WHERE command = $1;", name) is None:
+                await conn.execute("INSERT INTO command_states VALUES ($1, $2)", name, 0)
+
+
+async def legacy_get_prefix(bot: tbb.TravusBotBase, message: discord.Message) -> list[str]:
+    """main.get_prefix as it was before prefixes were cached per server, for comparison. It built the prefixes with
+    when_mentioned_or for every message, and servers had no prefixes of their own."""
+    if bot.prefix is not None:
+        return commands.when_mentioned_or(bot.prefix)(bot, message)
+    return commands.when_mentioned(bot, message)
+
+
+async def prefix_cases(bot: tbb.TravusBotBase, channel: discord.TextChannel) -> dict[str, Callable[[], Any]]:
+    """Returns the prefix matching benchmark cases. Each call gets the prefixes, or the context, of 100k messages, an
+    even mix of messages using the global prefix, the prefix of the server, either form of mentioning the bot, and
+    plain chat. The server is given its prefix, which it keeps."""
+    # pylint: disable=protected-access  # Sets the server prefix the way the database listener does.
+    bot._apply_cache_change("guild_prefixes", str(fakes.GUILD_ID), GUILD_PREFIX)
+    texts = [
+        f"{bot.prefix}ping",
+        f"{GUILD_PREFIX}ping",
+        f"<@{fakes.BOT_ID}> ping",
+        f"<@!{fakes.BOT_ID}> ping",
+        "Just chatting, nothing for the bot here.",
+    ]
+    messages = [
+        discord.Message(state=bot._connection, channel=channel, data=fakes.message_payload(channel.id, author, text))
+        for author in (fakes.OWNER_ID, fakes.USER_ID)
+        for text in texts
+    ]
+    repeats = PREFIX_MESSAGES // len(messages)
+
+    async def each_message(handle: Callable[[discord.Message], Any], legacy: bool):
+        """Handles every message, with the prefixes built by when_mentioned_or if legacy."""
+        current = bot.command_prefix
+        if legacy:
+            bot.command_prefix = legacy_get_prefix
+        try:
+            for _ in range(repeats):
+                for message in messages:
+                    await handle(message)
+        finally:
+            bot.command_prefix = current
+
+    return {
+        "get_prefix_100k": partial(each_message, bot.get_prefix, False),
+        "get_prefix_100k_legacy": partial(each_message, bot.get_prefix, True),
+        "get_context_100k": partial(each_message, bot.get_context, False),
+        "get_context_100k_legacy": partial(each_message, bot.get_context, True),
+    }
+
+
+def legacy_search(names: set[str], current: str) -> list[app_commands.Choice]:
+    """Autocomplete as it was before search indexes, for comparison. It sorted every name and checked each of them for
+    the query on every call."""
+    return [app_commands.Choice(name=name, value=name) for name in sorted(names) if current.lower() in name.lower()][
+        :25
+    ]
+
+
+def legacy_clean(
+    bot: tbb.TravusBotBase,
+    guild: discord.Guild | None,
+    text: str,
+    escape_markdown: bool = True,
+    replace_backticks: bool = False,
+) -> str:
+    """_clean as it was before it was rewritten on precompiled patterns with a single escape pass, for comparison."""
+    transformations: dict[str, str] = {}
+
+    def resolve_member(_id):
+        """Resolves user mentions."""
+        member = bot.get_user(_id)
+        return "@" + member.name if member else "@deleted-user"
+
+    transformations.update(
+        (f"<@{member_id}>", resolve_member(member_id)) for member_id in [int(x) for x in findall(r"<@!?(\d+)>", text)]
+    )
+    transformations.update(
+        (f"<@!{member_id}>", resolve_member(member_id)) for member_id in [int(x) for x in findall(r"<@!?(\d+)>", text)]
+    )
+
+    if guild:
+
+        def resolve_channel(_id):
+            """Resolves channel mentions."""
+            ch = guild.get_channel(_id)
+            return f"<#{_id}>", ("#" + ch.name if ch else "#deleted-channel")
+
+        def resolve_role(_id):
+            """Resolves role mentions."""
+            role = guild.get_role(_id)
+            return "@" + role.name if role else "@deleted-role"
+
+        transformations.update(resolve_channel(channel) for channel in [int(x) for x in findall(r"<#(\d+)>", text)])
+        transformations.update(
+            (f"<@&{role_id}>", resolve_role(role_id)) for role_id in [int(x) for x in findall(r"<@&(\d+)>", text)]
+        )
+
+    def repl(obj):
+        """Function used in regex substitution."""
+        return transformations.get(obj.group(0), "")
+
+    pattern = re_cmp("|".join(transformations.keys()))
+    result = pattern.sub(repl, text)
+    if escape_markdown:
+        result = discord.utils.escape_markdown(result)
+    if replace_backticks:
+        result = result.replace("`", "ˋ")
+    return discord.utils.escape_mentions(result)
+
+
+def clean_cases(bot: tbb.TravusBotBase, guild: discord.Guild) -> dict[str, Callable[[], Any]]:
+    """Returns the text cleaning benchmark cases, on 1 KB and 1 MB of text with and without mentions and links. Text is
+    cleaned with markdown escaped and backticks replaced, both with the current and the previous implementation. The
+    1 KB texts are also cleaned with URLs unembedded, against cleaning and then unembedding them."""
+    mentions = (
+        f"Hey <@{fakes.OWNER_ID}>, <@!{fakes.USER_ID}> asked in <#{fakes.CHANNEL_ID}> if <@&{fakes.ADMIN_ROLE_ID}> "
+        "can look at https://example.com/some_page?query=**value** and <https://example.org/a_b>. @everyone\n"
+    )
+    markdown = (
+        "**Bold** and __underlined__ text with *stars*, ~~strikes~~, ||spoilers|| and `code`.\n> Quoted\n- Item\n"
+    )
+    cases: dict[str, Callable[[], Any]] = {}
+    for kind, line in (("mentions", mentions), ("markdown", markdown)):
+        for size_name, size in (("1kb", 1 << 10), ("1mb", 1 << 20)):
+            text = (line * (size // len(line) + 1))[:size]
+            cases[f"clean_{size_name}_{kind}"] = partial(tbb.clean_no_ctx, bot, guild, text, True, True)
+            cases[f"clean_{size_name}_{kind}_legacy"] = partial(legacy_clean, bot, guild, text, True, True)
+        text = (line * ((1 << 10) // len(line) + 1))[: 1 << 10]
+        cases[f"clean_unembed_1kb_{kind}"] = partial(tbb.clean_no_ctx, bot, guild, text, True, True, True)
+        cases[f"clean_unembed_1kb_{kind}_legacy"] = lambda text=text: tbb.unembed_urls(
+            legacy_clean(bot, guild, text, True, True)
+        )  # Cleaned, then unembedded in a second pass.
+    return cases
+
+
+def search_cases() -> dict[str, Callable[[], Any]]:
+    """Returns the search index benchmark cases. Each call answers the next of a fixed set of queries, which are parts
+    of random names of a large index, as typed for autocomplete."""
+    rng = Random(0)  # Seeded, so every run searches the same names.
+    names = {"".join(rng.choices("abcdefghijklmnopqrstuvwxyz_", k=rng.randint(6, 20))) for _ in range(SEARCH_NAMES)}
+    queries: list[str] = []
+    ordered = sorted(names)
+    for sample in (ordered[rng.randrange(len(ordered))] for _ in range(SEARCH_QUERIES)):
+        start = rng.randint(0, len(sample) - 1) if rng.random() < 0.5 else 0  # Half prefixes, half infixes.
+        queries.append(sample[start : start + rng.randint(1, 5)])
+    index, index_queries, legacy_queries = tbb.SearchIndex(names), cycle(queries), cycle(queries)
+
+    def add_discard():
+        """Adds a name to the index and removes it again."""
+        index.add("search_benchmark_name")
+        index.discard("search_benchmark_name")
+
+    return {
+        "search_index": lambda: [
+            app_commands.Choice(name=name, value=name) for name in index.search(next(index_queries))
+        ],
+        "search_index_legacy": lambda: legacy_search(names, next(legacy_queries)),
+        "search_index_add_discard": add_discard,
+    }
+
+
+def legacy_module_load_autocomplete(bot: tbb.TravusBotBase, path: str, current: str) -> list[app_commands.Choice]:
+    """The /module load autocomplete as it was before the module index, for comparison. It listed the modules directory
+    on every call."""
+    loaded = {mod.replace("modules.", "") for mod in bot.extensions if mod != "core_commands"}
+    available = [
+        mod.replace(".py", "")
+        for mod in os.listdir(path)
+        if mod.endswith(".py") and mod.replace(".py", "") not in loaded
+    ]
+    return [app_commands.Choice(name=name, value=name) for name in available if current.lower() in name.lower()][:25]
+
+
+async def tree_sync_checks(bot: tbb.TravusBotBase) -> dict[str, str | None]:
+    """Syncs the slash command tree of an offline bot the ways sync_tree is used, and returns each check with what
+    went wrong, or None if it passed. The tree is left synced."""
+    http, pool = bot.http, bot.db.pool
+    assert isinstance(http, fakes.FakeHTTP) and isinstance(pool, fakes.FakePool)
+    upserts = "PUT /applications/{application_id}/commands"
+    results: dict[str, str | None] = {}
+
+    async def check(name: str, expected_requests: int, expect_sync: bool = True, *, delay: float | None = None):
+        """Syncs the global tree, directly or debounced, and checks the upserts it made and the hash it stored."""
+        start, start_trips = http.requests[upserts], pool.round_trips
+        try:
+            synced = await (bot.sync_tree() if delay is None else bot.request_tree_sync(delay))
+        except discord.HTTPException as e:
+            results[name] = f"raised {e!r}"
+            return
+        requests = http.requests[upserts] - start
+        if requests != expected_requests or synced != expect_sync:
+            results[name] = f"{requests} requests, synced {synced}, expected {expected_requests} and {expect_sync}"
+        elif await bot.tree_needs_sync() or (pool.round_trips > start_trips) != expect_sync:
+            results[name] = "hash of the synced tree was not stored" if expect_sync else "hash was stored again"
+        else:
+            results[name] = None
+
+    async def callback(_interaction: discord.Interaction):
+        """Slash command added to change the tree."""
+
+    extra = app_commands.Command(name="tree_sync_check", description="Changes the tree.", callback=callback)
+    await check("tree_sync_check_first", 1)
+    await check("tree_sync_check_unchanged", 0, False)
+    bot.tree.add_command(extra)
+    await check("tree_sync_check_changed", 1)
+    bot.tree.remove_command(extra.name)
+    http.upsert_rate_limits, http.retry_after = 2, 0.0
+    await check("tree_sync_check_rate_limited", 3)
+    bot.tree.add_command(extra)
+    http.upsert_rate_limits, http.retry_after = 1, None  # Retried after the sync's own backoff, of a second.
+    await check("tree_sync_check_http_429", 2)
+    bot.tree.remove_command(extra.name)
+    http.retry_after = 0.0
+    debounced = [check(f"tree_sync_check_debounced_{i}", 1, delay=0.01) for i in range(3)]  # Share one upsert.
+    await asyncio.gather(*debounced)
+    return results
+
+
+async def bench_cases(bot: tbb.TravusBotBase, modules_path: str) -> dict[str, Callable[[], Any]]:
+    """Returns the benchmark cases, run against an offline bot. The bot's module index is pointed at a directory of
+    synthetic module files, created in the given path. Cases may return an awaitable, which is awaited as part of the
+    case."""
+    # pylint: disable=protected-access  # Benchmarks target the internals of the help command on purpose.
+    channel = bot.get_channel(fakes.CHANNEL_ID)
+    assert isinstance(channel, discord.TextChannel) and bot.help_command is not None
+    message = discord.Message(
+        state=bot._connection, channel=channel, data=fakes.message_payload(channel.id, fakes.OWNER_ID, "!help")
+    )
+    ctx = await bot.get_context(message)
+    assert ctx.command is not None
+    mentions = f"{ctx.author.mention} {channel.mention} <@&{fakes.ADMIN_ROLE_ID}> @everyone"
+    text = f"Hi {mentions}, see https://example.com/a_b?c=**d** and [this](<https://e.com>) for `code`.\n" * 20
+    info = bot.help[ctx.command.qualified_name]
+    embed = info.make_help_embed(ctx)
+    help_command = bot.help_command.copy()
+    help_command.context = ctx
+
+    async def discard(*_args, **_kwargs):
+        """Stands in for sending the help output."""
+
+    help_command._deliver = discard  # type: ignore[method-assign]
+    help_command._deliver_pages = discard  # type: ignore[method-assign]
+    full_mapping = {com for com in bot.commands if com.enabled and not com.hidden}
+
+    async def command_list_uncached(mapping: set[commands.Command]):
+        """Renders the command list after clearing the help cache."""
+        bot.invalidate_help_cache()
+        await help_command._send_command_list(mapping)
+
+    def make_help_embed_uncached(help_info: tbb.TravusBotBase._HelpInfo) -> discord.Embed:
+        """Renders a help embed after clearing the embed it keeps."""
+        help_info._embed = None
+        return help_info.make_help_embed(ctx)
+
+    cases: dict[str, Callable[[], Any]] = {
+        "clean": lambda: tbb.clean(ctx, text),
+        "clean_no_ctx": lambda: tbb.clean_no_ctx(bot, ctx.guild, text, False, True),
+        "unembed_urls": lambda: tbb.unembed_urls(text),
+        "parse_time": lambda: tbb.parse_time("1w2d-3h4m5s"),
+        "check_embed_length": lambda: tbb.check_embed_length(ctx.author, embed),
+        "help_info": lambda: bot._HelpInfo(bot.get_bot_prefix, ctx.command, "Dev", {"perms": ["Admin"]}, [""]),
+        "make_help_embed": lambda: info.make_help_embed(ctx),
+        "command_list": lambda: help_command._send_command_list(full_mapping),
+        "command_list_uncached": partial(command_list_uncached, full_mapping),
+        "get_context": lambda: bot.get_context(message),  # Includes matching the prefixes of the message.
+    }
+    for i, command in enumerate(synthetic_commands(HELP_ENTRIES, "help_entry")):
+        bot.add_command(command)
+        bot.add_command_help(command, f"category {i % HELP_CATEGORIES}", {"perms": ["Manage Messages"]}, ["", "1"])
+    large_mapping = {com for com in bot.commands if com.enabled and not com.hidden}
+    cases["make_help_embed_uncached"] = partial(make_help_embed_uncached, info)
+    cases["command_list_large"] = partial(help_command._send_command_list, large_mapping)
+    cases["command_list_large_uncached"] = partial(command_list_uncached, large_mapping)
+    thread, thread_members = ctx.guild.get_thread(fakes.THREAD_ID), tbb.ThreadMemberCache()
+    assert thread is not None
+    members = [
+        {"id": str(thread.id), "user_id": str(fakes.USER_ID + i), "join_timestamp": fakes.TIMESTAMP, "flags": 0}
+        for i in range(THREAD_MEMBERS)
+    ]
+    bot.http.routes["GET /channels/{channel_id}/thread-members"] = lambda _route, _kwargs: members  # type: ignore
+    cases["thread_member_uncached"] = lambda: tbb.ThreadMemberCache().contains(thread, -1)
+    cases["thread_member_cached"] = lambda: thread_members.contains(thread, -1)
+    for i in range(MODULE_FILES):
+        with open(os.path.join(modules_path, f"mod_{i}.py"), "w", encoding="utf8") as module_file:
+            module_file.write(f"async def setup(bot):\n    bot.log.info('Loaded module {i}.')\n")
+    bot.module_index = tbb.ModuleIndex(modules_path)
+    bot.module_index.scan()
+    core: Any = bot.get_cog("CoreFunctionalityCog")
+    for name in dir(core):  # Autocomplete handlers don't use the interaction, so none is given.
+        if name.endswith("_autocomplete"):
+            cases[name.removeprefix("slash_")] = partial(getattr(core, name), None, "co")
+    cases["global_channel"] = partial(tbb.GlobalChannel().convert, ctx, channel.mention)  # Resolved without requests.
+    cases["global_text_channel"] = partial(tbb.GlobalTextChannel().convert, ctx, channel.mention)
+    cases["global_text_channel_id"] = partial(tbb.GlobalTextChannel().convert, ctx, str(channel.id))
+    cases["module_load_autocomplete_mod"] = partial(core.slash_module_load_autocomplete, None, "mod_4")
+    cases["module_load_autocomplete_mod_legacy"] = partial(legacy_module_load_autocomplete, bot, modules_path, "mod_4")
+    cases["module_index_scan"] = lambda: tbb.ModuleIndex(modules_path).scan()  # Hashes every file.
+    cases["module_index_rescan"] = bot.module_index.scan  # Nothing changed, so only the directory is listed.
+    cases["tree_sync_unchanged"] = bot.sync_tree  # Hashes the tree, which is already synced.
+
+    async def tree_sync_changed():
+        """Syncs the tree as if it changed since the last sync."""
+        bot.tree_hashes.pop("global", None)
+        await bot.sync_tree()
+
+    cases["tree_sync_changed"] = tree_sync_changed
+    cases.update(await prefix_cases(bot, channel))
+    cases.update(clean_cases(bot, ctx.guild))
+    cases.update(search_cases())
+    synthetic = synthetic_commands(SYNTHETIC_COMMANDS)
+    synthetic_names = [bot._command_state_key(command) for command in synthetic]
+
+    async def update_command_states_missing():
+        """Syncs the states of commands that have no stored state, as when they are first loaded."""
+        for name in synthetic_names:
+            bot.command_states.pop(name, None)
+        await bot.update_command_states(synthetic)
+
+    cases["update_command_states_missing"] = update_command_states_missing
+    cases["update_command_states_stored"] = partial(bot.update_command_states, synthetic)
+    cases["update_command_states_legacy"] = partial(legacy_update_command_states, bot, synthetic)
+    return cases
+
+
+async def time_case(case: Callable[[], Any], pool: fakes.FakePool) -> tuple[float, float]:
+    """Times a benchmark case, returning the seconds per call of the fastest round and the database round trips per
+    call. Each round repeats the case for at least the minimum benchmark time. Like timeit, garbage collection is
+    disabled while timing."""
+    best, round_trips = float("inf"), 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(ROUNDS):
+            calls, elapsed, start_trips = 0, 0.0, pool.round_trips
+            while elapsed < MIN_TIME:
+                start = perf_counter()
+                if isawaitable(result := case()):
+                    await result
+                elapsed += perf_counter() - start
+                calls += 1
+            best, round_trips = min(best, elapsed / calls), (pool.round_trips - start_trips) / calls
+            await asyncio.sleep(0)
+    finally:
+        gc.enable()
+    return best, round_trips
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Runs the benchmarks and compares them with the baseline. Returns the exit status, which is 1 if any case
+    regressed and the results were not saved as the new baseline."""
+    pool = fakes.FakePool(latency=DB_LATENCY)
+    bot = await fakes.make_bot(pool)
+    try:
+        checks = {name: failure for name, failure in (await tree_sync_checks(bot)).items() if args.only in name}
+        with TemporaryDirectory() as modules_path:
+            cases = {name: case for name, case in (await bench_cases(bot, modules_path)).items() if args.only in name}
+            results = {}
+            for name, case in cases.items():
+                seconds, round_trips = await time_case(case, pool)
+                results[name] = {"seconds": seconds, "round_trips": round_trips}
+    finally:
+        await bot.close()
+    try:
+        with open(BASELINE, encoding="utf8") as baseline_file:
+            baseline = json.load(baseline_file)
+    except FileNotFoundError:
+        baseline = {}
+    regressions = [name for name, failure in checks.items() if failure is not None]
+    for name, failure in checks.items():
+        print(f"{'!' if failure else ' '} {name:<40} {failure or 'passed'}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        ratio = result["seconds"] / base["seconds"] if base else None
+        flagged = base is not None and (ratio > args.threshold or result["round_trips"] > base["round_trips"])
+        regressions += [name] if flagged else []
+        print(
+            f"{'!' if flagged else ' '} {name:<40} {result['seconds'] * 1e6:>12.2f}us {result['round_trips']:>8g} "
+            f"round trips {f'{ratio:.2f}x baseline' if ratio is not None else 'no baseline'}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as output_file:
+            json.dump({"results": results, "regressions": regressions}, output_file, indent=2)
+    if args.save:
+        with open(BASELINE, "w", encoding="utf8") as baseline_file:
+            json.dump(baseline | results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Saved {len(results)} results as the new baseline.")
+        return 0
+    print(
+        f"Ran {len(checks)} checks and {len(results)} benchmarks, {len(regressions)} failed or slower than baseline: "
+        f"{', '.join(regressions) or 'none'}"
+    )
+    return 1 if regressions else 0
+
+
+def main():
+    """Parses the command line and runs the benchmarks."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.bench",
+        description="Benchmarks the helpers that run for most messages and commands, such as text cleaning, help "
+        "rendering, autocomplete and channel conversion, against an offline bot. Cases more than the threshold slower "
+        "than the checked in baseline, or making more database round trips, are flagged.",
+    )
+    parser.add_argument("--only", default="", help="only run cases with this in their name")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="slowdown to flag, default %(default)s")
+    parser.add_argument("--json", metavar="FILE", help="also write the results to this file as JSON")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+import asyncio  # To simulate latency and queue for pool connections.
+import os  # To run from the repository root, where the bot looks for core_commands.py and modules.
+from collections import Counter  # To count requests and round trips.
+from collections.abc import Callable  # For type hints.
+from itertools import count  # To hand out snowflakes.
+from types import SimpleNamespace  # To build error responses.
+from typing import Any  # For type hints.
+
+import discord
+from discord import app_commands
+from discord.http import HTTPClient, Route
+from discord.webhook.async_ import AsyncWebhookAdapter, async_context
+
+import main  # For the prefix function the bot is started with.
+import travus_bot_base as tbb  # TBB functions and classes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_ID = 100000000000000001
+OWNER_ID = 100000000000000002
+GUILD_ID = 100000000000000003
+ADMIN_ROLE_ID = 100000000000000004
+CHANNEL_ID = 100000000000000005  # The first text channel, further channels follow it.
+THREAD_ID = 100000000000000900  # A private thread in the first text channel.
+USER_ID = 100000000000001000  # The first member who is not the owner, further members follow it.
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+SETTINGS = {"prefix": "!", "delete_messages": "1", "ephemeral": "1", "core_commands_mode": "both"}
+_snowflakes = count(200000000000000000)
+
+
+def user_payload(user_id: int, name: str, bot: bool = False) -> dict[str, Any]:
+    """Function that returns a user payload as sent by Discord."""
+    return {"id": str(user_id), "username": name, "discriminator": "0", "global_name": None, "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, name: str, roles: list[int] | None = None) -> dict[str, Any]:
+    """Function that returns a server member payload as sent by Discord."""
+    return {
+        "user": user_payload(user_id, name, user_id == BOT_ID),
+        "roles": [str(role) for role in roles or []],
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def guild_payload(members: int = 100, channels: int = 10) -> dict[str, Any]:
+    """Function that returns the payload of a server with the bot, its owner and the given number of other members and
+    text channels. The owner and the bot have an administrator role."""
+    role = {"color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+    return {
+        "id": str(GUILD_ID),
+        "name": "Offline",
+        "owner_id": str(OWNER_ID),
+        "member_count": members + 2,
+        "features": [],
+        "emojis": [],
+        "stickers": [],
+        "roles": [
+            {**role, "id": str(GUILD_ID), "name": "@everyone", "position": 0, "permissions": "1071698660929"},
+            {**role, "id": str(ADMIN_ROLE_ID), "name": "Admin", "position": 1, "permissions": "8"},
+        ],
+        "channels": [
+            {"id": str(CHANNEL_ID + i), "type": 0, "name": f"channel-{i}", "position": i, "permission_overwrites": []}
+            for i in range(channels)
+        ],
+        "threads": [
+            {
+                "id": str(THREAD_ID),
+                "type": 12,
+                "name": "private-thread",
+                "parent_id": str(CHANNEL_ID),
+                "owner_id": str(OWNER_ID),
+                "message_count": 0,
+                "member_count": 0,
+                "thread_metadata": {"archived": False, "auto_archive_duration": 1440, "archive_timestamp": TIMESTAMP},
+            }
+        ],
+        "members": [
+            member_payload(BOT_ID, "Offline Bot", [ADMIN_ROLE_ID]),
+            member_payload(OWNER_ID, "owner", [ADMIN_ROLE_ID]),
+            *(member_payload(USER_ID + i, f"user-{i}") for i in range(members)),
+        ],
+    }
+
+
+def message_payload(channel_id: int, author_id: int, content: str, message_id: int | None = None) -> dict[str, Any]:
+    """Function that returns the payload of a message sent by a member of the offline server."""
+    return {
+        "id": str(message_id or next(_snowflakes)),
+        "channel_id": str(channel_id),
+        "guild_id": str(GUILD_ID),
+        "author": user_payload(author_id, "owner" if author_id == OWNER_ID else f"user-{author_id - USER_ID}"),
+        "member": {"roles": [str(ADMIN_ROLE_ID)] if author_id == OWNER_ID else [], "joined_at": TIMESTAMP},
+        "content": content,
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def interaction_payload(tree: app_commands.CommandTree, channel_id: int, author_id: int, text: str) -> dict[str, Any]:
+    """Function that returns the payload of a slash command used by a member of the offline server. The text is written
+    like the command would be typed, such as `help about`. Words after the command fill its parameters in order, the
+    last parameter taking the rest."""
+    name, *words = text.split()
+    command: Any = tree.get_command(name)
+    if command is None:
+        raise ValueError(f"No slash command called {name}.")
+    data: dict[str, Any] = {"id": str(next(_snowflakes)), "name": name, "type": 1}
+    options = data["options"] = []
+    while isinstance(command, app_commands.Group):
+        command = command.get_command(words.pop(0)) if words else None
+        if command is None:
+            raise ValueError(f"No subcommand given for {name}.")
+        options.append({"name": command.name, "type": 1, "options": []})
+        options = options[-1]["options"]
+    for index, param in enumerate(command.parameters[: len(words)]):
+        value = " ".join(words[index:]) if index == len(command.parameters) - 1 else words[index]
+        options.append({"name": param.display_name, "type": param.type.value, "value": value})
+    return {
+        "id": str(next(_snowflakes)),
+        "application_id": str(BOT_ID),
+        "type": 2,
+        "token": "offline",
+        "version": 1,
+        "guild_id": str(GUILD_ID),
+        "channel": {"id": str(channel_id), "type": 0},
+        "member": {
+            **member_payload(author_id, "owner" if author_id == OWNER_ID else f"user-{author_id - USER_ID}"),
+            "permissions": "8" if author_id == OWNER_ID else "1071698660929",
+        },
+        "app_permissions": "8",
+        "attachment_size_limit": discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES,
+        "locale": "en-US",
+        "guild_locale": "en-US",
+        "context": 0,
+        "data": data,
+    }
+
+
+class FakeHTTP(HTTPClient):
+    """HTTP client that answers requests with synthetic payloads instead of calling the REST API. Sent messages are
+    echoed back, slash command upserts are accepted, deletes succeed, and unknown GET routes are not found, unless a
+    handler is added for the route."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, latency: float = 0.0):
+        """Initialization function for FakeHTTP class. Every request takes the given latency in seconds."""
+        super().__init__(loop)
+        self.latency = latency
+        self.requests: Counter[str] = Counter()  # Route key, such as `POST /channels/{channel_id}/messages`, to count.
+        self.send_listeners: list[Callable[[], None]] = []  # Called for every request that is not a GET or DELETE.
+        self.upsert_rate_limits = 0  # Slash command upserts still to be answered with a 429.
+        self.retry_after: float | None = 0.0  # Retry after of those 429s, None if discord.py ran out of retries.
+        self.routes: dict[str, Callable[[Route, dict[str, Any]], Any]] = {
+            "POST /channels/{channel_id}/messages": self.echo_message,
+            "PATCH /channels/{channel_id}/messages/{message_id}": self.echo_message,
+            "PUT /applications/{application_id}/commands": self.upsert_commands,
+            "PUT /applications/{application_id}/guilds/{guild_id}/commands": self.upsert_commands,
+        }
+
+    @staticmethod
+    def echo_message(route: Route, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Returns the message a request sent, as if it was sent by the bot."""
+        content = (kwargs.get("json") or {}).get("content") or ""
+        return message_payload(int(route.channel_id or CHANNEL_ID), BOT_ID, content)
+
+    def upsert_commands(self, route: Route, kwargs: dict[str, Any]) -> list[dict[str, Any]]:
+        """Returns the slash commands a bulk upsert sent, as registered by Discord, unless it is to be rate limited.
+        Rate limits discord.py could not wait out raise RateLimited, others an HTTPException with status 429."""
+        if self.upsert_rate_limits:
+            self.upsert_rate_limits -= 1
+            if self.retry_after is not None:
+                raise discord.RateLimited(self.retry_after)
+            response = SimpleNamespace(status=429, reason="Too Many Requests")
+            raise discord.HTTPException(response, "You are being rate limited.")  # type: ignore[arg-type]
+        extra = {"application_id": str(BOT_ID)} | ({"guild_id": str(route.guild_id)} if route.guild_id else {})
+        return [command | extra | {"id": str(next(_snowflakes)), "version": "1"} for command in kwargs["json"]]
+
+    async def answer(self, route: Route, kwargs: dict[str, Any]) -> Any:
+        """Returns the answer to a request after the latency, and counts it."""
+        self.requests[route.key] += 1
+        if route.method not in ("GET", "DELETE"):
+            for listener in self.send_listeners:
+                listener()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if (handler := self.routes.get(route.key)) is not None:
+            return handler(route, kwargs)
+        if route.method == "GET":
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown")  # type: ignore[arg-type]
+        return None
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:  # pylint: disable=arguments-differ
+        """Answers a request without sending it."""
+        return await self.answer(route, kwargs)
+
+
+class FakeWebhookAdapter(AsyncWebhookAdapter):
+    """Webhook adapter that answers interaction responses and followups through a FakeHTTP instead of sending them."""
+
+    def __init__(self, http: FakeHTTP):
+        """Initialization function for FakeWebhookAdapter class."""
+        super().__init__()
+        self.http = http
+
+    async def request(self, route: Any, *_args: Any, **kwargs: Any) -> Any:  # pylint: disable=arguments-differ
+        """Answers a webhook request without sending it."""
+        if route.path.endswith("/callback"):
+            await self.http.answer(route, kwargs)
+            return {"interaction": {"id": str(route.webhook_id), "type": 2}}
+        await self.http.answer(route, kwargs)
+        return None if route.method == "DELETE" else self.http.echo_message(route, kwargs)
+
+
+class FakeGateway:
+    """Stands in for the gateway connection of a bot. Events are built from synthetic payloads and parsed by the
+    connection state of the bot, which dispatches them like events received from Discord."""
+
+    latency = 0.0
+    open = False  # Nothing to close when the bot closes.
+
+    def __init__(self, bot: tbb.TravusBotBase):
+        """Initialization function for FakeGateway class."""
+        self.bot = bot
+        self._state = bot._connection  # pylint: disable=protected-access
+        self.presence: discord.BaseActivity | None = None
+
+    async def change_presence(self, *, activity: discord.BaseActivity | None = None, **_kwargs: Any):
+        """Records the presence of the bot instead of sending it."""
+        self.presence = activity
+
+    def message(self, content: str, author_id: int = OWNER_ID, channel_id: int = CHANNEL_ID):
+        """Receive a message in a text channel of the offline server."""
+        self._state.parse_message_create(message_payload(channel_id, author_id, content))
+
+    def interaction(self, text: str, author_id: int = OWNER_ID, channel_id: int = CHANNEL_ID):
+        """Receive a slash command used in a text channel of the offline server, such as `help about`."""
+        payload = interaction_payload(self.bot.tree, channel_id, author_id, text)
+        self._state.parse_interaction_create(payload)  # type: ignore[arg-type]
+
+
+class FakeConnection:
+    """In-memory stand-in for an asyncpg connection. Every statement is one round trip taking the latency of the pool.
+    Statements return no rows, except the settings cache load and inserting missing command states."""
+
+    def __init__(self, pool: "FakePool"):
+        """Initialization function for FakeConnection class."""
+        self._pool = pool
+
+    async def _round_trip(self, query: str, args: tuple) -> list[dict[str, Any]]:
+        """Waits for the latency of the pool and returns the rows a statement results in."""
+        self._pool.round_trips += 1
+        if self._pool.latency:
+            await asyncio.sleep(self._pool.latency)
+        if query.startswith("SELECT 'settings' AS source"):
+            return [{"source": "settings", "key": key, "value": value} for key, value in self._pool.settings.items()]
+        if query.startswith("INSERT INTO command_states SELECT unnest"):
+            return [{"command": command, "state": 0} for command in args[0]]
+        return []
+
+    async def execute(self, query: str, *args: Any, **_kwargs: Any) -> str:
+        """Runs a statement, returning a status of one affected row."""
+        await self._round_trip(query, args)
+        return "OK 1"
+
+    async def executemany(self, command: str, args: list, **_kwargs: Any) -> None:
+        """Runs a statement for each sequence of arguments, in one round trip."""
+        await self._round_trip(command, tuple(args))
+
+    async def fetch(self, query: str, *args: Any, **_kwargs: Any) -> list[dict[str, Any]]:
+        """Runs a query, returning its rows."""
+        return await self._round_trip(query, args)
+
+    async def fetchrow(self, query: str, *args: Any, **_kwargs: Any) -> dict[str, Any] | None:
+        """Runs a query, returning its first row."""
+        rows = await self._round_trip(query, args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args: Any, column: int = 0, **_kwargs: Any) -> Any:
+        """Runs a query, returning a value of its first row."""
+        rows = await self._round_trip(query, args)
+        return list(rows[0].values())[column] if rows else None
+
+    def transaction(self) -> "_FakeTransaction":
+        """Returns a transaction, which takes a round trip to start and one to end, like asyncpg's."""
+        return _FakeTransaction(self)
+
+
+class _FakeTransaction:
+    """Transaction of a FakeConnection."""
+
+    def __init__(self, connection: FakeConnection):
+        """Initialization function for _FakeTransaction class."""
+        self._connection = connection
+
+    async def __aenter__(self):
+        """Start the transaction."""
+        await self._connection.execute("BEGIN")
+
+    async def __aexit__(self, exc_type, *_exc_info):
+        """Commit the transaction, or roll it back if it failed."""
+        await self._connection.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class FakePool:
+    """In-memory stand-in for an asyncpg pool of FakeConnections. Callers wait for a connection when all are in use,
+    like with asyncpg, so it can be wrapped in a DatabasePool."""
+
+    def __init__(self, size: int = 10, latency: float = 0.0, settings: dict[str, str] | None = None):
+        """Initialization function for FakePool class. Every round trip takes the given latency in seconds, and the
+        settings are what the settings cache is loaded with."""
+        self.latency = latency
+        self.settings = dict(SETTINGS if settings is None else settings)
+        self.round_trips = 0
+        self._size = size
+        self._idle: asyncio.Queue[FakeConnection] = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(FakeConnection(self))
+
+    async def acquire(self, *, timeout: float | None = None) -> FakeConnection:
+        """Acquire a connection, waiting for one to be released if all are in use."""
+        return await asyncio.wait_for(self._idle.get(), timeout)
+
+    async def release(
+        self, connection: FakeConnection, *, timeout: float | None = None
+    ):  # pylint: disable=unused-argument
+        """Release a connection back to the pool."""
+        self._idle.put_nowait(connection)
+
+    async def close(self):
+        """Close the pool, which holds no resources."""
+
+    def get_size(self) -> int:
+        """Returns the number of connections in the pool."""
+        return self._size
+
+    def get_idle_size(self) -> int:
+        """Returns the number of connections not in use."""
+        return self._idle.qsize()
+
+    def get_min_size(self) -> int:
+        """Returns the minimum number of connections, which is the size, as all are opened up front."""
+        return self._size
+
+    def get_max_size(self) -> int:
+        """Returns the maximum number of connections."""
+        return self._size
+
+
+async def make_bot(
+    pool: FakePool | None = None, http_latency: float = 0.0, members: int = 100, channels: int = 10
+) -> tbb.TravusBotBase:
+    """Function that returns a logged in bot with core commands and the dev module loaded, in a server with the given
+    number of members and text channels. The REST API and interaction responses are answered by a FakeHTTP, and the
+    database is a FakePool. Nothing connects to Discord or the database, and the cache listener is not started. Events
+    are fed to the bot through its FakeGateway, `bot.ws`."""
+    # pylint: disable=protected-access  # Stands in for logging in and the gateway, which set these internals.
+    os.chdir(ROOT)
+    bot = tbb.TravusBotBase(
+        tbb.DatabaseCredentials("offline", "", "localhost", 5432, "offline"),
+        command_prefix=main.get_prefix,
+        intents=discord.Intents.all(),
+        owner_id=OWNER_ID,
+    )
+    state = bot._connection
+    bot.http = state.http = bot.tree._http = FakeHTTP(asyncio.get_running_loop(), http_latency)
+    async_context.set(FakeWebhookAdapter(bot.http))
+    await bot._async_setup_hook()
+    state.user = discord.ClientUser(state=state, data=user_payload(BOT_ID, "Offline Bot", True))  # type: ignore
+    state.application_id = BOT_ID
+    state._add_guild_from_data(guild_payload(members, channels))  # type: ignore[arg-type]
+    bot.db = tbb.DatabasePool(pool or FakePool())  # type: ignore[arg-type]
+    bot.tree.on_error = bot._on_app_command_error
+    bot.tree.interaction_check = bot._start_app_command_timer  # type: ignore[method-assign]
+    await bot.migrate("core", tbb.CORE_MIGRATIONS)
+    await bot._load_cache()
+    bot.add_command_help(next(com for com in bot.commands if com.name == "help"), "Core", None, [""])
+    await bot._load_default_commands()
+    await bot.module_index.refresh()
+    await bot.load_extension("modules.dev")
+    await bot.update_command_states(bot.extension_commands("modules.dev"))
+    await bot._apply_core_commands_mode(sync=False)
+    bot.ws = FakeGateway(bot)  # type: ignore[assignment]
+    await bot.on_ready()
+    bot._ready.set()  # type: ignore[union-attr]
+    return bot
@@ -0,0 +1,167 @@
+import argparse  # To parse command line options.
+import asyncio  # To run the bot offline and inject events at a rate.
+import logging  # To show warnings of the bot, such as blocked event loop warnings.
+from contextvars import ContextVar  # To tell which injected event a response belongs to.
+from itertools import cycle  # To go through the command mix.
+from time import perf_counter  # To time responses.
+
+import travus_bot_base as tbb  # TBB functions and classes.
+from tools import fakes  # Offline bot, server and database.
+
+REQUEST: ContextVar[int | None] = ContextVar("REQUEST", default=None)  # Injected event a task is handling.
+MIX = "!ping,!help,!about dev,!usage dev,!botconfig description Load test,/ping,/help,/help about,/about dev"
+SETTLE_TIME = 5.0  # Seconds without responses after which the remaining events are counted as unanswered.
+
+
+class LoadTest:
+    """Injects messages and slash commands into an offline bot at a fixed rate, and records how long it took until the
+    first response to each was sent. The tasks discord.py creates to handle an event inherit the context it was
+    injected in, so responses are matched to events through the REQUEST context variable."""
+
+    def __init__(self, bot: tbb.TravusBotBase, pool: fakes.FakePool, channels: int):
+        """Initialization function for LoadTest class."""
+        self.bot = bot
+        self.pool = pool
+        self.channels = channels
+        self.received: list[float] = []  # When each event was injected, by event number.
+        self.responded: dict[int, float] = {}  # When the first response to each answered event was sent.
+        self.max_lag = 0.0
+        self.max_waiting = 0
+        assert isinstance(bot.http, fakes.FakeHTTP)
+        bot.http.send_listeners.append(self._on_send)
+
+    def _on_send(self):
+        """Records the first response to the event the sending task is handling."""
+        if (request := REQUEST.get()) is not None and request not in self.responded:
+            self.responded[request] = perf_counter()
+
+    def inject(self, text: str):
+        """Injects a message, or a slash command if the text starts with `/`, in the next channel."""
+        request = len(self.received)
+        token = REQUEST.set(request)
+        channel_id = fakes.CHANNEL_ID + request % self.channels  # Spread over channels, so pacing doesn't cap sends.
+        self.received.append(perf_counter())
+        try:
+            if text.startswith("/"):
+                self.bot.ws.interaction(text[1:], channel_id=channel_id)  # type: ignore[attr-defined]
+            else:
+                self.bot.ws.message(text, channel_id=channel_id)  # type: ignore[attr-defined]
+        finally:
+            REQUEST.reset(token)
+
+    async def _sample(self):
+        """Samples event loop lag and callers waiting on the database pool while the test runs."""
+        while True:
+            expected = perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            self.max_lag = max(self.max_lag, perf_counter() - expected)
+            self.max_waiting = max(self.max_waiting, self.bot.db.waiting)
+
+    async def run(self, mix: list[str], count: int, rate: float) -> float:
+        """Injects count events from the mix at the rate, in events per second, and waits until each was answered or
+        no response came for the settle time. Returns the seconds from the first event until the last response."""
+        running = asyncio.all_tasks()
+        sampler = asyncio.create_task(self._sample())
+        start, texts = perf_counter(), cycle(mix)
+        for index in range(count):
+            if (delay := start + index / rate - perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            self.inject(next(texts))
+        last, answered = perf_counter(), 0
+        while len(self.responded) < count and perf_counter() - last < SETTLE_TIME:
+            await asyncio.sleep(0.01)
+            if len(self.responded) > answered:
+                last, answered = perf_counter(), len(self.responded)
+        sampler.cancel()
+        while pending := asyncio.all_tasks() - running - {sampler}:  # Let handlers finish what they do after replying.
+            if not (await asyncio.wait(pending, timeout=SETTLE_TIME))[0]:
+                break
+        return max(self.responded.values(), default=start) - start
+
+    def report(self, rate: float, duration: float) -> str:
+        """Returns a line summarising the run."""
+        latencies = sorted(sent - self.received[request] for request, sent in self.responded.items())
+        metrics = self.bot.command_metrics
+        handled = sum(histogram.count for histogram in metrics.latency.values())
+        failed = sum(metrics.errors.values())
+        achieved = len(latencies) / duration if duration else 0.0
+        percentiles = (
+            " ".join(
+                f"{latencies[min(len(latencies) - 1, len(latencies) * percent // 100)] * 1000:>8.1f}"
+                for percent in (50, 95, 99, 100)
+            )
+            if latencies
+            else " ".join(["       -"] * 4)
+        )
+        acquire_wait = self.bot.db.acquire_wait
+        average_wait = acquire_wait.total / acquire_wait.count if acquire_wait.count else 0.0
+        return (
+            f"{'!' if achieved < rate * 0.95 else ' '} {rate:>8g} {achieved:>9.1f} {handled:>7} {failed:>6} "
+            f"{len(self.received) - len(latencies):>8} {percentiles} {self.max_lag * 1000:>8.1f} "
+            f"{acquire_wait.count:>8} {average_wait * 1000:>8.2f} {self.max_waiting:>7} {self.pool.round_trips:>6}"
+        )
+
+
+async def run(args: argparse.Namespace):
+    """Runs the load test at each rate, with a new bot each time."""
+    mix = [text.strip() for text in args.mix.split(",") if text.strip()]
+    print(
+        f"{len(mix)} commands, {args.count} events per rate, REST latency {args.rest_latency * 1000:g}ms, database "
+        f"latency {args.db_latency * 1000:g}ms, {args.pool_size} pool connections, {args.channels} channels."
+    )
+    print(
+        f"  {'rate/s':>8} {'handled/s':>9} {'handled':>7} {'failed':>6} {'no reply':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'lag ms':>8} {'acquires':>8} {'wait ms':>8} {'waiting':>7} {'trips':>6}"
+    )
+    for rate in args.rates:
+        pool = fakes.FakePool(args.pool_size, args.db_latency)
+        bot = await fakes.make_bot(pool, args.rest_latency, channels=args.channels)
+        pool.round_trips, bot.db.acquire_wait = 0, tbb.LatencyHistogram()  # Only count what handling events does.
+        bot.loop_monitor.start()
+        try:
+            load_test = LoadTest(bot, pool, args.channels)
+            duration = await load_test.run(mix, args.count, rate)
+            print(load_test.report(rate, duration))
+            for when, seconds, owner, location, _ in bot.loop_monitor.blocks:
+                print(f"    [{when}] Loop blocked {seconds * 1000:.0f}ms by {owner} at {location}")
+        finally:
+            await bot.close()
+
+
+def main():
+    """Parses the command line and runs the load test."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.loadtest",
+        description="Drives an offline bot with a stream of messages and slash commands at increasing rates, to find "
+        "where throughput breaks down. Events are parsed and handled by the real command pipeline; only the gateway, "
+        "the REST API and the database are simulated. For each rate, reports the events answered per second, the "
+        "latency from receiving an event to its first response, event loop lag and database pool waits. Rates that "
+        "were not kept up with are marked with !.",
+    )
+    parser.add_argument(
+        "--rates",
+        type=lambda value: [float(rate) for rate in value.split(",")],
+        default=[50.0, 100.0, 200.0, 400.0, 800.0],
+        help="comma separated events per second to test, default 50,100,200,400,800",
+    )
+    parser.add_argument("--count", type=int, default=1000, help="events injected per rate, default %(default)s")
+    parser.add_argument(
+        "--mix",
+        default=MIX,
+        help="comma separated commands to inject in turn, slash commands start with /, default %(default)s",
+    )
+    parser.add_argument("--channels", type=int, default=50, help="channels events are spread over, default %(default)s")
+    parser.add_argument(
+        "--rest-latency", type=float, default=0.05, help="seconds each REST request takes, default %(default)s"
+    )
+    parser.add_argument(
+        "--db-latency", type=float, default=0.001, help="seconds each database round trip takes, default %(default)s"
+    )
+    parser.add_argument("--pool-size", type=int, default=10, help="database pool connections, default %(default)s")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s: %(message)s", level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,41 @@
 # pylint: disable=too-many-lines
+import ast
 import copy
-import io
+import gzip
+import hashlib
+import heapq
+import importlib.util
+import json
 import logging
 import os
-from collections.abc import Callable, Coroutine, Iterable
+import py_compile
+import shutil
+import sys
+import tempfile
+import threading
+import traceback
+from asyncio import Lock, Task, create_task, gather, shield, to_thread
+from asyncio import sleep as asleep  # For waiting asynchronously.
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from collections.abc import Callable, Coroutine, Iterable, Iterator
+from contextlib import suppress
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from functools import lru_cache, partial
+from graphlib import CycleError, TopologicalSorter
+from itertools import chain, islice
+from re import MULTILINE
 from re import compile as re_cmp  # Regex functions used in clean function for detecting mentions.
-from re import findall
-from typing import Any, TypeVar
+from time import perf_counter, time
+from types import FrameType
+from typing import IO, Any, TypeVar
+from uuid import uuid4
 
 import asyncpg
 import discord
 from aiohttp import ClientConnectorError as CCError  # To detect connection errors.
+from aiohttp import web  # For the metrics endpoint.
 from discord import (
     CategoryChannel,
     DMChannel,
@@ -21,6 +46,7 @@ from discord import (
     Interaction,
     Member,
     Message,
+    NotFound,
     PartialMessageable,
     StageChannel,
     TextChannel,
@@ -28,12 +54,12 @@ from discord import (
     User,
     VoiceChannel,
     app_commands,
-    utils,
 )
 from discord.ext import commands
 from discord.ext.commands import Bot, Cog, Command, Context, Group
 
 _ContextT = TypeVar("_ContextT", bound="Context[Any]")
+_T = TypeVar("_T")
 
 
 def check_embed_length(author: User | Member, embed: Embed) -> Embed:
@@ -85,16 +111,961 @@ def required_config(requirements: Iterable[str]):
     return commands.check(predicate)
 
 
+# Core schema migrations, applied in order by TravusBotBase.migrate. Only ever append new migrations to this list.
+CORE_MIGRATIONS: list[str | list[str]] = [
+    [  # 1: Initial schema. Idempotent, so databases created before versioned migrations are adopted as is.
+        "CREATE TABLE IF NOT EXISTS settings(key VARCHAR PRIMARY KEY NOT NULL, value VARCHAR)",
+        "CREATE TABLE IF NOT EXISTS default_modules(module VARCHAR PRIMARY KEY NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS command_states(command VARCHAR PRIMARY KEY NOT NULL, state INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS config(key VARCHAR PRIMARY KEY NOT NULL, value VARCHAR)",
+        "INSERT INTO settings VALUES ('additional_credits', ''), ('bot_description', ''), ('delete_messages', '0'), "
+        "('prefix', '!'), ('ephemeral', '1'), ('core_commands_mode', 'slash') ON CONFLICT (key) DO NOTHING",
+    ],
+    # 2: Hashes of the last synced slash command tree payload per scope, to skip syncing unchanged trees.
+    "CREATE TABLE IF NOT EXISTS tree_hashes(scope VARCHAR PRIMARY KEY NOT NULL, hash VARCHAR NOT NULL)",
+    # 3: Prefixes of individual servers, used alongside the global prefix.
+    "CREATE TABLE IF NOT EXISTS guild_prefixes(guild_id BIGINT PRIMARY KEY NOT NULL, prefix VARCHAR NOT NULL)",
+]
+
+CACHE_CHANNEL = "tbb_cache"  # Postgres NOTIFY channel used to keep the settings cache in sync across instances.
+MODULE_POLL_INTERVAL = 2.0  # Seconds between checks of the modules directory for added, removed or changed modules.
+ERRORS_PER_PAGE = 3  # Error log records shown per page by the lasterror commands.
+HELP_MENTION = "\x1a" * 23  # Stands in for user mentions in cached help pages. As long as the longest mention.
+NO_DESCRIPTION = "No description for the bot found. Set description with `botconfig` command."
+QUERY_CALLER: ContextVar[str | None] = ContextVar("query_caller", default=None)  # Command database queries are for.
+
+
 class DatabaseCredentials:
-    """Class that holds database credentials."""
+    """Class that holds database credentials and connection pool options."""
 
-    def __init__(self, user: str, password: str, host: str, port: str | int, database: str):
-        """Initialization function for DatabaseCredentials class."""
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        user: str,
+        password: str,
+        host: str,
+        port: str | int,
+        database: str,
+        *,
+        min_size: str | int | None = None,
+        max_size: str | int | None = None,
+        statement_cache_size: str | int | None = None,
+        max_inactive_lifetime: str | float | None = None,
+        command_timeout: str | float | None = None,
+        acquire_timeout: str | float | None = None,
+        slow_query_threshold: str | float | None = None,
+    ):
+        """Initialization function for DatabaseCredentials class. Unset pool options fall back to the defaults below,
+        which match asyncpg's for the options passed on to it. Raises ValueError if max_size is below min_size."""
         self.user = user
         self.password = password
         self.host = host
         self.port = int(port)
         self.database = database
+        self.min_size = int(min_size) if min_size is not None else 10
+        self.max_size = int(max_size) if max_size is not None else max(10, self.min_size)
+        if self.max_size < self.min_size:
+            raise ValueError(
+                f"pg_pool_max_size ({self.max_size}) must not be lower than pg_pool_min_size ({self.min_size})."
+            )
+        self.statement_cache_size = int(statement_cache_size) if statement_cache_size is not None else 100
+        self.max_inactive_lifetime = float(max_inactive_lifetime) if max_inactive_lifetime is not None else 300.0
+        self.command_timeout = float(command_timeout) if command_timeout is not None else None
+        self.acquire_timeout = float(acquire_timeout) if acquire_timeout is not None else None
+        self.slow_query_threshold = float(slow_query_threshold) if slow_query_threshold is not None else 0.5
+
+    def connection_options(self) -> dict[str, Any]:
+        """Returns the options needed to connect to the database, shared by the pool and standalone connections."""
+        return {
+            "user": self.user,
+            "password": self.password,
+            "host": self.host,
+            "port": self.port,
+            "database": self.database,
+        }
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds. Cheap enough to update on hot paths."""
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Upper bounds.
+
+    def __init__(self):
+        """Initialization function for LatencyHistogram class."""
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # Last bucket holds everything above the largest bound.
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Record a duration."""
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the upper bound of the bucket the given percentile falls in. Returns the maximum if it falls above
+        the largest bucket, and 0 if nothing has been recorded."""
+        target, seen = self.count * percent / 100, 0
+        for bound, count in zip(self.BUCKETS, self.counts, strict=False):
+            seen += count
+            if seen >= target and seen:
+                return bound
+        return self.max
+
+    def summary(self) -> str:
+        """Returns a short human-readable summary of the recorded durations."""
+        if not self.count:
+            return "No samples."
+        return (
+            f"avg {self.total / self.count * 1000:.2f}ms, p50 <={self.percentile(50) * 1000:g}ms, "
+            f"p95 <={self.percentile(95) * 1000:g}ms, p99 <={self.percentile(99) * 1000:g}ms, "
+            f"max {self.max * 1000:.2f}ms"
+        )
+
+    def prometheus(self, metric: str, labels: str = "") -> list[str]:
+        """Returns the histogram as lines in the Prometheus text format. Labels are given as `key="value"` pairs
+        separated by commas."""
+        lines, cumulative, separator = [], 0, "," if labels else ""
+        for bound, count in zip([*self.BUCKETS, "+Inf"], self.counts, strict=True):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        labels = f"{{{labels}}}" if labels else ""
+        lines.append(f"{metric}_sum{labels} {self.total}")
+        lines.append(f"{metric}_count{labels} {self.count}")
+        return lines
+
+
+class CommandMetrics:
+    """Invocation latency and error counts per command, kept separately for prefix and slash commands."""
+
+    def __init__(self):
+        """Initialization function for CommandMetrics class."""
+        self.latency: dict[tuple[str, str], LatencyHistogram] = {}  # Keyed by kind and qualified command name.
+        self.errors: dict[tuple[str, str], int] = {}
+
+    def observe(self, kind: str, name: str, seconds: float, failed: bool = False):
+        """Record an invocation of a command. Kind is either `prefix` or `slash`."""
+        if (histogram := self.latency.get((kind, name))) is None:
+            histogram = self.latency[(kind, name)] = LatencyHistogram()
+        histogram.observe(seconds)
+        if failed:
+            self.errors[(kind, name)] = self.errors.get((kind, name), 0) + 1
+
+    def prometheus(self) -> list[str]:
+        """Returns the metrics as lines in the Prometheus text format."""
+        lines = [
+            "# HELP tbb_command_duration_seconds Time from invocation until the command finished.",
+            "# TYPE tbb_command_duration_seconds histogram",
+        ]
+        errors = [
+            "# HELP tbb_command_errors_total Invocations that failed, including failed checks.",
+            "# TYPE tbb_command_errors_total counter",
+        ]
+        for (kind, name), histogram in sorted(self.latency.items()):
+            escaped = name.replace("\\", "\\\\").replace('"', '\\"')  # Label values escape these characters.
+            labels = f'kind="{kind}",command="{escaped}"'
+            lines.extend(histogram.prometheus("tbb_command_duration_seconds", labels))
+            errors.append(f"tbb_command_errors_total{{{labels}}} {self.errors.get((kind, name), 0)}")
+        return lines + errors
+
+
+_QUERY_LITERAL_PATTERN = re_cmp(r"'(?:[^']|'')*'|(?<![$\w.])\d+(?:\.\d+)?\b")  # String and number literals.
+_QUERY_SPACE_PATTERN = re_cmp(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """Function that normalizes SQL statements for grouping, by collapsing whitespace and replacing literals with ?."""
+    return _QUERY_SPACE_PATTERN.sub(" ", _QUERY_LITERAL_PATTERN.sub("?", query)).strip()
+
+
+def query_caller() -> str:
+    """Function that returns what a database query is made on behalf of. This is the command being run, or otherwise
+    the module the query was made from."""
+    if (caller := QUERY_CALLER.get()) is not None:
+        return caller
+    frame = sys._getframe(1)  # pylint: disable=protected-access  # Cheaper than inspect, only the module is needed.
+    while frame.f_back is not None and (
+        frame.f_globals.get("__name__", "").startswith("asyncpg")
+        or frame.f_code.co_qualname.startswith(("TimedConnection.", "DatabasePool."))
+    ):
+        frame = frame.f_back
+    return frame.f_globals.get("__name__", "unknown")
+
+
+class QueryStats:
+    """Timing of database queries per normalized statement and per caller. Queries slower than the threshold are
+    logged, with their parameters redacted."""
+
+    MAX_STATEMENTS = 1000  # Statements beyond this are grouped together, in case literals are not normalized away.
+
+    def __init__(self, slow_threshold: float | None = None):
+        """Initialization function for QueryStats class."""
+        self.slow_threshold = slow_threshold
+        self.statements: dict[str, LatencyHistogram] = {}
+        self.callers: dict[str, LatencyHistogram] = {}
+        self.errors: dict[str, int] = {}
+
+    async def attach(self, connection: "TimedConnection"):
+        """Makes a new connection record its queries here. Passed as the init function of the asyncpg pool."""
+        connection.query_stats = self
+
+    def observe(self, query: str, args: tuple, caller: str, seconds: float, failed: bool = False):
+        """Record a query."""
+        statement = normalize_query(query)
+        if (histogram := self.statements.get(statement)) is None:
+            if len(self.statements) >= self.MAX_STATEMENTS:
+                statement = "(other statements)"
+            histogram = self.statements.setdefault(statement, LatencyHistogram())
+        histogram.observe(seconds)
+        if (caller_histogram := self.callers.get(caller)) is None:
+            caller_histogram = self.callers[caller] = LatencyHistogram()
+        caller_histogram.observe(seconds)
+        if failed:
+            self.errors[statement] = self.errors.get(statement, 0) + 1
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            parameters = ", ".join(type(arg).__name__ for arg in args)
+            BOT_LOG.warning(f"Slow query ({seconds * 1000:.0f}ms) by {caller}: {statement} [{parameters}]")
+
+    def top(self, count: int = 10) -> list[tuple[str, LatencyHistogram]]:
+        """Returns the statements that took the most time in total, with their timings."""
+        return heapq.nlargest(count, self.statements.items(), key=lambda item: item[1].total)
+
+
+class TimedConnection(asyncpg.Connection):
+    """Connection that times its queries, recording them in the query statistics of its pool."""
+
+    query_stats: QueryStats | None = None
+
+    async def _timed(self, method: Callable[..., Coroutine[Any, Any, _T]], query: str, args: tuple, **kwargs) -> _T:
+        """Runs a query method and records how long it took. Queries asyncpg makes itself are not recorded, such as
+        resetting the connection when it is released, as they would be counted against whatever command is running."""
+        # pylint: disable-next=protected-access  # Frame 2 is what called the query method wrapping this one.
+        if sys._getframe(2).f_globals.get("__name__", "").startswith("asyncpg."):
+            return await method(query, *args, **kwargs)
+        caller, start, failed = query_caller(), perf_counter(), True
+        try:
+            result = await method(query, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            if self.query_stats is not None:
+                self.query_stats.observe(query, args, caller, perf_counter() - start, failed)
+
+    async def execute(self, query: str, *args, **kwargs) -> str:
+        """Execute an SQL command, see asyncpg.Connection.execute."""
+        return await self._timed(super().execute, query, args, **kwargs)
+
+    async def executemany(self, command: str, args, **kwargs) -> None:
+        """Execute an SQL command for each sequence of arguments, see asyncpg.Connection.executemany."""
+        return await self._timed(super().executemany, command, (args,), **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs) -> list:
+        """Run a query and return the results as a list, see asyncpg.Connection.fetch."""
+        return await self._timed(super().fetch, query, args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs) -> Any:
+        """Run a query and return the first row, see asyncpg.Connection.fetchrow."""
+        return await self._timed(super().fetchrow, query, args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs) -> Any:
+        """Run a query and return a value in the first row, see asyncpg.Connection.fetchval."""
+        return await self._timed(super().fetchval, query, args, **kwargs)
+
+
+class _TimedAcquire:
+    """Acquire context for DatabasePool that records how long callers waited for a connection."""
+
+    def __init__(self, db: "DatabasePool", timeout: float | None):
+        """Initialization function for _TimedAcquire class."""
+        self._db = db
+        self._timeout = timeout
+        self._conn: asyncpg.Connection | None = None
+
+    async def _acquire(self) -> asyncpg.Connection:
+        """Acquire a connection from the underlying pool and record the wait."""
+        db = self._db
+        start = perf_counter()
+        db.waiting += 1
+        try:
+            conn = await db.pool.acquire(timeout=self._timeout)
+        except TimeoutError:
+            db.timeouts += 1
+            raise
+        finally:
+            db.waiting -= 1
+        db.acquire_wait.observe(perf_counter() - start)
+        return conn
+
+    def __await__(self):
+        """Allows `conn = await db.acquire()`, the connection must then be released with `db.release(conn)`."""
+        return self._acquire().__await__()
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        """Acquire a connection for the duration of an `async with` block."""
+        self._conn = await self._acquire()
+        return self._conn
+
+    async def __aexit__(self, *_exc_info):
+        """Release the connection acquired for the `async with` block."""
+        conn, self._conn = self._conn, None
+        assert conn is not None
+        await self._db.pool.release(conn)
+
+
+class DatabasePool:
+    """Wrapper around an asyncpg pool that records connection usage statistics. Anything not defined here is passed
+    through to the underlying pool, so it can be used in place of one."""
+
+    def __init__(self, pool: asyncpg.Pool, acquire_timeout: float | None = None, queries: QueryStats | None = None):
+        """Initialization function for DatabasePool class. Queries are only timed if the pool was created with
+        TimedConnection as its connection class and the attach method of the query statistics as its init function."""
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.queries = queries or QueryStats()
+        self.acquire_wait = LatencyHistogram()
+        self.waiting = 0
+        self.timeouts = 0
+
+    def __getattr__(self, name: str) -> Any:
+        """Pass through anything else to the underlying asyncpg pool."""
+        return getattr(self.pool, name)
+
+    def acquire(self, *, timeout: float | None = None) -> _TimedAcquire:
+        """Acquire a connection from the pool. Usable as `async with db.acquire() as conn` or `await db.acquire()`."""
+        return _TimedAcquire(self, timeout if timeout is not None else self.acquire_timeout)
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        """Execute an SQL command on a connection from the pool."""
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def executemany(self, command: str, args, *, timeout: float | None = None) -> None:
+        """Execute an SQL command for each sequence of arguments on a connection from the pool."""
+        async with self.acquire() as conn:
+            return await conn.executemany(command, args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: float | None = None, record_class=None) -> list:
+        """Run a query on a connection from the pool and return the results as a list."""
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout, record_class=record_class)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None, record_class=None) -> Any:
+        """Run a query on a connection from the pool and return the first row."""
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout, record_class=record_class)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None) -> Any:
+        """Run a query on a connection from the pool and return a value in the first row."""
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    async def release(self, connection: asyncpg.Connection, *, timeout: float | None = None):
+        """Release a connection acquired with `await db.acquire()` back to the pool."""
+        await self.pool.release(connection, timeout=timeout)
+
+    async def close(self):
+        """Close all connections in the pool."""
+        await self.pool.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the current pool statistics. Wait times are in seconds."""
+        size, idle = self.pool.get_size(), self.pool.get_idle_size()
+        return {
+            "size": size,
+            "in_use": size - idle,
+            "idle": idle,
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "waiting": self.waiting,
+            "acquires": self.acquire_wait.count,
+            "timeouts": self.timeouts,
+            "wait_histogram": dict(zip([*self.acquire_wait.BUCKETS, "+Inf"], self.acquire_wait.counts, strict=True)),
+            "wait_summary": self.acquire_wait.summary(),
+        }
+
+
+class ErrorRecord:  # pylint: disable=too-many-instance-attributes
+    """An error and how often it occurred. Only what is needed to tell errors apart is worked out when recording it,
+    the rest is formatted when read."""
+
+    __slots__ = ("count", "first_seen", "guild", "last_seen", "message", "name", "source", "stack", "type", "user")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        error: BaseException | str,
+        message: str,
+        source: str,
+        name: str | None,
+        guild: int | None,
+        user: int | None,
+    ):
+        """Initialization function for ErrorRecord class."""
+        self.source = source
+        self.name = name
+        self.type = type(error).__name__ if isinstance(error, BaseException) else None
+        self.stack: traceback.StackSummary | None = None  # Source lines are only looked up when formatted.
+        if isinstance(error, BaseException) and error.__traceback__ is not None:
+            self.stack = traceback.StackSummary.extract(traceback.walk_tb(error.__traceback__), lookup_lines=False)
+        self.first_seen = self.last_seen = time()
+        self.count = 1
+        self.message, self.guild, self.user = message, guild, user
+
+    def seen(self, message: str, guild: int | None, user: int | None):
+        """Record another occurrence of the error."""
+        self.count += 1
+        self.last_seen = time()
+        self.message, self.guild, self.user = message, guild, user
+
+    def summary(self) -> str:
+        """Returns a single line describing the latest occurrence of the error."""
+        when = str(datetime.fromtimestamp(self.last_seen, UTC))[0:16]  # Same format as cur_time.
+        user = f"{self.user}: " if self.user is not None else ""
+        name = f"{'/' if self.source == 'slash' else ''}{self.name}: " if self.name else ""
+        error = f"{self.type}: {self.message}" if self.type else self.message
+        return f"[{when}] {user}{name}{error}"
+
+    def format(self, frames: int = 3) -> str:
+        """Returns the summary, how many times the error occurred, and the innermost frames of its traceback."""
+        text = self.summary()
+        if self.count > 1:
+            text += f"\n  Occurred {self.count} times since {str(datetime.fromtimestamp(self.first_seen, UTC))[0:16]}."
+        for frame in self.stack[-frames:] if self.stack else []:
+            line = f": {frame.line.strip()}" if frame.line else ""
+            text += f"\n  {os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}{line}"
+        return text
+
+
+class ErrorLog:
+    """Fixed-size log of errors. Repeats of an error are counted on its existing record rather than stored again, so
+    an error storm does not push out everything else."""
+
+    def __init__(self, size: int = 100):
+        """Initialization function for ErrorLog class."""
+        self.size = size
+        self.records: OrderedDict[tuple, ErrorRecord] = OrderedDict()  # By fingerprint, most recently seen last.
+
+    def record(
+        self,
+        error: BaseException | str,
+        source: str,
+        name: str | None = None,
+        guild: int | None = None,
+        user: int | None = None,
+    ) -> ErrorRecord:
+        """Record an error. Source is what the error came from, such as `prefix`, `slash` or `module`, and name is the
+        command or module. Errors from the same place in the same code count as the same error."""
+        message = error if isinstance(error, str) else str(error)
+        tb = error.__traceback__ if isinstance(error, BaseException) else None
+        while tb is not None and tb.tb_next is not None:  # Errors are told apart by where they were raised.
+            tb = tb.tb_next
+        fingerprint = (source, name, type(error), (tb.tb_frame.f_code, tb.tb_lineno) if tb is not None else message)
+        if (record := self.records.get(fingerprint)) is not None:
+            record.seen(message, guild, user)
+            self.records.move_to_end(fingerprint)
+            return record
+        record = self.records[fingerprint] = ErrorRecord(error, message, source, name, guild, user)
+        if len(self.records) > self.size:
+            self.records.popitem(last=False)
+        return record
+
+    def latest(self, sources: Iterable[str], search: str | None = None) -> list[ErrorRecord]:
+        """Returns the records from the given sources, most recently seen first. If a search is given, only records
+        where it is in the command or module name, error type or message are returned."""
+        search = search.lower() if search else None
+        return [
+            record
+            for record in reversed(self.records.values())
+            if record.source in sources
+            and (search is None or search in f"{record.name}\n{record.type}\n{record.message}".lower())
+        ]
+
+
+class LoopMonitor:
+    """Measures event loop lag from a task on the loop. A watchdog thread captures the stack of the loop thread when
+    the loop has been blocked for longer than the threshold, so the module that blocked it can be found."""
+
+    INTERVAL = 0.1  # Seconds between lag measurements.
+
+    def __init__(self, threshold: float = 0.25, history: int = 20):
+        """Initialization function for LoopMonitor class."""
+        self.threshold = threshold
+        self.lag = LatencyHistogram()
+        self.blocks: deque[tuple[str, float, str, str, str]] = deque(maxlen=history)  # See the _measure method.
+        self._beat = perf_counter()  # When the measuring task last ran.
+        self._captured: tuple[float, str, str, str] | None = None  # Beat captured during, owner, location, stack.
+        self._loop_thread: int | None = None
+        self._task: Task[None] | None = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start measuring the lag of the running loop, and the watchdog thread. Does nothing if already started."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = perf_counter()
+        self._stopped = threading.Event()  # A new event, so a watchdog thread that is still stopping stays stopped.
+        self._task = create_task(self._measure())
+        threading.Thread(target=self._watch, args=(self._stopped,), name="loop-watchdog", daemon=True).start()
+
+    def stop(self):
+        """Stop measuring and stop the watchdog thread. The monitor can be started again afterwards."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @staticmethod
+    def owner(frame: FrameType | None) -> str:
+        """Returns the name of the bot module the innermost bot code in a stack belongs to."""
+        while frame is not None:
+            name = frame.f_globals.get("__name__", "")
+            if name.startswith("modules.") or name in ("core_commands", "travus_bot_base"):
+                return name
+            frame = frame.f_back
+        return "unknown"
+
+    async def _measure(self):
+        """Measure how late the loop wakes the task up. Blocks longer than the threshold are logged, and kept as the
+        time, duration, owning module, innermost location and stack of the block."""
+        while True:
+            self._beat = perf_counter()
+            await asleep(self.INTERVAL)
+            lag = max(perf_counter() - self._beat - self.INTERVAL, 0.0)
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                captured, self._captured = self._captured, None
+                if captured is None or captured[0] != self._beat:  # Watchdog missed it, it was barely over threshold.
+                    captured = (self._beat, "unknown", "stack not captured", "")
+                BOT_LOG.warning(f"Event loop was blocked for {lag * 1000:.0f}ms by {captured[1]} at {captured[2]}")
+                self.blocks.append((cur_time(), lag, *captured[1:]))
+
+    def _watch(self, stopped: threading.Event):
+        """Capture the stack of the loop thread once per block that lasts longer than the threshold, until stopped is
+        set. Runs in the watchdog thread."""
+        while not stopped.wait(self.INTERVAL / 2):
+            beat, captured = self._beat, self._captured
+            if perf_counter() - beat - self.INTERVAL < self.threshold or (captured and captured[0] == beat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread)  # pylint: disable=protected-access
+            if frame is not None:
+                stack = traceback.extract_stack(frame)
+                location = f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}"
+                self._captured = (beat, self.owner(frame), location, "".join(stack.format()))
+
+
+class AttachmentWriter:
+    """Builds a text attachment from text written to it in chunks. Output is kept in memory while small and spooled to
+    a temporary file once it grows, and is compressed with gzip if it would otherwise be too large to upload. Use as a
+    context manager, so the temporary files are removed once the attachment is sent. Can be used as the target of
+    redirect_stdout, so output is streamed into it as it is printed."""
+
+    SPOOL_SIZE = 1024 * 1024  # Bytes kept in memory before spooling to a temporary file.
+    CHUNK_SIZE = 64 * 1024  # Characters encoded at a time, so large strings are not copied whole.
+
+    def __init__(self, filename: str = "output.txt", limit: int = discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES):
+        """Initialization function for AttachmentWriter class. The limit is the upload limit in bytes."""
+        self.filename = filename
+        self.limit = limit
+        self.size = 0  # Bytes written, before compression.
+        self._buffer = self._spool()
+
+    def __enter__(self) -> "AttachmentWriter":
+        """Returns the writer itself."""
+        return self
+
+    def __exit__(self, *_exc_info):
+        """Removes the buffered output."""
+        self._buffer.close()
+
+    def _spool(self) -> IO[bytes]:
+        """Returns a buffer that is spooled to a temporary file once it grows large. Buffers are closed on exit, or when
+        replaced by the compressed output."""
+        # pylint: disable-next=consider-using-with
+        return tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+
+    def write(self, text: str) -> int:
+        """Add text to the attachment. Returns the number of characters written."""
+        for start in range(0, len(text), self.CHUNK_SIZE):
+            self.size += self._buffer.write(text[start : start + self.CHUNK_SIZE].encode())
+        return len(text)
+
+    def flush(self):
+        """Does nothing, written text is always buffered. Allows flushing when used as stdout."""
+
+    def text(self) -> str:
+        """Returns the text written so far. Only meant for small output, as it is read into memory whole."""
+        self._buffer.seek(0)
+        text = self._buffer.read().decode()
+        self._buffer.seek(0, os.SEEK_END)
+        return text
+
+    def file(self) -> discord.File | None:
+        """Returns the attachment, compressed if it would be too large to upload otherwise. Returns None if it is too
+        large to upload even when compressed."""
+        if self.size > self.limit:
+            compressed = self._spool()
+            self._buffer.seek(0)
+            with gzip.GzipFile(self.filename, "wb", fileobj=compressed) as gzip_file:
+                shutil.copyfileobj(self._buffer, gzip_file)
+            self._buffer.close()
+            self._buffer, self.filename = compressed, f"{self.filename}.gz"
+            if self._buffer.tell() > self.limit:
+                return None
+        self._buffer.seek(0)
+        return discord.File(self._buffer, self.filename)  # type: ignore[arg-type]  # Spooled files are binary IO.
+
+
+def upload_limit(guild: discord.Guild | None) -> int:
+    """Function that returns the upload limit in bytes of a server, or of DMs if no server is given."""
+    return guild.filesize_limit if guild is not None else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+
+
+class OutboundQueue:
+    """Sends output of several messages per channel. Small consecutive pages are merged, output from different callers
+    to the same channel is sent one after the other rather than interleaved, and sends are paced to stay within the
+    message rate limit of the channel, so long output does not run into rate limits and stall other commands. Callers
+    wait until their output has been sent."""
+
+    RATE = 5  # Messages per channel per period, the budget Discord gives for creating messages.
+    PERIOD = 5.0
+    ATTACHMENT_THRESHOLD = 5  # Output that would take more messages than this is uploaded as a file instead.
+
+    def __init__(self):
+        """Initialization function for OutboundQueue class."""
+        self._locks: dict[int, Lock] = {}
+        self._sent: dict[int, deque[float]] = {}  # When the most recent messages were sent, per channel.
+
+    @staticmethod
+    def merge(pages: Iterable[str], limit: int = 2000, separator: str = "\n") -> Iterator[str]:
+        """Merges consecutive pages joined by the separator, as long as they fit within the message size limit. Pages
+        are merged as they are taken from the iterable, so pages that are produced lazily are not all held at once."""
+        merged: str | None = None
+        for page in pages:
+            if merged is not None and len(merged) + len(separator) + len(page) <= limit:
+                merged = f"{merged}{separator}{page}"
+                continue
+            if merged is not None:
+                yield merged
+            merged = page
+        if merged is not None:
+            yield merged
+
+    async def send(  # pylint: disable=too-many-arguments
+        self,
+        channel_id: int,
+        send: Callable[..., Coroutine[Any, Any, Any]],
+        pages: Iterable[str],
+        filename: str,
+        limit: int = discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES,
+        *,
+        separator: str = "\n",
+    ):
+        """Sends the pages using the send function, waiting for earlier output to the channel to be sent first. The
+        limit is the upload limit in bytes of the channel, used if the output is uploaded as a file. The separator is
+        put between pages that are merged or written to a file, which should be the line separator of the paginator
+        the pages came from."""
+        merged = self.merge(pages, separator=separator)
+        first = list(islice(merged, self.ATTACHMENT_THRESHOLD + 1))  # Enough to tell if a file is needed.
+        async with self._locks.setdefault(channel_id, Lock()):
+            if len(first) > self.ATTACHMENT_THRESHOLD:
+                await self._wait_for_budget(channel_id)
+                with AttachmentWriter(filename, limit) as writer:
+                    for page in chain(first, merged):  # The rest of the pages are streamed into the file.
+                        writer.write(f"{page}{separator}")
+                    await send_attachment(send, writer)
+                return
+            for page in first:
+                await self._wait_for_budget(channel_id)
+                await send(page)
+
+    async def _wait_for_budget(self, channel_id: int):
+        """Waits until a message can be sent in the channel without exceeding its rate limit."""
+        sent = self._sent.setdefault(channel_id, deque())
+        while sent and perf_counter() - sent[0] >= self.PERIOD:
+            sent.popleft()
+        if len(sent) >= self.RATE:
+            await asleep(sent.popleft() + self.PERIOD - perf_counter())
+        sent.append(perf_counter())
+
+
+class ThreadMemberCache:
+    """Cache of which users are in which threads, so checking if a user is in a private thread does not need a REST
+    request every time. Members of a thread are fetched the first time they are needed, kept up to date from thread
+    member events, and fetched again once the TTL has passed, as member events are not guaranteed to arrive."""
+
+    TTL = 300.0  # Seconds the members of a thread are trusted for after being fetched.
+    MAX_THREADS = 1000  # Number of threads kept before expired threads are pruned.
+
+    def __init__(self, ttl: float = TTL):
+        """Initialization function for ThreadMemberCache class."""
+        self.ttl = ttl
+        self.members: dict[int, tuple[float, set[int]]] = {}  # Thread ID to when it was fetched and its member IDs.
+        self._fetching: dict[int, Task[set[int]]] = {}  # Fetches in progress, shared by concurrent lookups.
+
+    async def contains(self, thread: Thread, user_id: int) -> bool:
+        """Returns if the user is a member of the thread, fetching the members of the thread if they are not cached
+        or have expired."""
+        entry = self.members.get(thread.id)
+        if entry is None or perf_counter() - entry[0] > self.ttl:
+            if (task := self._fetching.get(thread.id)) is None:
+                task = self._fetching[thread.id] = create_task(self._fetch(thread))
+                task.add_done_callback(lambda _: self._fetching.pop(thread.id, None))
+            return user_id in await shield(task)
+        return user_id in entry[1]
+
+    async def _fetch(self, thread: Thread) -> set[int]:
+        """Fetches and caches the member IDs of a thread."""
+        members = {member.id for member in await thread.fetch_members()}
+        if len(self.members) >= self.MAX_THREADS:
+            expired = perf_counter() - self.ttl
+            self.members = {key: entry for key, entry in self.members.items() if entry[0] >= expired}
+        self.members[thread.id] = (perf_counter(), members)
+        return members
+
+    def invalidate(self, thread_id: int):
+        """Forgets the members of a thread, so they are fetched again the next time they are needed."""
+        self.members.pop(thread_id, None)
+
+    async def on_thread_member_join(self, member: discord.ThreadMember):
+        """Adds a user who joined a thread to the cached members of the thread."""
+        if (entry := self.members.get(member.thread_id)) is not None:
+            entry[1].add(member.id)
+
+    async def on_raw_thread_member_remove(self, payload: discord.RawThreadMembersUpdate):
+        """Removes users who left a thread from the cached members of the thread."""
+        if (entry := self.members.get(payload.thread_id)) is not None:
+            entry[1].difference_update(int(user_id) for user_id in payload.data.get("removed_member_ids", []))
+
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        """Forgets the members of a deleted thread."""
+        self.invalidate(payload.thread_id)
+
+    async def on_thread_remove(self, thread: Thread):
+        """Forgets the members of a thread the bot was removed from, as member events for it stop arriving."""
+        self.invalidate(thread.id)
+
+
+class SearchIndex:
+    """Incrementally updated search index used by autocomplete. Names starting with the query are found by bisecting a
+    sorted list, and names containing it through an index of every one to three character substring of the names.
+    Results are ranked with exact matches first, then names starting with the query, then the remaining matches."""
+
+    GRAM_SIZE = 3
+
+    def __init__(self, names: Iterable[str] = ()):
+        """Initialization function for SearchIndex class."""
+        self._grams: dict[str, set[str]] = {}  # Substring to names containing it.
+        self._sorted: list[tuple[str, str]] = sorted({(name.lower(), name) for name in names})  # Lowercase and name.
+        for key, name in self._sorted:
+            for gram in self._name_grams(key):
+                self._grams.setdefault(gram, set()).add(name)
+
+    def __contains__(self, name: object) -> bool:
+        """Returns if a name is in the index."""
+        return isinstance(name, str) and self._find(name) is not None
+
+    def __len__(self) -> int:
+        """Returns the number of names in the index."""
+        return len(self._sorted)
+
+    def _find(self, name: str) -> int | None:
+        """Returns the position of a name in the sorted list, or None if it is not in the index."""
+        index = bisect_left(self._sorted, (name.lower(), name))
+        return index if index < len(self._sorted) and self._sorted[index][1] == name else None
+
+    def _name_grams(self, key: str) -> set[str]:
+        """Function that returns every substring of a lowercase name up to the gram size."""
+        return {key[i : i + n] for n in range(1, self.GRAM_SIZE + 1) for i in range(len(key) - n + 1)}
+
+    def add(self, name: str):
+        """Add a name to the index."""
+        if name in self:
+            return
+        insort(self._sorted, (name.lower(), name))
+        for gram in self._name_grams(name.lower()):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def discard(self, name: str):
+        """Remove a name from the index if it is in it."""
+        if (index := self._find(name)) is None:
+            return
+        del self._sorted[index]
+        for gram in self._name_grams(name.lower()):
+            self._grams[gram].discard(name)
+            if not self._grams[gram]:
+                del self._grams[gram]
+
+    def search(self, query: str, limit: int = 25, predicate: Callable[[str], bool] | None = None) -> list[str]:
+        """Returns up to limit names containing the query, ignoring case, ranked by how well they match. Names the
+        predicate returns False for are skipped."""
+        query = query.lower()
+        results: list[str] = []
+        index = bisect_left(self._sorted, (query,))
+        while index < len(self._sorted) and len(results) < limit and self._sorted[index][0].startswith(query):
+            if predicate is None or predicate(self._sorted[index][1]):
+                results.append(self._sorted[index][1])
+            index += 1
+        if len(results) >= limit or not query:
+            return results
+        size = min(len(query), self.GRAM_SIZE)
+        candidates = sorted(
+            (self._grams.get(query[i : i + size], set()) for i in range(len(query) - size + 1)), key=len
+        )
+        others = candidates[0].intersection(*candidates[1:])
+        ranked = (
+            (position, len(name), name)
+            for name in others
+            if (position := name.lower().find(query)) > 0 and (predicate is None or predicate(name))
+        )  # Matches at position 0 were already found above.
+        return results + [name for _, _, name in heapq.nsmallest(limit - len(results), ranked)]
+
+
+class ModuleIndex:
+    """Index of the module files in the modules directory with their modification times and content hashes. Scanning
+    blocks, so it is done in a thread, letting commands and autocomplete read the index without touching the disk."""
+
+    def __init__(self, path: str = "modules"):
+        """Initialization function for ModuleIndex class."""
+        self.path = path
+        self.files: dict[str, tuple[int, str]] = {}  # Module name to modification time in ns and sha256 of the file.
+        self.names: list[str] = []  # Sorted module names.
+        self.search = SearchIndex()  # Module names, for autocomplete.
+        self._scan_lock = threading.Lock()
+        self._hashes: dict[str, tuple[int, str]] = {}  # File path to modification time in ns and sha256 of the file.
+
+    def __contains__(self, module: object) -> bool:
+        """Returns if there is a module file with the given name."""
+        return module in self.files
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        """Function that returns the sha256 hash of a file's contents."""
+        with open(path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    def scan(self) -> bool:
+        """Rescan the modules directory, only hashing files that are new or have a new modification time. Blocks, so it
+        should be run in a thread. Returns if any module files were added, removed or changed."""
+        with self._scan_lock:
+            files = {}
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".py") or not entry.is_file():
+                        continue
+                    name, mtime = entry.name[:-3], entry.stat().st_mtime_ns
+                    known = self.files.get(name)
+                    files[name] = known if known and known[0] == mtime else (mtime, self._hash_file(entry.path))
+            if files == self.files:
+                return False
+            # Replaced rather than mutated, so readers never see a mix.
+            self.files, self.names, self.search = files, sorted(files), SearchIndex(files)
+            return True
+
+    def source_hash(self, module: str) -> str | None:
+        """Returns a hash of a module's file together with the files in its local package directory, `modules/<name>/`,
+        if it has one. Returns None if the module file does not exist. Blocks, so it should be run in a thread."""
+        try:
+            digest = hashlib.sha256(self._cached_hash(os.path.join(self.path, f"{module}.py")).encode())
+            for root, dirs, files in os.walk(os.path.join(self.path, module)):
+                dirs[:] = sorted(folder for folder in dirs if folder != "__pycache__")  # Walk in a stable order.
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    digest.update(f"{os.path.relpath(path, self.path)}:{self._cached_hash(path)}".encode())
+        except FileNotFoundError:
+            return None
+        return digest.hexdigest()
+
+    def _cached_hash(self, path: str) -> str:
+        """Function that returns the sha256 hash of a file, only reading it again if its modification time changed."""
+        mtime = os.stat(path).st_mtime_ns
+        known = self._hashes.get(path)
+        if known is None or known[0] != mtime:
+            known = self._hashes[path] = (mtime, self._hash_file(path))
+        return known[1]
+
+    async def refresh(self) -> bool:
+        """Rescan the modules directory in a thread. Returns if any module files were added, removed or changed."""
+        return await to_thread(self.scan)
+
+    async def find(self, module: str) -> bool:
+        """Returns if there is a module file with the given name. The directory is only rescanned if the module is not
+        in the index, in case its file was added since the index was last polled."""
+        if module in self.files:
+            return True
+        await self.refresh()
+        return module in self.files
+
+
+class FetchCache:
+    """Bounded cache of users and channels fetched from Discord. Objects that were not found are cached as well, so
+    repeating an ID that does not exist does not repeat the request. Entries expire after a TTL, which is shorter for
+    objects that were not found, as they might just not be visible yet. The least recently used entries are dropped
+    once the cache is full."""
+
+    TTL = 300.0  # Seconds fetched objects are kept for.
+    MISSING_TTL = 60.0  # Seconds objects that were not found are remembered as missing for.
+    SIZE = 1000
+
+    def __init__(self, size: int = SIZE):
+        """Initialization function for FetchCache class."""
+        self.size = size
+        self.entries: OrderedDict[tuple[str, int], tuple[float, Any]] = OrderedDict()  # Key to expiry and object.
+
+    async def get(self, kind: str, object_id: int, fetch: Callable[[int], Coroutine[Any, Any, _T]]) -> _T | None:
+        """Returns the object of the kind with the given ID, using the fetch function if it is not cached. Returns
+        None if the object was not found."""
+        key = (kind, object_id)
+        if (entry := self.entries.get(key)) is not None and perf_counter() < entry[0]:
+            self.entries.move_to_end(key)
+            return entry[1]
+        try:
+            fetched: _T | None = await fetch(object_id)
+        except NotFound:
+            fetched = None
+        self.entries[key] = (perf_counter() + (self.TTL if fetched is not None else self.MISSING_TTL), fetched)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return fetched
+
+
+_CHANNEL_ARGUMENT_PATTERN = re_cmp(r"<(@!?|#)([0-9]{15,20})>|([0-9]{15,20})")  # User or channel mention, or an ID.
+
+
+async def _convert_global_channel(ctx: Context, argument: str, kinds: tuple[type, ...] | None, error: str) -> Any:
+    """Function that resolves the argument of the global channel converters to a channel, or to the DM channel of a
+    user. Mentions and IDs are looked up directly by ID, first in the cache and then by fetching them, while other
+    arguments are treated as names. Bare IDs are only fetched as channels, users are only fetched for user mentions.
+    Only channels of the given kinds are accepted, or any kind if none are given."""
+    if argument.lower() in ("dm", "dms", "pm", "pms"):
+        return ctx.author.dm_channel or await ctx.author.create_dm()  # Get DM channel if asked for.
+    bot: TravusBotBase = ctx.bot
+    found: Any = None
+    if match := _CHANNEL_ARGUMENT_PATTERN.fullmatch(argument):
+        mention, object_id = match.group(1), int(match.group(2) or match.group(3))
+        user_mention = mention is not None and mention != "#"
+        if not user_mention:  # Channel mentions and bare IDs.
+            found = bot.get_channel(object_id)
+        if found is None and mention != "#":  # User mentions, and bare IDs of cached users.
+            found = bot.get_user(object_id)
+        if found is None and user_mention:
+            found = await bot.fetch_cache.get("user", object_id, bot.fetch_user)
+        elif found is None:  # Bare IDs are fetched as channels only, sparing a failed user request for every channel.
+            found = await bot.fetch_cache.get("channel", object_id, bot.fetch_channel)
+    else:  # Names are looked up in the cache only, so trying each kind in turn makes no requests.
+        for converter in (commands.UserConverter(), commands.TextChannelConverter(), commands.ThreadConverter()):
+            try:
+                found = await converter.convert(ctx, argument)
+                break
+            except commands.BadArgument:
+                pass
+    if isinstance(found, discord.abc.User):
+        return found.dm_channel or await found.create_dm()
+    if found is None or (kinds is not None and not isinstance(found, kinds)):
+        raise commands.UserInputError(error)
+    return found
 
 
 class GlobalChannel(commands.Converter):
@@ -108,30 +1079,7 @@ class GlobalChannel(commands.Converter):
             if isinstance(ctx.channel, PartialMessageable):
                 raise commands.UserInputError(f"Unable to get channel details for channel ID: {ctx.channel.id}")
             return ctx.channel  # Get current channel if asked for.
-        if isinstance(argument, str) and argument.lower() in ["dm", "dms", "pm", "pms"]:
-            dm_channel = ctx.author.dm_channel or await ctx.author.create_dm()  # Get DM channel if asked for.
-            return dm_channel
-        try:
-            user = await commands.UserConverter().convert(ctx, argument)
-            dm_channel = user.dm_channel or await user.create_dm()
-            return dm_channel
-        except commands.UserNotFound:
-            pass
-        try:
-            return await commands.TextChannelConverter().convert(ctx, argument)
-        except commands.ChannelNotFound:  # Channel not in server.
-            pass
-        try:
-            return await commands.ThreadConverter().convert(ctx, argument)
-        except commands.ThreadNotFound:
-            pass
-        try:
-            converted = await ctx.bot.fetch_channel(int(argument))
-            if converted is None:
-                raise commands.UserInputError("Could not identify channel.")
-            return converted
-        except ValueError:
-            raise commands.UserInputError("Could not identify channel.") from None
+        return await _convert_global_channel(ctx, argument, None, "Could not identify channel.")
 
 
 class GlobalTextChannel(commands.Converter):
@@ -147,30 +1095,12 @@ class GlobalTextChannel(commands.Converter):
             if isinstance(ctx.channel, VoiceChannel):
                 raise commands.UserInputError("Channel is voice and not text channel.")
             return ctx.channel  # Get current channel if asked for.
-        if isinstance(argument, str) and argument.lower() in ["dm", "dms", "pm", "pms"]:
-            dm_channel = ctx.author.dm_channel or await ctx.author.create_dm()  # Get DM channel if asked for.
-            return dm_channel
-        try:
-            user = await commands.UserConverter().convert(ctx, argument)
-            dm_channel = user.dm_channel or await user.create_dm()
-            return dm_channel
-        except commands.UserNotFound:
-            pass
-        try:
-            return await commands.TextChannelConverter().convert(ctx, argument)
-        except commands.ChannelNotFound:  # Channel not in server.
-            pass
-        try:
-            return await commands.ThreadConverter().convert(ctx, argument)
-        except commands.ThreadNotFound:
-            pass
-        try:
-            converted = await ctx.bot.fetch_channel(int(argument))
-            if not converted or not isinstance(converted, (GroupChannel, ForumChannel, TextChannel, Thread)):
-                raise commands.UserInputError("Could not identify text channel.")
-            return converted
-        except ValueError:
-            raise commands.UserInputError("Could not identify text channel.") from None
+        return await _convert_global_channel(
+            ctx,
+            argument,
+            (DMChannel, GroupChannel, ForumChannel, TextChannel, Thread),
+            "Could not identify text channel.",
+        )
 
 
 class TBBContext(commands.Context):
@@ -182,7 +1112,7 @@ class TBBContext(commands.Context):
 class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instance-attributes
     """Custom bot class with database connection."""
 
-    db: asyncpg.Pool
+    db: DatabasePool
 
     class _HelpInfo:
         """Class that holds help info for commands."""
@@ -206,6 +1136,7 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             self.roles = res["roles"] if isinstance(res, dict) and "roles" in res else []
             self.other_restrictions = res["other"] if isinstance(res, dict) and "other" in res else ""
             self.owner_only, self.guild_only, self.dm_only = False, False, False
+            self._embed: tuple[str, Embed] | None = None  # Prefix and embed it was rendered with, footer excluded.
 
             if isinstance(command, (app_commands.Command, app_commands.Group)):
                 doc = command.callback.__doc__ if isinstance(command, app_commands.Command) else command.__doc__
@@ -225,8 +1156,19 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
                         self.dm_only = True
 
         def make_help_embed(self, ctx: Context) -> Embed:
-            """Creates embeds for command based on info stored in class."""
-            embed = Embed(colour=discord.Color(0x4A4A4A), timestamp=discord.utils.utcnow())
+            """Creates embeds for command based on info stored in class. The embed is only rendered again if the prefix
+            changed, otherwise a copy of the last one is given the current timestamp and footer."""
+            prefix = "/" if self.is_slash else self.get_prefix(ctx.guild)
+            if self._embed is None or self._embed[0] != prefix:
+                self._embed = (prefix, self._render_embed(prefix))
+            embed = self._embed[1].copy()
+            embed.timestamp = discord.utils.utcnow()
+            embed.set_footer(text=ctx.author.display_name, icon_url=ctx.author.display_avatar)
+            return check_embed_length(ctx.author, embed)
+
+        def _render_embed(self, prefix: str) -> Embed:
+            """Renders the help embed for the command, without a timestamp and footer."""
+            embed = Embed(colour=discord.Color(0x4A4A4A))
             description = f"Category: {self.category.title()}\n\n{self.description}"
             embed.description = description if len(description) < 4097 else f"{description[:4092]}..."
             embed.set_author(name=f"{self.name.title()} Command"[:255])
@@ -243,7 +1185,6 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             )
             restrictions += f"\n{self.other_restrictions}" if self.other_restrictions else ""
             embed.add_field(name="Restrictions", value=f"```{restrictions[:1017]}```", inline=True)
-            prefix = "/" if self.is_slash else self.get_prefix()
             examples = "\n".join(
                 [
                     f"`{prefix}{self.name} {example}`" if example else f"`{prefix}{self.name}`"
@@ -251,8 +1192,7 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
                 ]
             )
             embed.add_field(name="Examples", value=examples[:1017] or "No examples found.", inline=False)
-            embed.set_footer(text=ctx.author.display_name, icon_url=ctx.author.display_avatar)
-            return check_embed_length(ctx.author, embed)
+            return embed
 
     class _ModuleInfo:
         """Class that holds info for modules."""
@@ -316,12 +1256,15 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             """Route output to interaction response or channel depending on invocation method."""
             if self.context.interaction is not None:
                 await self.context.bot.send_response(self.context.interaction, content or "", embed=embed)
+            elif embed is not None:
+                await self.context.send(content, embed=embed)
             else:
-                assert self.context.channel is not None
-                if embed is not None:
-                    await self.context.channel.send(content, embed=embed)
-                else:
-                    await self.context.channel.send(content)
+                await self.context.send(content)
+
+        async def _deliver_pages(self, pages: list[str]):
+            """Route output of several messages through the outbound queue of the channel. Pages are command list
+            pages, which separate their lines themselves."""
+            await self.context.bot.send_pages(self.context.interaction or self.context, pages, separator="")
 
         async def _send_help_entry(self, name: str):  # pylint: disable=too-many-return-statements
             """Look up and send help for a command by name, checking both prefix and slash help dicts."""
@@ -329,7 +1272,9 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             invoked_via_slash = self.context.interaction is not None
             core_slash_cmds = bot._core_slash_commands  # pylint: disable=protected-access
             core_prefix_cmds = bot._core_prefix_commands  # pylint: disable=protected-access
-            core_slash_top_names = {com.name for com in core_slash_cmds}
+            core_slash_top_names = bot.cached_help(
+                "core_slash_top_names", lambda: {com.name for com in core_slash_cmds}
+            )
 
             if invoked_via_slash:
                 primary, secondary = bot.slash_help, bot.help
@@ -388,19 +1333,54 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
 
             await self._deliver(f"No command called `{name}` found.")
 
-        async def _send_command_list(self, full_mapping: set[Command]):
-            """Help function which sends the command list. Factored out for DRYer code."""
-            categories: dict[str, list[str]] = {}  # List of categorized commands.
+        async def _permission_class(self) -> tuple:
+            """Returns what command checks commonly depend on for the user in the current channel. Users with the same
+            permission class see the same commands."""
+            ctx = self.context
+            author = ctx.author
+            return (
+                ctx.guild.id if ctx.guild else None,
+                ctx.channel.is_nsfw() if isinstance(ctx.channel, (TextChannel, VoiceChannel, Thread)) else False,
+                await ctx.bot.is_owner(author),
+                ctx.permissions.value,
+                frozenset(role.id for role in author.roles) if isinstance(author, Member) else frozenset(),
+            )
+
+        async def _visible_commands(self, full_mapping: set[Command]) -> dict[str, Command]:
+            """Returns the commands the user can run, as well as the ones they can only run in DMs, marked with ¹. This
+            is cached per permission class, as running every check is slow with many commands."""
+            bot = self.context.bot
+            key = ("visible_commands", frozenset(full_mapping), await self._permission_class())
+            if (filtered_mapping := bot._help_cache.get(key)) is not None:  # pylint: disable=protected-access
+                return filtered_mapping
             filtered_mapping = {f"`{com.qualified_name}`": com for com in await self.filter_commands(full_mapping)}
             non_passing = list(set(full_mapping).difference(set(filtered_mapping.values())))
             new_message = copy.copy(self.context.message)
             new_message.guild = None
-            new_ctx = await self.context.bot.get_context(new_message)
+            new_ctx = await bot.get_context(new_message)
             dm_only = {f"`{com.qualified_name}`¹": com for com in non_passing if await can_run(com, new_ctx)}
             filtered_mapping.update(dm_only)
+            return bot.cached_help(key, lambda: filtered_mapping)
+
+        async def _send_command_list(self, full_mapping: set[Command]):
+            """Help function which sends the command list. Factored out for DRYer code."""
+            filtered_mapping = await self._visible_commands(full_mapping)
             if not filtered_mapping:
                 await self._deliver("No help information was found.")
                 return
+            bot = self.context.bot
+            prefix = "/" if self.context.interaction else bot.get_bot_prefix(self.context.guild)
+            pages = bot.cached_help(
+                ("command_list", frozenset(filtered_mapping.items()), prefix, bot.core_commands_mode),
+                lambda: self._paginate_command_list(filtered_mapping, prefix),
+            )
+            mention = self.context.message.author.mention
+            await self._deliver_pages([page.replace(HELP_MENTION, mention) for page in pages])
+
+        def _paginate_command_list(self, filtered_mapping: dict[str, Command], prefix: str) -> list[str]:
+            """Categorize and paginate the command list. The mention of the user is left as a placeholder, so pages can
+            be reused for anyone with access to the same commands."""
+            categories: dict[str, list[str]] = {}  # List of categorized commands.
             for com_text, com in filtered_mapping.items():
                 if com.qualified_name in self.context.bot.help:
                     command_help = self.context.bot.help[com.qualified_name]  # Get command help info.
@@ -410,7 +1390,7 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
                     categories[category].append(com_text)  # Add command to category.
 
             paginator = commands.Paginator(prefix="", suffix="", linesep="")
-            paginator.add_line(f"__**Help Info {self.context.message.author.mention}:**__\n\n")
+            paginator.add_line(f"__**Help Info {HELP_MENTION}:**__\n\n")
             for category in sorted(categories.keys()):
                 if categories[category] == ["`help`"]:
                     continue  # Skip categories where `help` is the only visible prefix command.
@@ -420,14 +1400,12 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
                 for com in category_commands:
                     paginator.add_line(self.remove_mentions(com))
             end = "1 = In DMs only.\n" if any("¹" in elem for cat in categories.values() for elem in cat) else ""
-            prefix = "/" if self.context.interaction else self.context.bot.get_bot_prefix()
             end += f"Use `{prefix}help <COMMAND>` for more info on individual commands."
             if self.context.bot.core_commands_mode in ("slash", "both"):
                 end += f"\nSlash commands are discoverable via Discord's built-in UI. Use `{prefix}help <COMMAND>` "
                 end += "for details."
             paginator.add_line(end)
-            for page in paginator.pages:
-                await self._deliver(page)
+            return paginator.pages
 
         async def send_bot_help(self, mapping, /):
             """Function that triggers when help command is used without command."""
@@ -483,12 +1461,15 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             else:
                 await self._deliver(error)
 
-    def __init__(self, database_credentials: DatabaseCredentials, *args, **kwargs):
-        """Initialization function loading all necessary information for TravusBotBase class."""
+    def __init__(
+        self, database_credentials: DatabaseCredentials, *args, metrics_port: str | int | None = None, **kwargs
+    ):
+        """Initialization function loading all necessary information for TravusBotBase class. If a metrics port is
+        given, command metrics are served in the Prometheus text format on that port on localhost."""
+        self.command_search = SearchIndex()  # Names of top level prefix commands. Set first, Bot adds commands in init.
         super().__init__(*args, **kwargs)
         self.log: logging.Logger = BOT_LOG
-        self.last_module_error: str | None = None
-        self.last_error: str | None = None
+        self.errors = ErrorLog()
         self.extension_ctx: Context | Interaction | None = None
         self.help: dict[str, TravusBotBase._HelpInfo] = {}
         self.slash_help: dict[str, TravusBotBase._HelpInfo] = {}
@@ -496,14 +1477,55 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         self.is_connected: int = 0
         self.help_command = self._CustomHelp()
         self.config: dict[str, str] = {}
+        self.settings: dict[str, str] = {}
+        self.command_states: dict[str, int] = {}
+        self.default_modules: set[str] = set()
+        self.tree_hashes: dict[str, str] = {}  # Hash of the last synced tree payload per scope.
+        self._sync_lock = Lock()  # Syncs are queued, as they share rate limits.
+        self._pending_sync: Task[bool] | None = None  # Debounced sync shared by callers within the debounce window.
+        self.module_index = ModuleIndex("modules")
+        self._module_watcher: Task[None] | None = None
+        self._help_cache: dict[Any, Any] = {}  # Rendered help, cleared whenever anything it depends on changes.
+        for event in (
+            "on_guild_role_create",
+            "on_guild_role_update",
+            "on_guild_role_delete",
+            "on_guild_channel_update",
+        ):
+            self.add_listener(self._on_permissions_changed, event)
+        self.help_search = SearchIndex()  # Names of help entries, both prefix and slash.
+        self.module_search = SearchIndex()  # Names of modules with module info.
+        self.config_search = SearchIndex()  # Names of config options.
+        self.extension_search = SearchIndex()  # Names of loaded modules.
+        self.default_module_search = SearchIndex()  # Names of default modules.
+        self.module_hashes: dict[str, str] = {}  # Extension name to source hash of module when it was (re)loaded.
+        self.startup_timings: dict[str, float] = {}  # Duration of each startup phase in seconds.
+        self.command_metrics = CommandMetrics()
+        self.loop_monitor = LoopMonitor()
+        self.outbound = OutboundQueue()
+        self.thread_members = ThreadMemberCache()
+        self.fetch_cache = FetchCache()  # Users and channels fetched by converters.
+        for listener in (
+            "on_thread_member_join",
+            "on_raw_thread_member_remove",
+            "on_raw_thread_delete",
+            "on_thread_remove",
+        ):
+            self.add_listener(getattr(self.thread_members, listener), listener)
+        self._metrics_port = int(metrics_port) if metrics_port is not None else None
+        self._metrics_runner: web.AppRunner | None = None
+        self._instance_id = uuid4().hex  # Identifies cache changes made by this instance.
+        self._cache_listener: asyncpg.Connection | None = None
         self._db_creds = database_credentials
         self.prefix: str | None = None
+        self.guild_prefixes: dict[int, str] = {}  # Server ID to the prefix of that server.
+        self._prefixes: dict[int | None, list[str]] = {}  # Prefixes matched per server ID, cleared when they change.
         self.delete_messages: int = 1
         self.ephemeral: bool = True
         self.core_commands_mode: str = "slash"
         self._core_slash_commands: list[app_commands.Command | app_commands.Group] = []
         self._core_prefix_commands: list[Command | commands.Group] = []
-        self.send_long_text: Callable[[Context, str], Coroutine[Any, Any, None]] = send_long_text
+        self.send_long_text: Callable[[Context, str | AttachmentWriter], Coroutine[Any, Any, None]] = send_long_text
 
     async def get_context(
         self, origin: Message | Interaction, /, *, cls: type[_ContextT] | None = None
@@ -512,50 +1534,282 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         return await super().get_context(origin, cls=cls or TBBContext)
 
     async def _load_db_options(self):
-        """Create, set up and query database for info. Create default values if database is empty."""
-        async with self.db.acquire() as conn:
-            async with conn.transaction():
-                await conn.execute(
-                    "CREATE TABLE IF NOT EXISTS settings(key VARCHAR PRIMARY KEY NOT NULL, value VARCHAR)"
-                )
-                await conn.execute("CREATE TABLE IF NOT EXISTS default_modules(module VARCHAR PRIMARY KEY NOT NULL)")
-                await conn.execute(
-                    "CREATE TABLE IF NOT EXISTS command_states(command VARCHAR PRIMARY KEY NOT NULL, "
-                    "state INTEGER NOT NULL)"
-                )
-                await conn.execute("CREATE TABLE IF NOT EXISTS config(key VARCHAR PRIMARY KEY NOT NULL, value VARCHAR)")
-                await conn.execute(
-                    "INSERT INTO settings VALUES ('additional_credits', '') ON CONFLICT (key) DO NOTHING"
-                )
-                await conn.execute("INSERT INTO settings VALUES ('bot_description', '') ON CONFLICT (key) DO NOTHING")
-                await conn.execute("INSERT INTO settings VALUES ('delete_messages', '0') ON CONFLICT (key) DO NOTHING")
-                await conn.execute("INSERT INTO settings VALUES ('prefix', '!') ON CONFLICT (key) DO NOTHING")
-                await conn.execute("INSERT INTO settings VALUES ('ephemeral', '1') ON CONFLICT (key) DO NOTHING")
-                await conn.execute(
-                    "INSERT INTO settings VALUES ('core_commands_mode', 'slash') ON CONFLICT (key) DO NOTHING"
-                )
-            loaded_prefix = await self.db.fetchval("SELECT value FROM settings WHERE key = 'prefix'")
-            delete_msgs = await conn.fetchval("SELECT value FROM settings WHERE key = 'delete_messages'")
-            ephemeral = await conn.fetchval("SELECT value FROM settings WHERE key = 'ephemeral'")
-            core_mode = await conn.fetchval("SELECT value FROM settings WHERE key = 'core_commands_mode'")
-            config = await conn.fetch("SELECT key, value FROM config")
+        """Migrate database to the current schema, fill the cache and start listening for changes to it."""
+        await self.migrate("core", CORE_MIGRATIONS)
+        await self._load_cache()
+        await self._listen_for_cache_changes()
+        self.add_command_help(
+            next(com for com in self.commands if com.name == "help"), "Core", None, ["", "about", "help"]
+        )  # Add help info for help command.
 
-        self.prefix = loaded_prefix or None
+    async def _load_cache(self):
+        """Load the settings, config, command_states, default_modules, tree_hashes and guild_prefixes tables into the
+        cache in a single query."""
+        async with self.db.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT 'settings' AS source, key, value FROM settings "
+                "UNION ALL SELECT 'config' AS source, key, value FROM config "
+                "UNION ALL SELECT 'command_states' AS source, command, state::VARCHAR FROM command_states "
+                "UNION ALL SELECT 'default_modules' AS source, module, NULL FROM default_modules "
+                "UNION ALL SELECT 'tree_hashes' AS source, scope, hash FROM tree_hashes "
+                "UNION ALL SELECT 'guild_prefixes' AS source, guild_id::VARCHAR, prefix FROM guild_prefixes"
+            )
+        self.settings = {row["key"]: row["value"] for row in rows if row["source"] == "settings"}
+        self.config.clear()  # Cleared in place, modules may hold a reference to the config dict.
+        self.config.update((row["key"], row["value"]) for row in rows if row["source"] == "config")
+        self.config_search = SearchIndex(self.config)
+        self.command_states = {row["key"]: int(row["value"]) for row in rows if row["source"] == "command_states"}
+        self.default_modules = {row["key"] for row in rows if row["source"] == "default_modules"}
+        self.default_module_search = SearchIndex(self.default_modules)
+        self.tree_hashes = {row["key"]: row["value"] for row in rows if row["source"] == "tree_hashes"}
+        self.guild_prefixes = {int(row["key"]): row["value"] for row in rows if row["source"] == "guild_prefixes"}
+        self._apply_settings()
+        for command in self.commands:
+            self._apply_command_state(command, self.command_states.get(self._command_state_key(command), 0))
+
+    def _apply_settings(self):
+        """Update the attributes derived from the settings cache, such as the prefix and the bot's about info."""
+        self.invalidate_help_cache()
+        delete_msgs = self.settings.get("delete_messages")
+        ephemeral = self.settings.get("ephemeral")
+        core_mode = self.settings.get("core_commands_mode")
+        self.prefix = self.settings.get("prefix") or None
+        self._prefixes.clear()
         self.delete_messages = int(delete_msgs) if delete_msgs is not None else 1
         self.ephemeral = bool(int(ephemeral)) if ephemeral is not None else True
         self.core_commands_mode = core_mode if core_mode in ("slash", "prefix", "both") else "slash"
-        self.add_command_help(
-            next(com for com in self.commands if com.name == "help"), "Core", None, ["", "about", "help"]
-        )  # Add help info for help command.
-        for key, value in [(pair["key"], pair["value"]) for pair in config]:
-            self.config[key] = value
+        if self.user is not None and self.user.name.lower() in self.modules:
+            bot_module = self.modules[self.user.name.lower()]
+            bot_module.description = (self.settings.get("bot_description") or NO_DESCRIPTION).replace("\n", " ")
+            bot_credits = self.settings.get("additional_credits")
+            bot_module.credits = (
+                bot_credits.replace("\\n", "\n").replace("\\r", "\n").replace("\\t", "\t").replace("\t", "\u202f" * 5)
+                if bot_credits
+                else None
+            )
+
+    async def _listen_for_cache_changes(self):
+        """Open a dedicated connection outside the pool that listens for cache changes made by other instances sharing
+        the database, so listening does not take a connection away from queries."""
+        self._cache_listener = await asyncpg.connect(**self._db_creds.connection_options())
+        self._cache_listener.add_termination_listener(self._on_cache_listener_lost)
+        await self._cache_listener.add_listener(CACHE_CHANNEL, self._on_cache_notification)
+
+    def _on_cache_notification(self, _conn: asyncpg.Connection, _pid: int, _channel: str, payload: str):
+        """Apply a cache change published by another instance."""
+        change = json.loads(payload)
+        if change["origin"] == self._instance_id:  # Already applied when it was written.
+            return
+        if "key" not in change:  # Change was too large to publish, reload the cache instead.
+            self.loop.create_task(self._reload_cache())
+            return
+        self._apply_cache_change(change["table"], change["key"], change["value"])
+        if change["table"] in ("settings", "command_states"):
+            self.loop.create_task(self._apply_remote_settings())
+
+    async def _reload_cache(self):
+        """Reload the whole cache, then enforce core commands mode again, as reloading command states re-enables core
+        prefix commands that have no stored state."""
+        await self._load_cache()
+        await self._apply_remote_settings()
+
+    async def _apply_remote_settings(self):
+        """Enforce core commands mode and refresh status after settings were changed by another instance."""
+        await self._apply_core_commands_mode(sync=False)  # The instance that made the change syncs the tree.
+        if self.is_ready():
+            await self.update_status()
+
+    def _on_cache_listener_lost(self, _conn: asyncpg.Connection):
+        """Reconnect the cache listener if its connection is lost, as changes may have been missed meanwhile."""
+        if not self.is_closed():
+            self.log.warning("Lost database listener connection. Reconnecting and reloading cache.")
+            self.loop.create_task(self._restore_cache_listener())
+
+    async def _close_cache_listener(self):
+        """Close the cache listener connection, without it being treated as lost."""
+        if self._cache_listener is not None:
+            self._cache_listener.remove_termination_listener(self._on_cache_listener_lost)
+            with suppress(Exception):  # Connection may already be gone, in which case there is nothing to close.
+                await self._cache_listener.close(timeout=5)
+            self._cache_listener = None
+
+    async def _restore_cache_listener(self):
+        """Re-establish the cache listener connection and reload the cache, retrying until the database is back."""
+        while not self.is_closed():
+            await self._close_cache_listener()  # Also closes what is left of a failed attempt.
+            try:
+                await self._listen_for_cache_changes()
+                await self._reload_cache()
+                self.log.info("Database listener connection restored.")
+                return
+            except (OSError, asyncpg.exceptions.PostgresError):
+                await asleep(5)
+
+    def _apply_cache_change(self, table: str, key: str, value: str | None):
+        """Apply a single change to the cache. A value of None means the entry was removed."""
+        if table == "settings":
+            self.settings[key] = value or ""
+            self._apply_settings()
+        elif table == "config":
+            self.invalidate_help_cache()  # Commands may require config options to be set.
+            if value is None:
+                self.config.pop(key, None)
+                self.config_search.discard(key)
+            else:
+                self.config[key] = value
+                self.config_search.add(key)
+        elif table == "command_states" and value is not None:
+            self.command_states[key] = int(value)
+            self.invalidate_help_cache()
+            for command in self.commands:
+                if self._command_state_key(command) == key:
+                    self._apply_command_state(command, int(value))
+        elif table == "default_modules":
+            if value is None:
+                self.default_modules.discard(key)
+                self.default_module_search.discard(key)
+            else:
+                self.default_modules.add(key)
+                self.default_module_search.add(key)
+        elif table == "tree_hashes" and value is not None:
+            self.tree_hashes[key] = value
+        elif table == "guild_prefixes":
+            self._prefixes.pop(int(key), None)
+            if value is None:
+                self.guild_prefixes.pop(int(key), None)
+            else:
+                self.guild_prefixes[int(key)] = value
+
+    async def _write_through(self, table: str, key: str, value: str | None, query: str, *args: Any) -> bool:
+        """Run a write query for a cached table, update the cache, and notify other instances of the change once the
+        transaction commits. Returns False if the query did not affect any rows, in which case nothing is changed."""
+        change = {"origin": self._instance_id, "table": table, "key": key, "value": value}
+        payload = json.dumps(change)
+        if len(payload.encode()) > 7900:  # NOTIFY payloads must be below 8000 bytes, others reload instead.
+            payload = json.dumps({"origin": self._instance_id, "table": table})
+        async with self.db.acquire() as conn, conn.transaction():
+            status = await conn.execute(query, *args)
+            if status.endswith(" 0"):
+                return False
+            await conn.execute("SELECT pg_notify($1, $2)", CACHE_CHANNEL, payload)
+        self._apply_cache_change(table, key, value)
+        return True
+
+    async def set_setting(self, key: str, value: str):
+        """Sets a bot setting, such as the prefix, for this and every other instance sharing the database."""
+        await self._write_through(
+            "settings",
+            key,
+            value,
+            "INSERT INTO settings VALUES ($1, $2) ON CONFLICT (key) DO UPDATE SET value = $2",
+            key,
+            value,
+        )
+
+    async def set_guild_prefix(self, guild_id: int, prefix: str):
+        """Sets the prefix of a server for this and every other instance sharing the database. The global prefix keeps
+        working in the server as well."""
+        await self._write_through(
+            "guild_prefixes",
+            str(guild_id),
+            prefix,
+            "INSERT INTO guild_prefixes VALUES ($1, $2) ON CONFLICT (guild_id) DO UPDATE SET prefix = $2",
+            guild_id,
+            prefix,
+        )
+
+    async def unset_guild_prefix(self, guild_id: int) -> bool:
+        """Removes the prefix of a server for this and every other instance. Returns False if it had no prefix."""
+        if guild_id not in self.guild_prefixes:
+            return False
+        return await self._write_through(
+            "guild_prefixes", str(guild_id), None, "DELETE FROM guild_prefixes WHERE guild_id = $1", guild_id
+        )
+
+    async def set_config(self, key: str, value: str):
+        """Sets a configuration option for this and every other instance sharing the database."""
+        await self._write_through(
+            "config",
+            key,
+            value,
+            "INSERT INTO config VALUES ($1, $2) ON CONFLICT (key) DO UPDATE SET value = $2",
+            key,
+            value,
+        )
+
+    async def unset_config(self, key: str) -> bool:
+        """Removes a configuration option for this and every other instance. Returns False if it was not set."""
+        return await self._write_through("config", key, None, "DELETE FROM config WHERE key = $1", key)
+
+    def get_command_state(self, command: Command) -> int:
+        """Returns the stored state of a command. 0 is normal, 1 is hidden, 2 is disabled, 3 is hidden and disabled."""
+        return self.command_states.get(self._command_state_key(command), 0)
+
+    async def set_command_state(self, command: Command, state: int):
+        """Sets the state of a command for this and every other instance sharing the database."""
+        key = self._command_state_key(command)
+        await self._write_through(
+            "command_states",
+            key,
+            str(state),
+            "INSERT INTO command_states VALUES ($1, $2) ON CONFLICT (command) DO UPDATE SET state = $2",
+            key,
+            state,
+        )
+
+    async def add_default_module(self, module: str) -> bool:
+        """Adds a default module for this and every other instance. Returns False if it already was a default module."""
+        if module in self.default_modules:  # The cache is kept in sync, so no need to ask the database.
+            return False
+        return await self._write_through(
+            "default_modules", module, module, "INSERT INTO default_modules VALUES ($1) ON CONFLICT DO NOTHING", module
+        )
+
+    async def remove_default_module(self, module: str) -> bool:
+        """Removes a default module for this and every other instance. Returns False if it was not a default module."""
+        if module not in self.default_modules:
+            return False
+        return await self._write_through(
+            "default_modules", module, None, "DELETE FROM default_modules WHERE module = $1", module
+        )
+
+    async def migrate(self, namespace: str, migrations: list[str | list[str]]) -> int:
+        """Applies numbered schema migrations for a namespace, such as a module name. Migration N is the Nth element of
+        the list, and is either a single SQL statement or a list of them. Migrations are applied once and in order, each
+        pending one in the same transaction, so they should only ever be appended to. Returns the schema version."""
+        async with self.db.acquire() as conn:
+            try:
+                version = await conn.fetchval("SELECT version FROM schema_version WHERE namespace = $1", namespace)
+            except asyncpg.exceptions.UndefinedTableError:  # Database predates versioned migrations, or is empty.
+                version = None
+            if version is not None and version >= len(migrations):
+                return version
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('schema_version'))")  # Serialize instances.
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_version(namespace VARCHAR PRIMARY KEY NOT NULL, "
+                    "version INTEGER NOT NULL)"
+                )
+                version = await conn.fetchval("SELECT version FROM schema_version WHERE namespace = $1", namespace) or 0
+                for number, migration in enumerate(migrations[version:], version + 1):
+                    for statement in [migration] if isinstance(migration, str) else migration:
+                        await conn.execute(statement)
+                    self.log.info(f"Applied migration {number} for '{namespace}'.")
+                if version < len(migrations):
+                    version = len(migrations)
+                    await conn.execute(
+                        "INSERT INTO schema_version VALUES ($1, $2) ON CONFLICT (namespace) DO UPDATE SET version = $2",
+                        namespace,
+                        version,
+                    )
+        return version
 
     async def _load_default_commands(self):
         """Load the default commands from core_commands.py"""
         try:
             if "core_commands.py" in os.listdir("."):
                 await self.load_extension("core_commands")
-                await self.update_command_states()
+                await self.update_command_states(self.extension_commands("core_commands"))
             else:
                 raise FileNotFoundError("Core commands file not found.")
         except FileNotFoundError:
@@ -569,88 +1823,206 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             await self.db.close()
             exit(3)
 
-    async def _load_default_modules(self):
-        """Load default modules once bot has cached."""
-
-        async def load_module(default_list: list[str], module: str, propagate=False) -> bool:
-            """Attempt to load a module, and recursively attempts to load dependencies."""
-            if module not in default_list:
-                return False
-            default_list.remove(module)
-
-            old_help = dict(self.help)  # Save module and help info before loading in case we need to roll back.
-            old_modules = dict(self.modules)
-            self.extension_ctx = None
-            try:  # Try loading default module.
-                if f"{module}.py" in os.listdir("modules"):
-                    await self.load_extension(f"modules.{module}")
-                else:
-                    raise FileNotFoundError("Core commands file not found.")
-            except FileNotFoundError:  # If module wasn't found.
-                if propagate:
-                    raise
-                self.last_error = f"Default module '{module}' not found."
-                self.log.warning(f"Default module '{module}' not found.")
-                return False
-            except commands.ExtensionFailed as e:
-                self.help = old_help
-                self.modules = old_modules
-                if propagate:
-                    raise
-                if isinstance(e.original, DependencyError) and all(
-                    load_module(default_list, dependency) for dependency in e.original.missing_dependencies
-                ):
+    @staticmethod
+    def _prepare_module(module: str) -> set[str]:
+        """Compile a module to bytecode, import the packages it lists in a top-level `PREIMPORT` tuple or list, and
+        find the modules it depends on via its `check_dependencies` calls. Packages are only imported ahead of time if
+        the module opts in this way, as importing runs their import side effects in a worker thread. This is
+        blocking, and is meant to be run in a worker thread. Errors are left to be reported when the module is
+        loaded."""
+        path = os.path.join("modules", f"{module}.py")
+        try:
+            with open(path, encoding="utf8") as module_file:
+                tree = ast.parse(module_file.read(), path)
+            py_compile.compile(path, cfile=importlib.util.cache_from_source(path), doraise=True)
+        except (OSError, SyntaxError, py_compile.PyCompileError):
+            return set()
+        for node in tree.body:
+            if (
+                isinstance(node, ast.Assign)
+                and any(isinstance(target, ast.Name) and target.id == "PREIMPORT" for target in node.targets)
+                and isinstance(node.value, (ast.List, ast.Tuple))
+            ):
+                for elt in node.value.elts:
+                    if not isinstance(elt, ast.Constant) or not isinstance(elt.value, str):
+                        continue
                     try:
-                        default_list.append(module)
-                        if load_module(default_list, module, True):
-                            return True
-                    except Exception as ee:
-                        e = ee
-                self.log.error(f"Default module '{module}' encountered and error.\n\n{e!s}")
-                self.last_module_error = f"The `{module}` module failed while loading. The error was:\n\n{e!s}"
-                return False
-            except Exception as e:  # If en error was encountered while loading default module, roll back.
-                self.help = old_help
-                self.modules = old_modules
-                if propagate:
-                    raise
-                if isinstance(e, commands.ExtensionNotFound):  # If import error, clarify further.
-                    e = e.__cause__
-                self.log.error(f"Default module '{module}' encountered and error.\n\n{e!s}")
-                self.last_module_error = f"The `{module}` module failed while loading. The error was:\n\n{e!s}"
-                return False
-            self.log.info(f"Default module '{module}' loaded.")
-            return True
+                        importlib.import_module(elt.value)
+                    except ImportError as e:
+                        BOT_LOG.debug(f"Module '{module}' could not preimport '{elt.value}': {e}")
+                    except Exception:  # Import side effects may raise anything.
+                        BOT_LOG.debug(f"Module '{module}' failed to preimport '{elt.value}'.", exc_info=True)
+        dependencies = set()
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "check_dependencies"
+                and node.args
+                and isinstance(node.args[0], (ast.List, ast.Tuple))
+            ):
+                dependencies.update(
+                    elt.value
+                    for elt in node.args[0].elts
+                    if isinstance(elt, ast.Constant) and isinstance(elt.value, str)
+                )
+        return dependencies
+
+    async def _load_default_module(self, module: str) -> bool:
+        """Load a single default module, rolling back its help and module info if it fails. Raises DependencyError if
+        the module is missing dependencies, so loading it can be retried."""
+        old_help = dict(self.help)  # Save module and help info before loading in case we need to roll back.
+        old_modules = dict(self.modules)
+        self.extension_ctx = None
+        try:
+            await self.load_extension(f"modules.{module}")
+        except commands.ExtensionFailed as e:
+            self.restore_help(old_help, old_modules)
+            if isinstance(e.original, DependencyError):
+                raise e.original from e
+            error: BaseException | None = e
+        except Exception as e:  # If en error was encountered while loading default module, roll back.
+            self.restore_help(old_help, old_modules)
+            error = e.__cause__ if isinstance(e, commands.ExtensionNotFound) else e  # If import error, clarify further.
+        else:
+            error = None
+        if error is not None:
+            self.log.error(f"Default module '{module}' encountered and error.\n\n{error!s}")
+            self.errors.record(error, "module", module)
+            return False
+        self.log.info(f"Default module '{module}' loaded.")
+        return True
+
+    def _default_module_order(self, graph: dict[str, set[str]]) -> list[str]:
+        """Order default modules so dependencies are loaded before the modules that depend on them."""
+        try:
+            return list(TopologicalSorter(graph).static_order())
+        except CycleError as e:
+            self.log.error(f"Default modules have circular dependencies: {', '.join(e.args[1])}")
+            return list(graph)
 
-        async with self.db.acquire() as conn:
-            default_modules = await conn.fetch("SELECT module FROM default_modules")
-        default_modules = [mod["module"] for mod in default_modules]
+    async def _load_default_modules(self):
+        """Load default modules once bot has cached. Modules are prepared concurrently off the event loop while the bot
+        connects, and are then set up in dependency order."""
+        start = perf_counter()
+        modules = []
+        for module in sorted(self.default_modules):
+            if module in self.module_index:
+                modules.append(module)
+            else:
+                self.errors.record(f"Default module '{module}' not found.", "module", module)
+                self.log.warning(f"Default module '{module}' not found.")
+        dependencies = await gather(*(to_thread(self._prepare_module, module) for module in modules))
+        graph = {module: deps.intersection(modules) for module, deps in zip(modules, dependencies, strict=True)}
+        self.startup_timings["prepare_modules"] = perf_counter() - start
         await self.wait_until_ready()  # Wait until object cashing is done.
 
-        for mod in list(default_modules):
-            await load_module(default_modules, mod)
-        await self.update_command_states()  # Make sure commands are in the right state. (hidden, disabled)
+        start, deferred, failed = perf_counter(), [], set()
+        for module in self._default_module_order(graph):
+            if graph[module] & failed:  # Don't attempt modules whose dependencies failed to load.
+                failed.add(module)
+                self.log.error(f"Default module '{module}' not loaded as its dependencies failed to load.")
+                continue
+            try:
+                if not await self._load_default_module(module):
+                    failed.add(module)
+            except DependencyError:  # Dependencies not found in advance, retry once everything else is loaded.
+                deferred.append(module)
+        for module in deferred:
+            try:
+                await self._load_default_module(module)
+            except DependencyError as e:
+                self.log.error(f"Default module '{module}' encountered and error.\n\n{e!s}")
+                self.errors.record(e, "module", module)
+        self.startup_timings["setup_modules"] = perf_counter() - start
+
+        start = perf_counter()
+        loaded_commands = [com for com in self.commands if com.module.startswith("modules.")]
+        await self.update_command_states(loaded_commands)  # Make sure commands are in the right state.
         await self._apply_core_commands_mode(sync=False)  # Enforce mode before syncing.
-        await self.tree.sync()  # Sync tree after loading default modules (picks up module slash commands).
+        self.startup_timings["command_states"] = perf_counter() - start
+        start = perf_counter()
+        await self.sync_tree()  # Sync tree after loading default modules, if they changed what was last synced.
+        self.startup_timings["tree_sync"] = perf_counter() - start
+        timings = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.startup_timings.items())
+        self.log.info(f"Loaded {len(self.extensions) - 1} default modules. Startup timings: {timings}")
 
     async def setup_hook(self):
         """Called after the bot is logged in but before connecting to the gateway. Loads DB options and commands."""
         self.tree.on_error = self._on_app_command_error
+        self.tree.interaction_check = self._start_app_command_timer  # type: ignore[method-assign]
+        self.loop_monitor.start()
+        if self._metrics_port is not None:
+            await self._start_metrics_server()
+        start = perf_counter()
         await self._load_db_options()
+        self.startup_timings["database"] = perf_counter() - start
+        start = perf_counter()
         await self._load_default_commands()
+        self.startup_timings["core_commands"] = perf_counter() - start
+        await self.module_index.refresh()
+        self._module_watcher = self.loop.create_task(self._watch_modules())
         self.loop.create_task(self._load_default_modules())  # Runs after bot is ready (waits internally).
 
+    async def _start_metrics_server(self):
+        """Serve the metrics in the Prometheus text format on the metrics port on localhost."""
+
+        async def handle_metrics(_request: web.Request) -> web.Response:
+            return web.Response(text=self.metrics_text(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        self._metrics_runner = web.AppRunner(app, access_log=None)
+        await self._metrics_runner.setup()
+        try:
+            await web.TCPSite(self._metrics_runner, "127.0.0.1", self._metrics_port).start()
+            self.log.info(f"Serving metrics on http://127.0.0.1:{self._metrics_port}/metrics")
+        except OSError as e:
+            self.log.warning(f"Failed to start metrics endpoint: {e}")
+
+    def metrics_text(self) -> str:
+        """Returns the command and database pool metrics in the Prometheus text format."""
+        lines = self.command_metrics.prometheus()
+        lines.append("# HELP tbb_event_loop_lag_seconds How late the event loop ran a task scheduled to run.")
+        lines.append("# TYPE tbb_event_loop_lag_seconds histogram")
+        lines.extend(self.loop_monitor.lag.prometheus("tbb_event_loop_lag_seconds"))
+        if self.db is not None:
+            lines.append("# HELP tbb_db_acquire_wait_seconds Time spent waiting for a database connection.")
+            lines.append("# TYPE tbb_db_acquire_wait_seconds histogram")
+            lines.extend(self.db.acquire_wait.prometheus("tbb_db_acquire_wait_seconds"))
+            lines.append("# HELP tbb_db_query_duration_seconds Time spent on database queries, by command or module.")
+            lines.append("# TYPE tbb_db_query_duration_seconds histogram")
+            for caller, histogram in sorted(self.db.queries.callers.items()):
+                escaped = caller.replace("\\", "\\\\").replace('"', '\\"')
+                lines.extend(histogram.prometheus("tbb_db_query_duration_seconds", f'caller="{escaped}"'))
+        return "\n".join(lines) + "\n"
+
+    async def _watch_modules(self):
+        """Keep the module index up to date by checking the modules directory for changes off the event loop."""
+        while not self.is_closed():
+            await asleep(MODULE_POLL_INTERVAL)
+            try:
+                if await self.module_index.refresh():
+                    self.log.debug("Modules directory changed, module index updated.")
+            except OSError as e:
+                self.log.warning(f"Failed to scan modules directory: {e}")
+
     async def start(self, token: str, *, reconnect: bool = True):
         """Connect to the database and start the bot."""
+        creds = self._db_creds
+        queries = QueryStats(creds.slow_query_threshold)
         try:
             async with asyncpg.create_pool(
-                user=self._db_creds.user,
-                password=self._db_creds.password,
-                host=self._db_creds.host,
-                port=self._db_creds.port,
-                database=self._db_creds.database,
+                **creds.connection_options(),
+                min_size=creds.min_size,
+                max_size=creds.max_size,
+                statement_cache_size=creds.statement_cache_size,
+                max_inactive_connection_lifetime=creds.max_inactive_lifetime,
+                command_timeout=creds.command_timeout,
+                connection_class=TimedConnection,
+                init=queries.attach,
             ) as pool:
-                self.db = pool
+                self.db = DatabasePool(pool, creds.acquire_timeout, queries)  # Pool opened min_size connections.
                 await super().start(token, reconnect=reconnect)
         except asyncpg.exceptions.InvalidCatalogNameError:
             self.log.critical("Error: Failed to connect to database. Database name not found.")
@@ -663,17 +2035,40 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
 
     async def close(self):
         """Coses the bot and the database connections."""
+        if self._module_watcher is not None:
+            self._module_watcher.cancel()
+        self.loop_monitor.stop()
+        if self._metrics_runner is not None:
+            await self._metrics_runner.cleanup()
+        await self._close_cache_listener()
         if self.db is not None:
             await self.db.close()
         await super().close()
 
-    def get_bot_prefix(self) -> str:
-        """Returns the current bot prefix, or a mention of the bot in text form followed by a space."""
+    def get_bot_prefix(self, guild: discord.Guild | None = None) -> str:
+        """Returns the current bot prefix, or a mention of the bot in text form followed by a space. If a server is
+        given, its prefix is returned if it has one."""
+        if guild is not None and guild.id in self.guild_prefixes:
+            return self.guild_prefixes[guild.id]
         if self.prefix is not None:
             return self.prefix
         assert self.user is not None
         return f"{self.user.mention} "
 
+    def prefixes_for(self, guild_id: int | None) -> list[str]:
+        """Returns the prefixes messages in a server, or in DMs if no server ID is given, are matched against. These are
+        the prefix of the server, the global prefix, and both forms of mentioning the bot. They are sorted longest
+        first, so a prefix is not cut short by another prefix it starts with. Built once per server and kept until
+        the prefixes change."""
+        if (prefixes := self._prefixes.get(guild_id)) is not None:
+            return prefixes
+        candidates = {self.prefix, self.guild_prefixes.get(guild_id) if guild_id is not None else None}
+        if self.user is None:  # Mentions are not known before logging in, so nothing is kept.
+            return sorted(filter(None, candidates), key=len, reverse=True)
+        candidates.update((f"<@{self.user.id}> ", f"<@!{self.user.id}> "))
+        prefixes = self._prefixes[guild_id] = sorted(filter(None, candidates), key=len, reverse=True)
+        return prefixes
+
     async def send_response(self, interaction: Interaction, content: str = "", **kwargs) -> None:
         """Send a response to an interaction, respecting the ephemeral setting. Uses followup if already responded."""
         if "ephemeral" not in kwargs:
@@ -683,6 +2078,25 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         else:
             await interaction.response.send_message(content, **kwargs)
 
+    async def send_pages(
+        self,
+        target: Interaction | discord.abc.Messageable,
+        pages: Iterable[str],
+        filename: str = "output.txt",
+        *,
+        separator: str = "\n",
+    ):
+        """Send output of several messages, such as paginator pages, through the outbound queue of the channel. Small
+        pages are merged, and if there are too many pages they are uploaded as a file instead. Pages are joined with
+        the separator, which should be the line separator of the paginator the pages came from."""
+        if isinstance(target, Interaction):
+            send, channel_id, limit = partial(self.send_response, target), target.channel_id, upload_limit(target.guild)
+        else:
+            channel = target.channel if isinstance(target, Context) else target
+            send, channel_id = target.send, getattr(channel, "id", 0)
+            limit = upload_limit(getattr(channel, "guild", None))
+        await self.outbound.send(channel_id or 0, send, pages, filename, limit, separator=separator)
+
     async def _apply_core_commands_mode(self, sync: bool = True):
         """Register/unregister core slash and prefix commands based on core_commands_mode setting."""
         # Slash commands: add or remove from tree (top-level only; subcommands follow their parent group).
@@ -700,8 +2114,101 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             if cmd.name == "help":
                 continue
             cmd.enabled = self.core_commands_mode in ("prefix", "both")
+        self.invalidate_help_cache()
         if sync:
-            await self.tree.sync()
+            await self.sync_tree()
+
+    async def _tree_hash(self, guild: discord.abc.Snowflake | None = None) -> str:
+        """Function that hashes the slash command tree payload that would be sent to Discord when syncing a scope."""
+        tree_commands = self.tree.get_commands(guild=guild)
+        if self.tree.translator is not None:
+            payload = [await com.get_translated_payload(self.tree, self.tree.translator) for com in tree_commands]
+        else:
+            payload = [com.to_dict(self.tree) for com in tree_commands]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def tree_needs_sync(self, guild: discord.abc.Snowflake | None = None) -> bool:
+        """Returns whether the slash command tree for a scope differs from what was last synced to Discord."""
+        return self.tree_hashes.get(str(guild.id) if guild else "global") != await self._tree_hash(guild)
+
+    async def sync_tree(self, guild: discord.abc.Snowflake | None = None, *, force: bool = False) -> bool:
+        """Syncs the slash command tree for a scope (globally if no guild is given) with Discord, unless its payload is
+        unchanged since the last sync. Syncs are queued, and retried once rate limits reset. Returns if it synced."""
+        scope = str(guild.id) if guild else "global"
+        async with self._sync_lock:
+            tree_hash = await self._tree_hash(guild)
+            if not force and self.tree_hashes.get(scope) == tree_hash:
+                return False
+            for attempt in range(5):
+                retry_after = 2.0**attempt  # Back off further if discord.py already exhausted its own retries.
+                try:
+                    await self.tree.sync(guild=guild)
+                    break
+                except discord.RateLimited as e:  # Rate limit too long for discord.py to wait out by itself.
+                    if attempt == 4:
+                        raise
+                    retry_after = e.retry_after
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == 4:
+                        raise
+                self.log.warning(f"Slash command tree sync ({scope}) was rate limited. Retrying in {retry_after:.1f}s.")
+                await asleep(retry_after)
+            await self._write_through(
+                "tree_hashes",
+                scope,
+                tree_hash,
+                "INSERT INTO tree_hashes VALUES ($1, $2) ON CONFLICT (scope) DO UPDATE SET hash = $2",
+                scope,
+                tree_hash,
+            )
+            return True
+
+    async def request_tree_sync(self, delay: float = 1.5) -> bool:
+        """Syncs the global slash command tree after a short delay, so changes requested within the delay, such as
+        several modules being reloaded back to back, share a single sync. Returns if it synced, like sync_tree."""
+        if self._pending_sync is None:
+            self._pending_sync = self.loop.create_task(self._debounced_sync(delay))
+        return await shield(self._pending_sync)  # Callers being cancelled should not cancel the shared sync.
+
+    async def _debounced_sync(self, delay: float) -> bool:
+        """Wait out the debounce window, then sync the tree for every caller that requested a sync meanwhile."""
+        try:
+            await asleep(delay)
+        finally:
+            self._pending_sync = None  # Changes made from here on need another sync.
+        return await self.sync_tree()
+
+    async def _module_source_hash(self, name: str) -> str | None:
+        """Returns the source hash of an extension if it is a module, otherwise None."""
+        if not name.startswith("modules."):
+            return None
+        return await to_thread(self.module_index.source_hash, name.removeprefix("modules."))
+
+    async def load_extension(self, name: str, *, package: str | None = None):
+        """Loads an extension, recording the source hash of modules so unchanged modules can skip reloading."""
+        source_hash = await self._module_source_hash(name)  # Hashed first, files may change while loading.
+        await super().load_extension(name, package=package)
+        if source_hash is not None:
+            self.module_hashes[name] = source_hash
+            self.extension_search.add(name.removeprefix("modules."))
+
+    async def reload_extension(self, name: str, *, package: str | None = None):
+        """Reloads an extension, recording the source hash of modules so unchanged modules can skip reloading."""
+        source_hash = await self._module_source_hash(name)
+        await super().reload_extension(name, package=package)
+        if source_hash is not None:
+            self.module_hashes[name] = source_hash
+
+    async def unload_extension(self, name: str, *, package: str | None = None):
+        """Unloads an extension, forgetting the source hash of modules."""
+        await super().unload_extension(name, package=package)
+        self.module_hashes.pop(name, None)
+        self.extension_search.discard(name.removeprefix("modules."))
+
+    async def module_changed(self, module: str) -> bool:
+        """Returns if a module's files changed since it was loaded. Modules without a recorded hash count as changed."""
+        recorded = self.module_hashes.get(f"modules.{module}")
+        return recorded is None or recorded != await to_thread(self.module_index.source_hash, module)
 
     def check_dependencies(self, dependencies: list[str]):
         """Checks if all dependencies are met. Raises DependencyError with the missing dependencies if not."""
@@ -727,6 +2234,7 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         info = self._ModuleInfo(self.get_bot_prefix, name, author, usage, description, additional_credits, image_link)
         if name.lower() not in self.modules:
             self.modules[name.lower()] = info
+            self.module_search.add(name.lower())
         else:
             raise RuntimeError(f"A module with the name '{name}' already exists.")
 
@@ -734,6 +2242,29 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         """Function that is used to remove module info to the bot correctly. Used to minimize developmental errors."""
         if name.lower() in self.modules:
             del self.modules[name.lower()]
+            self.module_search.discard(name.lower())
+
+    def restore_help(
+        self, old_help: dict[str, "TravusBotBase._HelpInfo"], old_modules: dict[str, "TravusBotBase._ModuleInfo"]
+    ):
+        """Restores help and module info saved before a module was loaded, if loading it failed."""
+        self.help = old_help
+        self.modules = old_modules
+        self.invalidate_help_cache()
+        self.help_search = SearchIndex({*self.help, *self.slash_help})
+        self.module_search = SearchIndex(self.modules)
+
+    def add_command(self, command: Command, /):
+        """Adds a prefix command, adding it to the command search index."""
+        super().add_command(command)
+        self.command_search.add(command.name)
+
+    def remove_command(self, name: str, /) -> Command | None:
+        """Removes a prefix command or alias, removing commands from the command search index."""
+        command = super().remove_command(name)
+        if command is not None and command.name == name:  # Removing an alias leaves the command.
+            self.command_search.discard(name)
+        return command
 
     def add_commands(self, command_list: list[Command]):
         """Adds multiple commands at once using bot.add_command."""
@@ -745,26 +2276,97 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         for com in command_list:
             self.remove_command(com.name if isinstance(com, Command) else com)
 
-    async def update_command_states(self):
-        """Function that get command state (hidden, disabled) for every command currently loaded."""
-        async with self.db.acquire() as conn, conn.transaction():
-            for command in self.commands:
-                cog_com_name = f"{f'{command.cog_name}.' if command.cog_name else ''}{command.name}"
-                command_state = await conn.fetchval(
-                    "SELECT state FROM command_states WHERE command = $1;", cog_com_name
+    def extension_commands(self, extension: str) -> list[Command]:
+        """Returns the top-level prefix commands defined by an extension, such as `modules.fun` or `core_commands`."""
+        return [com for com in self.commands if com.module == extension or com.module.startswith(f"{extension}.")]
+
+    @staticmethod
+    def _command_state_key(command: Command) -> str:
+        """Returns the key a command's state is stored under."""
+        return f"{f'{command.cog_name}.' if command.cog_name else ''}{command.name}"
+
+    @staticmethod
+    def _apply_command_state(command: Command, state: int):
+        """Sets a command to be hidden and/or disabled according to its state."""
+        command.enabled = state in (0, 1)
+        command.hidden = state in (1, 3)
+
+    async def update_command_states(self, command_list: Iterable[Command] | None = None):
+        """Function that get command state (hidden, disabled) for commands currently loaded. All loaded commands are
+        updated unless a list of commands is passed, such as the commands of a module that was just loaded."""
+        command_list = list(self.commands if command_list is None else command_list)
+        names = [self._command_state_key(command) for command in command_list]
+        missing = [name for name in names if name not in self.command_states]
+        if missing:  # If commands have no state registered, set them to visible and enabled.
+            async with self.db.acquire() as conn:
+                rows = await conn.fetch(
+                    "INSERT INTO command_states SELECT unnest($1::VARCHAR[]), 0 ON CONFLICT (command) "
+                    "DO UPDATE SET state = command_states.state RETURNING command, state",
+                    missing,
                 )
-                if command_state is None:  # If a command has no state registered, set it to visible and enables.
-                    command_state = (0,)
-                    await conn.execute("INSERT INTO command_states VALUES ($1, $2)", cog_com_name, 0)
-                if command_state == 1:  # Set command to be hidden.
-                    command.enabled = True
-                    command.hidden = True
-                elif command_state == 2:  # Set command to be disabled.
-                    command.enabled = False
-                    command.hidden = False
-                elif command_state == 3:  # Set command to be hidden and disabled.
-                    command.enabled = False
-                    command.hidden = True
+            self.command_states.update((row["command"], row["state"]) for row in rows)
+        for command, cog_com_name in zip(command_list, names, strict=True):
+            command_state = self.command_states.get(cog_com_name, 0)
+            if command_state:  # Commands in the default state are left as they are.
+                self._apply_command_state(command, command_state)
+        self.invalidate_help_cache()
+
+    async def _on_permissions_changed(self, *_args: Any):
+        """Clear the help cache when roles or channels change, as that can change which commands users can see."""
+        self.invalidate_help_cache()
+
+    @property
+    def last_error(self) -> str | None:
+        """Summary of the most recent error that was not from loading modules. Setting it records the text as an
+        error."""
+        return next((record.summary() for record in self.errors.latest(("prefix", "slash", "other"))), None)
+
+    @last_error.setter
+    def last_error(self, value: str | None):
+        """Records the text as an error."""
+        if value is not None:
+            self.errors.record(value, "other")
+
+    @property
+    def last_module_error(self) -> str | None:
+        """Summary of the most recent error from loading modules. Setting it records the text as a module error."""
+        return next((record.summary() for record in self.errors.latest(("module",))), None)
+
+    @last_module_error.setter
+    def last_module_error(self, value: str | None):
+        """Records the text as a module error."""
+        if value is not None:
+            self.errors.record(value, "module")
+
+    def format_errors(self, sources: Iterable[str], page: int = 1, search: str | None = None) -> str | None:
+        """Returns a page of the errors from the given sources, most recent first. If a search is given, only errors
+        matching it are included. Returns None if there are no such errors."""
+        records = self.errors.latest(sources, search)
+        if not records:
+            return None
+        pages = -(-len(records) // ERRORS_PER_PAGE)
+        page = min(max(page, 1), pages)
+        shown = records[(page - 1) * ERRORS_PER_PAGE : page * ERRORS_PER_PAGE]
+        return f"Page {page} of {pages}:\n\n" + "\n\n".join(record.format() for record in shown)
+
+    def _log_error(self, record: ErrorRecord, message: str):
+        """Logs an error. Repeats of the same error are only logged on the 2nd, 4th, 8th and so on occurrence, so error
+        storms don't flood the log."""
+        if record.count & (record.count - 1) == 0:
+            self.log.warning(message if record.count == 1 else f"{message} (occurred {record.count} times)")
+
+    def cached_help(self, key: Any, render: Callable[[], _T]) -> _T:
+        """Returns rendered help from the help cache, rendering and caching it if it is not cached."""
+        if key not in self._help_cache:
+            if len(self._help_cache) >= 512:  # Keys include the commands each user has access to, so bound the size.
+                self._help_cache.clear()
+            self._help_cache[key] = render()
+        return self._help_cache[key]
+
+    def invalidate_help_cache(self):
+        """Clears the help cache, which holds rendered help and which commands each permission class can see. Called
+        when help info, command states, config, settings, roles or channels change."""
+        self._help_cache.clear()
 
     def add_command_help(
         self,
@@ -776,10 +2378,12 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         """Function that is used to add help info to the bot correctly. Used to minimize developmental errors. Command
         should be either a prefix command, prefix command group, app command, or app command group."""
         info = self._HelpInfo(self.get_bot_prefix, command, category, restrictions, examples)
+        self.invalidate_help_cache()
         if isinstance(command, (app_commands.Command, app_commands.Group)):
             self.slash_help[command.qualified_name] = info
         else:
             self.help[command.qualified_name] = info
+        self.help_search.add(command.qualified_name)
 
     def remove_command_help(
         self,
@@ -794,6 +2398,8 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
     ):
         """Function that is used to remove command help info from the bot correctly. Used to minimize developmental
         errors."""
+        self.invalidate_help_cache()
+        names = {*self.help, *self.slash_help}
         if isinstance(command, list):  # Remove all in list, if list is passed.
             for com in command:
                 if isinstance(com, (app_commands.Command, app_commands.Group)):
@@ -814,6 +2420,8 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         elif isinstance(command, str):
             self.help.pop(command, None)
             self.slash_help.pop(command, None)
+        for name in names.difference(self.help, self.slash_help):
+            self.help_search.discard(name)
 
     async def update_status(
         self,
@@ -837,18 +2445,12 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         Sets about command and bot status. These require the bot to be online and hence are in here."""
         assert self.user is not None
         if self.user.name.lower() not in self.modules:
-            async with self.db.acquire() as conn:
-                bot_credits = await conn.fetchval("SELECT value FROM settings WHERE key = 'additional_credits'")
-                bot_desc = await conn.fetchval("SELECT value FROM settings WHERE key = 'bot_description'")
             bot_author = (
                 "[Travus](https://github.com/Travus):\n\tTravus Bot Base\n\tCore functions\n\n"
                 "[Rapptz](https://github.com/Rapptz):\n\tDiscord.py"
             )
-            bot_credits = (
-                bot_credits.replace("\\n", "\n").replace("\\r", "\n").replace("\\t", "\t") if bot_credits else None
-            )
-            bot_desc = bot_desc or "No description for the bot found. Set description with `botconfig` command."
-            self.add_module(self.user.name, bot_author, None, bot_desc, bot_credits, self.user.display_avatar)
+            self.add_module(self.user.name, bot_author, None, NO_DESCRIPTION, None, self.user.display_avatar)
+            self._apply_settings()  # Fill in description and credits from the settings cache.
         await self.update_status()
         self.is_connected = 1  # Flag that the bot is currently connected to Discord.
         self.log.info(f"{self.user.name} is ready!\n------------------------------")
@@ -865,6 +2467,34 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
             self.log.info("Reconnected to Discord.")
             self.is_connected = 1  # Flag that the bot is currently connected to Discord.
 
+    async def invoke(self, ctx: Context, /):
+        """Invokes the command of the context, recording how long it took and whether it failed."""
+        start = perf_counter()
+        token = QUERY_CALLER.set(ctx.command.qualified_name if ctx.command is not None else None)
+        try:
+            await super().invoke(ctx)
+        finally:
+            QUERY_CALLER.reset(token)
+        if ctx.command is not None:
+            self.command_metrics.observe(
+                "prefix", ctx.command.qualified_name, perf_counter() - start, ctx.command_failed
+            )
+
+    async def _start_app_command_timer(self, interaction: Interaction) -> bool:
+        """Records when the tree started handling an interaction, and which command database queries made while
+        handling it are for. Assigned to tree.interaction_check in setup_hook."""
+        interaction.extras["started_at"] = perf_counter()
+        if interaction.command is not None:
+            QUERY_CALLER.set(f"/{interaction.command.qualified_name}")  # The tree handles each interaction in a task.
+        return True
+
+    async def on_app_command_completion(
+        self, interaction: Interaction, command: app_commands.Command | app_commands.ContextMenu
+    ):
+        """Records how long a successful app command took."""
+        if (started_at := interaction.extras.get("started_at")) is not None:
+            self.command_metrics.observe("slash", command.qualified_name, perf_counter() - started_at)
+
     async def on_command(self, ctx: Context):
         """Deletes command if command deletion is set."""
         if ctx.interaction is not None:  # Don't delete interaction-triggered messages.
@@ -877,6 +2507,8 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
 
     async def on_command_error(self, ctx: Context, error: commands.CommandError, /):
         """Global error handler for miscellaneous errors."""
+        command_name = ctx.command.qualified_name if ctx.command else None
+        record = self.errors.record(error, "prefix", command_name, ctx.guild.id if ctx.guild else None, ctx.author.id)
         if isinstance(
             error,
             (commands.NoPrivateMessage, commands.CommandOnCooldown, commands.DisabledCommand, commands.CheckFailure),
@@ -885,51 +2517,55 @@ class TravusBotBase(Bot):  # pylint: disable=too-many-ancestors, too-many-instan
         elif isinstance(error, commands.UserInputError):  # Send correct syntax based on command usage variable.
             if ctx.command is not None and ctx.command.usage:
                 await ctx.send(
-                    f"Correct syntax: `{self.get_bot_prefix()}"
+                    f"Correct syntax: `{self.get_bot_prefix(ctx.guild)}"
                     f"{ctx.command.full_parent_name + ' ' if ctx.command.full_parent_name else ''}"
                     f"{ctx.invoked_with} {ctx.command.usage or ''}`"
                 )
         elif isinstance(error, commands.NotOwner):  # Log to console.
-            self.log.warning(f"{ctx.author.id}: Command '{ctx.command}' requires bot owner status")
+            self._log_error(record, f"{ctx.author.id}: Command '{ctx.command}' requires bot owner status")
         elif isinstance(error, commands.MissingPermissions):  # Log to console.
-            self.log.warning(
+            self._log_error(
+                record,
                 f"{ctx.author.id}: Command '{ctx.command}' requires additional permissions: "
-                f"{', '.join(error.missing_permissions)}"
+                f"{', '.join(error.missing_permissions)}",
             )
         elif isinstance(error, commands.MissingRole):  # Log to console.
-            self.log.warning(f"{ctx.author.id}: Command '{ctx.command}' requires role: {error.missing_role}")
+            self._log_error(record, f"{ctx.author.id}: Command '{ctx.command}' requires role: {error.missing_role}")
         elif isinstance(error, commands.MissingAnyRole):  # Log to console.
-            self.log.warning(
+            self._log_error(
+                record,
                 f"{ctx.author.id}: Command '{ctx.command}' requires role: "
-                f"{' or '.join(str(r) for r in error.missing_roles)}"
+                f"{' or '.join(str(r) for r in error.missing_roles)}",
             )
         elif isinstance(error, commands.CommandNotFound):  # Log to console.
-            self.log.warning(f"{ctx.author.id}: {error}")
+            self._log_error(record, f"{ctx.author.id}: {error}")
         elif isinstance(error, CCError):  # Log to console if message wasn't properly sent to Discord.
-            self.log.warning(f"{ctx.author.id}: Connection error to Discord. Message lost.")
+            self._log_error(record, f"{ctx.author.id}: Connection error to Discord. Message lost.")
         elif isinstance(error.__cause__, Forbidden):  # Log to console if lacking permissions.
-            self.log.warning(f"{ctx.author.id}: Missing permissions.")
+            self._log_error(record, f"{ctx.author.id}: Missing permissions.")
         elif error is not None:  # Log error to console.
-            self.log.warning(f"{ctx.author.id}: {error}")
-        self.last_error = f"[{cur_time()}] {ctx.author.id}: {error}"
+            self._log_error(record, f"{ctx.author.id}: {error}")
 
     async def _on_app_command_error(self, interaction: Interaction, error: app_commands.AppCommandError):
         """Global error handler for app command errors. Assigned to tree.on_error in setup_hook."""
         command_name = interaction.command.qualified_name if interaction.command else "unknown"
+        if interaction.command is not None and (started_at := interaction.extras.get("started_at")) is not None:
+            self.command_metrics.observe("slash", command_name, perf_counter() - started_at, True)
+        record = self.errors.record(error, "slash", command_name, interaction.guild_id, interaction.user.id)
         if isinstance(error, (app_commands.CommandOnCooldown, app_commands.NoPrivateMessage)):
             pass
         elif isinstance(error, app_commands.MissingPermissions):
-            self.log.warning(
+            self._log_error(
+                record,
                 f"{interaction.user.id}: Command '/{command_name}' requires additional permissions: "
-                f"{', '.join(error.missing_permissions)}"
+                f"{', '.join(error.missing_permissions)}",
             )
         elif isinstance(error, app_commands.CheckFailure):
             pass
         elif isinstance(error.__cause__, Forbidden):
-            self.log.warning(f"{interaction.user.id}: Missing permissions.")
+            self._log_error(record, f"{interaction.user.id}: Missing permissions.")
         elif error is not None:
-            self.log.warning(f"{interaction.user.id}: /{command_name}: {error}")
-        self.last_error = f"[{cur_time()}] {interaction.user.id}: /{command_name}: {error}"
+            self._log_error(record, f"{interaction.user.id}: /{command_name}: {error}")
 
 
 def parse_time(
@@ -958,43 +2594,71 @@ def parse_time(
     return t_total
 
 
-async def send_in_global_channel(ctx: Context, channel: GlobalTextChannel | None, msg: str, other_dms: bool = False):
-    """Sends a message in any text channel across servers and DMs. Has flag to allow sending to foreign DMs."""
+async def send_in_global_channel(
+    ctx: Context, channel: GlobalTextChannel | None, msg: str | Iterable[str], other_dms: bool = False
+):
+    """Sends a message, or several pages of one, in any text channel across servers and DMs. Has flag to allow sending
+    to foreign DMs."""
     user = ctx.author
+    pages = [msg] if isinstance(msg, str) else msg
     try:
         if isinstance(channel, DMChannel):
             if channel.recipient and channel.recipient.id != user.id and not other_dms:
                 await ctx.send("Sending messages to another user's DMs is forbidden.")
             else:
-                await channel.send(msg)
+                await ctx.bot.send_pages(channel, pages)
         elif channel is None:
-            await ctx.channel.send(msg)
+            await ctx.bot.send_pages(ctx, pages)
         elif isinstance(channel, TextChannel) and isinstance(user, Member):
             if channel.permissions_for(user).send_messages:
-                await channel.send(msg)
+                await ctx.bot.send_pages(channel, pages)
             else:
                 await ctx.send("You do not have permission to send messages in this channel.")
         elif isinstance(channel, Thread) and isinstance(user, Member):
-            if not channel.permissions_for(user).send_messages_in_threads or channel.locked or channel.archived:
+            permissions = channel.permissions_for(user)
+            if not permissions.send_messages_in_threads or channel.locked or channel.archived:
                 await ctx.send("You do not have permission to send messages in this thread.")
-            elif channel.is_private():
-                if user not in await channel.fetch_members() and not channel.permissions_for(user).manage_threads:
-                    await ctx.send("You do not have permission to send messages in this private thread.")
+            elif (
+                channel.is_private()
+                and not permissions.manage_threads
+                and not await ctx.bot.thread_members.contains(channel, user.id)
+            ):
+                await ctx.send("You do not have permission to send messages in this private thread.")
             else:
-                await channel.send(msg)
+                await ctx.bot.send_pages(channel, pages)
         else:
             await ctx.send("You do not have permission to send messages in this channel.")
     except Forbidden:
         await ctx.send("Cannot send messages in given channel.")
 
 
-async def send_long_text(ctx: Context, text: str) -> None:
-    """Send text as a code block if short enough, otherwise upload as a .txt file."""
+async def send_long_text(ctx: Context, text: str | AttachmentWriter) -> None:
+    """Send text as a code block if short enough, otherwise upload as a .txt file, compressed if it is too large. The
+    text can also be given as an attachment writer it was streamed into, so long output is never held whole."""
+    if isinstance(text, AttachmentWriter):
+        if text.size <= 1950:
+            await ctx.send(f"```py\n{text.text()}\n```")
+        else:
+            await send_attachment(ctx.send, text)
+        return
     if len(text) <= 1950:
         await ctx.send(f"```py\n{text}\n```")
+        return
+    with AttachmentWriter("output.txt", upload_limit(ctx.guild)) as writer:
+        writer.write(text)
+        await send_attachment(ctx.send, writer)
+
+
+async def send_attachment(send: Callable[..., Coroutine[Any, Any, Any]], writer: AttachmentWriter) -> None:
+    """Send the attachment built by an attachment writer using the given send function, or explain that it was too
+    large to upload."""
+    file = writer.file()
+    if file is None:
+        await send("Output too long to upload, even when compressed.")
+    elif writer.filename.endswith(".gz"):
+        await send("Output too long, uploaded as compressed file.", file=file)
     else:
-        file = discord.File(io.BytesIO(text.encode()), filename="output.txt")
-        await ctx.send("Output too long, uploaded as file.", file=file)
+        await send("Output too long, uploaded as file.", file=file)
 
 
 async def can_run(command: Command, ctx: Context) -> bool:
@@ -1020,61 +2684,100 @@ async def del_message(msg: Message):
             BOT_LOG.warning("Bot does not have required permissions to delete message.")
 
 
+# Patterns used by _clean. The markdown and URL patterns are the ones used by discord.utils.escape_markdown, and the
+# mention escape pattern the one used by discord.utils.escape_mentions, so cleaned text is escaped exactly like before.
+_MENTION_PATTERN = re_cmp(r"<(@!?|#|@&)(\d+)>")
+_MENTION_ESCAPE_PATTERN = re_cmp(r"@(everyone|here|[!&]?[0-9]{17,20})")
+_URL_PATTERN = r"(?P<url><[^: >]+:\/[^ >]+>|(?:https?|steam):\/\/[^\s<]+[^<.,:;\"\'\]\s])"
+_MARKDOWN_PATTERN = r"(?P<markdown>[_\\~|\*`]|^>(?:>>)?\s|\[.+\]\(.+\)|^#{1,3}|^\s*-)"
+_ESCAPE_PATTERN = re_cmp(
+    rf"{_URL_PATTERN}|{_MARKDOWN_PATTERN}|@(?P<mention>everyone|here|[!&]?[0-9]{{17,20}})", MULTILINE
+)
+_MARKDOWN_ONLY_PATTERN = re_cmp(r"[_\\~|\*`]|^>(?:>>)?\s|^#{1,3}|^\s*-", MULTILINE)  # For text without links.
+_URL_ONLY_PATTERN = re_cmp(_URL_PATTERN)  # For unembedding URLs in text whose markdown is not escaped.
+_EMBEDDABLE_URL_PATTERN = re_cmp(
+    r"(\b|<)https?://(www\.)?[-a-zA-Z0-9@:%._+~#=]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0-9@:%_+.~#?&\\/=]*)>?"
+)
+
+
+def _resolve_mentions(bot: TravusBotBase, guild: discord.Guild | None, text: str) -> str:
+    """Replaces user mentions, and channel and role mentions if a guild is given, with the names they refer to."""
+    resolved: dict[str, str] = {}  # Mentions are often repeated, so only resolve each once.
+
+    def resolve(mention: str, kind: str, digits: str) -> str:
+        """Resolves a single mention."""
+        _id = int(digits)
+        if str(_id) != digits:  # Not a mention Discord would have sent, leave it as is.
+            return mention
+        if kind in ("@", "@!"):
+            user = bot.get_user(_id)
+            return "@" + user.name if user else "@deleted-user"
+        if guild is None:
+            return mention
+        if kind == "#":
+            channel = guild.get_channel(_id)
+            return "#" + channel.name if channel else "#deleted-channel"
+        role = guild.get_role(_id)
+        return "@" + role.name if role else "@deleted-role"
+
+    def repl(obj):
+        """Function used in regex substitution."""
+        mention = obj.group(0)
+        if mention not in resolved:
+            resolved[mention] = resolve(mention, obj.group(1), obj.group(2))
+        return resolved[mention]
+
+    return _MENTION_PATTERN.sub(repl, text) if "<" in text else text
+
+
+def _unembed(url: str) -> str:
+    """Encases a URL matched by the URL pattern in <> unless it already is, or is not a web link Discord embeds."""
+    return f"<{url}>" if url.startswith("http") else url
+
+
 def _clean(
     bot: TravusBotBase,
     guild: discord.Guild | None,
     text: str,
     escape_markdown: bool = True,
     replace_backticks: bool = False,
+    unembed: bool = False,
 ) -> str:
-    """Underlying function used by clean and clean_no_ctx functions."""
-    transformations: dict[str, str] = {}
-
-    def resolve_member(_id):
-        """Resolves user mentions."""
-        member = bot.get_user(_id)
-        return "@" + member.name if member else "@deleted-user"
-
-    transformations.update(
-        (f"<@{member_id}>", resolve_member(member_id)) for member_id in [int(x) for x in findall(r"<@!?(\d+)>", text)]
-    )
-    transformations.update(
-        (f"<@!{member_id}>", resolve_member(member_id)) for member_id in [int(x) for x in findall(r"<@!?(\d+)>", text)]
-    )
-
-    if guild:
-
-        def resolve_channel(_id):
-            """Resolves channel mentions."""
-            ch = guild.get_channel(_id)
-            return f"<#{_id}>", ("#" + ch.name if ch else "#deleted-channel")
-
-        def resolve_role(_id):
-            """Resolves role mentions."""
-            role = guild.get_role(_id)
-            return "@" + role.name if role else "@deleted-role"
-
-        transformations.update(resolve_channel(channel) for channel in [int(x) for x in findall(r"<#(\d+)>", text)])
-        transformations.update(
-            (f"<@&{role_id}>", resolve_role(role_id)) for role_id in [int(x) for x in findall(r"<@&(\d+)>", text)]
-        )
+    """Underlying function used by clean and clean_no_ctx functions. Mentions are resolved first, if there are any,
+    then markdown and mentions are escaped, backticks replaced and URLs unembedded in a single pass."""
+    text = _resolve_mentions(bot, guild, text)
+    if not escape_markdown:
+        if unembed and ":/" in text:
+            text = _URL_ONLY_PATTERN.sub(lambda obj: _unembed(obj.group(0)), text)
+        if replace_backticks:
+            text = text.replace("`", "ˋ")
+        return _MENTION_ESCAPE_PATTERN.sub("@\u200b\\1", text) if "@" in text else text
+
+    if ":/" not in text and "[" not in text and "@" not in text:  # No URLs, links or mentions, escape without callback.
+        text = _MARKDOWN_ONLY_PATTERN.sub(r"\\\g<0>", text)
+        return text.replace("`", "ˋ") if replace_backticks else text
 
     def repl(obj):
         """Function used in regex substitution."""
-        return transformations.get(obj.group(0), "")
+        if obj.group("mention") is not None:
+            return f"@\u200b{obj.group('mention')}"
+        if (url := obj.group("url")) is not None:  # URLs are left as is, or unembedded, other matches escaped.
+            result = _unembed(url) if unembed else url
+        else:
+            result = f"\\{obj.group('markdown')}"
+        if replace_backticks:
+            result = result.replace("`", "ˋ")
+        return _MENTION_ESCAPE_PATTERN.sub("@\u200b\\1", result) if "@" in result else result
 
-    pattern = re_cmp("|".join(transformations.keys()))
-    result = pattern.sub(repl, text)
-    if escape_markdown:
-        result = utils.escape_markdown(result)
-    if replace_backticks:
-        result = result.replace("`", "ˋ")
-    return utils.escape_mentions(result)
+    return _ESCAPE_PATTERN.sub(repl, text)
 
 
-def clean(ctx: Context, text: str, escape_markdown: bool = True, replace_backticks: bool = False) -> str:
-    """Cleans text, escaping mentions and markdown. Tries to change mentions to text."""
-    return _clean(ctx.bot, ctx.guild, text, escape_markdown, replace_backticks)
+def clean(
+    ctx: Context, text: str, escape_markdown: bool = True, replace_backticks: bool = False, unembed: bool = False
+) -> str:
+    """Cleans text, escaping mentions and markdown. Tries to change mentions to text. Optionally encases URLs in <> to
+    prevent them from embedding."""
+    return _clean(ctx.bot, ctx.guild, text, escape_markdown, replace_backticks, unembed)
 
 
 def clean_no_ctx(
@@ -1083,9 +2786,11 @@ def clean_no_ctx(
     text: str,
     escape_markdown: bool = True,
     replace_backticks: bool = False,
+    unembed: bool = False,
 ) -> str:
-    """Cleans text, escaping mentions and markdown. Tries to change mentions to text. Works without context."""
-    return _clean(bot, guild, text, escape_markdown, replace_backticks)
+    """Cleans text, escaping mentions and markdown. Tries to change mentions to text. Works without context. Optionally
+    encases URLs in <> to prevent them from embedding."""
+    return _clean(bot, guild, text, escape_markdown, replace_backticks, unembed)
 
 
 def unembed_urls(text: str) -> str:
@@ -1095,9 +2800,7 @@ def unembed_urls(text: str) -> str:
         """Function used in regex substitution."""
         return f"<{obj.group(0).strip('<').strip('>')}>"
 
-    regex = re_cmp(r"(\b|<)https?://(www\.)?[-a-zA-Z0-9@:%._+~#=]{2,256}\.[a-z]{2,6}\b([-a-zA-Z0-9@:%_+.~#?&\\/=]*)>?")
-    text = regex.sub(repl, text)
-    return text
+    return _EMBEDDABLE_URL_PATTERN.sub(repl, text)
 
 
 BOT_LOG = logging.getLogger("bot")